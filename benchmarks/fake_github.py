@@ -0,0 +1,357 @@
+"""Local stand-in for the parts of GitHub the launcher talks to.
+
+Serves a synthetic `releases` API, paged with `Link` headers and answering
+`If-None-Match` with 304 like GitHub does, plus Godot-shaped zip archives and
+a SHA512-SUMS.txt per release. Archive downloads support `Range` requests.
+Every response can be slowed down with a fixed latency and a per-connection
+bandwidth cap, so results from a fast loopback can be compared with something
+closer to a real link.
+
+Archives are generated deterministically from a seed into `--cache-dir`, so
+two benchmark runs with the same parameters download the same bytes.
+
+Tests use `add_fault` to answer requests with errors (a 503, a spent rate
+limit, a download cut off halfway) and `request_log` to see what the launcher
+sent.
+
+Usage (standalone, e.g. to point a real launcher at it):
+    python benchmarks/fake_github.py [--port 8765] [--releases 300] [--binary-mb 64]
+                                     [--bandwidth-mbps 100] [--latency-ms 40]
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import zipfile
+import argparse
+import tempfile
+import threading
+import http.server
+
+API_PATH = "/repos/godotengine/godot/releases"
+# Generated archives are reused between runs, building a large one takes a while
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "godot_launcher_bench_archives")
+
+
+def fill_bytes(rng, size, compressible=True):
+    """Deterministic filler, roughly as compressible as an engine binary when `compressible`"""
+    if not compressible:
+        return rng.randbytes(size)
+    parts = []
+    remaining = size
+    while remaining > 0:
+        # Alternate incompressible runs with repetitive ones, deflates to about 40%
+        random_run = rng.randbytes(min(remaining, 2048))
+        repeated_run = (b"GodotEngine\0" * 256)[:min(remaining - len(random_run), 3072)]
+        parts.append(random_run + repeated_run)
+        remaining -= len(random_run) + len(repeated_run)
+    return b"".join(parts)[:size]
+
+
+def build_archive(path, version, mono=False, binary_mb=64, small_files=2000, seed=0):
+    """Write a Godot-shaped editor archive.
+
+    The layout follows the real 4.x linux builds: a large deflated editor
+    binary at the top (one folder down for mono builds), and for mono a
+    GodotSharp tree of many small files. A few entries are stored instead of
+    deflated, like the already compressed resources in real archives.
+    """
+    rng = random.Random(f"{seed}-{version}-{mono}")
+    if mono:
+        root = f"Godot_v{version}_mono_linux_x86_64/"
+        binary_name = f"{root}Godot_v{version}_mono_linux.x86_64"
+    else:
+        root = ""
+        binary_name = f"Godot_v{version}_linux.x86_64"
+
+    with zipfile.ZipFile(f"{path}.tmp", 'w') as zip_ref:
+        binary = zipfile.ZipInfo(binary_name, date_time=(2024, 1, 1, 0, 0, 0))
+        binary.create_system = 3
+        binary.external_attr = 0o100755 << 16
+        binary.compress_type = zipfile.ZIP_DEFLATED
+        zip_ref.writestr(binary, fill_bytes(rng, binary_mb * 1024 * 1024))
+
+        # Classic builds are a single binary, only mono archives carry a tree
+        for index in range(small_files if mono else 0):
+            folder = f"{root}GodotSharp/Api/Release/{index % 40:02d}/"
+            stored = index % 10 == 0
+            name = f"{folder}file{index}.{'png' if stored else 'xml'}"
+            info = zipfile.ZipInfo(name, date_time=(2024, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+            zip_ref.writestr(info, fill_bytes(rng, rng.randint(1024, 16 * 1024), compressible=not stored))
+    os.replace(f"{path}.tmp", path)
+
+
+class FakeGitHub():
+    """The stand-in server, see the module docstring.
+
+    Args:
+        releases: Number of releases in the catalog.
+        archive_versions: Releases that get real archives, the others only
+            list assets. Defaults to the newest release.
+        bandwidth: Per-connection cap in bytes per second, 0 for none.
+        latency: Seconds to wait before every response.
+        ranges: Whether archive downloads honor `Range`.
+        rate_limit_remaining: `X-RateLimit-Remaining` sent with release pages.
+    """
+
+    def __init__(self, cache_dir, releases=300, per_page=100, archive_versions=None, binary_mb=64,
+                 small_files=2000, bandwidth=0, latency=0.0, ranges=True, seed=0):
+        self.cache_dir = cache_dir
+        self.per_page = per_page
+        self.binary_mb = binary_mb
+        self.small_files = small_files
+        self.bandwidth = bandwidth
+        self.latency = latency
+        self.ranges = ranges
+        self.seed = seed
+        self.versions = self.make_versions(releases)
+        self.archive_versions = archive_versions or self.versions[:1]
+        self.archives = {}
+        self.sums = {}
+        self.server = None
+        self.base_url = None
+        self.requests = 0
+        self.request_log = []
+        self.faults = []
+        self.rate_limit_remaining = 4999
+        self.lock = threading.Lock()
+
+    def make_versions(self, count):
+        versions = []
+        major, minor = 4, 9
+        while len(versions) < count:
+            for stage in ("stable", "rc2", "rc1", "beta3", "beta2", "beta1", "dev2", "dev1"):
+                versions.append(f"{major}.{minor}-{stage}")
+            minor -= 1
+            if minor < 0:
+                major, minor = major - 1, 9
+        return versions[:count]
+
+    def add_fault(self, prefix, status, headers=None, count=1, from_offset=None):
+        """Answer the next `count` requests for paths under `prefix` with an empty `status` response.
+
+        With `from_offset` only `Range` requests starting at or after that
+        byte fail, e.g. to cut a download off after its first chunks.
+        """
+        with self.lock:
+            self.faults.append({"prefix": prefix, "status": status, "headers": headers or {},
+                                "count": count, "from_offset": from_offset})
+
+    def take_fault(self, path, range_header):
+        with self.lock:
+            for fault in self.faults:
+                if fault["count"] <= 0 or not path.startswith(fault["prefix"]):
+                    continue
+                if fault["from_offset"] is not None:
+                    match = re.match(r"bytes=(\d+)-", range_header)
+                    if not match or int(match.group(1)) < fault["from_offset"]:
+                        continue
+                fault["count"] -= 1
+                return fault
+        return None
+
+    @property
+    def releases_url(self):
+        return f"{self.base_url}{API_PATH}"
+
+    def get_asset_name(self, version, mono=False):
+        if mono:
+            return f"Godot_v{version}_mono_linux_x86_64.zip"
+        return f"Godot_v{version}_linux.x86_64.zip"
+
+    def prepare_archives(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for version in self.archive_versions:
+            lines = []
+            for mono in (False, True):
+                name = self.get_asset_name(version, mono)
+                path = os.path.join(self.cache_dir, f"{self.seed}-{self.binary_mb}-{self.small_files}-{name}")
+                if not os.path.exists(path):
+                    build_archive(path, version, mono, self.binary_mb, self.small_files, self.seed)
+                self.archives[name] = path
+                lines.append(f"{self.hash_file(path)}  {name}")
+            self.sums[version] = ("\n".join(lines) + "\n").encode()
+
+    def hash_file(self, path):
+        hasher = hashlib.sha512()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    def release_json(self, index, version):
+        assets = []
+        for mono in (False, True):
+            name = self.get_asset_name(version, mono)
+            path = self.archives.get(name)
+            assets.append({"name": name, "browser_download_url": f"{self.base_url}/download/{version}/{name}",
+                           "size": os.path.getsize(path) if path else 0})
+        if version in self.sums:
+            assets.append({"name": "SHA512-SUMS.txt", "size": len(self.sums[version]),
+                           "browser_download_url": f"{self.base_url}/download/{version}/SHA512-SUMS.txt"})
+        return {"name": version, "url": f"{self.base_url}{API_PATH}/{index}", "assets": assets}
+
+    def start(self, port=0):
+        self.prepare_archives()
+        fake = self
+
+        class Handler(FakeGitHubHandler):
+            server_state = fake
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, args=(0.1,), daemon=True, name="FakeGitHub").start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+class FakeGitHubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_state = None
+    block_size = 64 * 1024
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        fake = self.server_state
+        with fake.lock:
+            fake.requests += 1
+            fake.request_log.append((self.path, dict(self.headers)))
+        if fake.latency:
+            time.sleep(fake.latency)
+        path, _, query = self.path.partition("?")
+        fault = fake.take_fault(path, self.headers.get("Range", ""))
+        if fault:
+            self.send_body(b"", "text/plain", fault["headers"], fault["status"])
+        elif path == API_PATH:
+            self.send_release_page(query)
+        elif path.startswith(f"{API_PATH}/"):
+            index = int(path.rsplit("/", 1)[1])
+            self.send_json(fake.release_json(index, fake.versions[index]))
+        elif path.startswith("/download/"):
+            _, _, version, name = path.split("/", 3)
+            if name == "SHA512-SUMS.txt" and version in fake.sums:
+                self.send_body(fake.sums[version], "text/plain")
+            elif name in fake.archives:
+                self.send_archive(fake.archives[name])
+            else:
+                self.send_error(404)
+        else:
+            self.send_error(404)
+
+    def send_release_page(self, query):
+        fake = self.server_state
+        params = dict(part.split("=", 1) for part in query.split("&") if "=" in part)
+        per_page = int(params.get("per_page", fake.per_page))
+        page = int(params.get("page", 1))
+        start = (page - 1) * per_page
+        page_versions = fake.versions[start:start + per_page]
+        etag = f'"{fake.seed}-{len(fake.versions)}-{per_page}-{page}"'
+
+        headers = {"ETag": etag, "X-RateLimit-Remaining": str(fake.rate_limit_remaining),
+                   "X-RateLimit-Reset": str(int(time.time()) + 3600)}
+        if start + per_page < len(fake.versions):
+            headers["Link"] = f'<{fake.releases_url}?per_page={per_page}&page={page + 1}>; rel="next"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        releases = [fake.release_json(start + offset, version) for offset, version in enumerate(page_versions)]
+        self.send_json(releases, headers)
+
+    def send_json(self, data, headers=None):
+        self.send_body(json.dumps(data).encode(), "application/json", headers)
+
+    def send_body(self, body, content_type, headers=None, status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.write_throttled(body)
+
+    def send_archive(self, path):
+        fake = self.server_state
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match and fake.ranges:
+            start = int(match.group(1))
+            end = min(int(match.group(2) or end), end)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        if fake.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", f'"{os.path.basename(path)}"')
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining:
+                block = f.read(min(self.block_size, remaining))
+                if not self.write_throttled(block):
+                    return
+                remaining -= len(block)
+
+    def write_throttled(self, data):
+        """Returns False once the client went away"""
+        bandwidth = self.server_state.bandwidth
+        started = time.perf_counter()
+        sent = 0
+        for offset in range(0, len(data), self.block_size):
+            block = data[offset:offset + self.block_size]
+            try:
+                self.wfile.write(block)
+            except (BrokenPipeError, ConnectionResetError):
+                return False
+            sent += len(block)
+            if bandwidth:
+                ahead = sent / bandwidth - (time.perf_counter() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--releases", type=int, default=300)
+    parser.add_argument("--binary-mb", type=int, default=64)
+    parser.add_argument("--small-files", type=int, default=2000)
+    parser.add_argument("--bandwidth-mbps", type=float, default=0, help="Per connection, 0 for unlimited")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--no-ranges", action="store_true")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    fake = FakeGitHub(args.cache_dir, args.releases, binary_mb=args.binary_mb, small_files=args.small_files,
+                      bandwidth=args.bandwidth_mbps * 1024 * 1024 / 8, latency=args.latency_ms / 1000,
+                      ranges=not args.no_ranges)
+    fake.start(args.port)
+    print(f"Serving {len(fake.versions)} releases at {fake.releases_url}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
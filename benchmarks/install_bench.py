@@ -0,0 +1,182 @@
+"""End-to-end benchmark of the catalog refresh, downloads, extraction and installs.
+
+Runs against `fake_github.FakeGitHub` on loopback, with a throwaway app dir,
+so neither the GitHub API quota nor the real install folders are touched.
+Each run measures:
+
+    catalog_cold     every release page fetched and parsed
+    catalog_warm     the same walk answered with 304s from the release cache
+    download         `utils.download_file_with_progress` (ranged, resumable)
+    extract          `utils.unzip_file_with_progress` of that download
+    stream_install   `utils.stream_install_with_progress` (overlapped)
+    install          `App.install_version`, checksum verification included
+
+for the classic (one large binary) and mono (binary plus many small stored
+and deflated files) archives. Medians are printed with throughput, `--json`
+saves them and `--compare` prints the change against such a file, so a
+download or extraction change can be judged against the numbers it had
+before.
+
+Usage:
+    python benchmarks/install_bench.py [--runs 3] [--binary-mb 64] [--small-files 2000]
+                                       [--bandwidth-mbps 0] [--latency-ms 0] [--connections 4]
+                                       [--json results.json] [--compare baseline.json]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import zipfile
+import argparse
+import tempfile
+import statistics
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from fake_github import FakeGitHub, DEFAULT_CACHE_DIR
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def uncompressed_size(archive_path):
+    with zipfile.ZipFile(archive_path) as zip_ref:
+        return sum(entry.file_size for entry in zip_ref.infolist())
+
+
+def run_once(app, fake, work_dir, connections, samples):
+    from godot_launcher import utils
+    from godot_launcher.scraper import Scraper
+
+    # A new Scraper over a deleted cache file is a launcher that never refreshed before
+    cache_file = os.path.join(app.config.app_dir, "release_cache.json")
+    if os.path.exists(cache_file):
+        os.remove(cache_file)
+    app.scraper = Scraper(app)
+    app.scraper.releases_url = fake.releases_url
+    catalog_bytes = sum(len(json.dumps(fake.release_json(i, v))) for i, v in enumerate(fake.versions))
+    samples.setdefault("catalog_cold", []).append((timed(app.config.refresh_available_versions, urgent=True), catalog_bytes))
+    samples.setdefault("catalog_warm", []).append((timed(app.config.refresh_available_versions, urgent=True), 0))
+
+    version = fake.archive_versions[0]
+    for mono in (False, True):
+        kind = "mono" if mono else "classic"
+        name = fake.get_asset_name(version, mono)
+        url = f"{fake.base_url}/download/{version}/{name}"
+        archive_size = os.path.getsize(fake.archives[name])
+        extracted_size = uncompressed_size(fake.archives[name])
+
+        archive_file = os.path.join(work_dir, name)
+        seconds = timed(utils.download_file_with_progress, url, archive_file, connections)
+        samples.setdefault(f"download/{kind}", []).append((seconds, archive_size))
+
+        output_dir = os.path.join(work_dir, f"extract-{kind}")
+        seconds = timed(utils.unzip_file_with_progress, archive_file, output_dir)
+        samples.setdefault(f"extract/{kind}", []).append((seconds, extracted_size))
+        os.remove(archive_file)
+        shutil.rmtree(output_dir)
+
+        output_dir = os.path.join(work_dir, f"stream-{kind}")
+        seconds = timed(utils.stream_install_with_progress, url, output_dir)
+        samples.setdefault(f"stream_install/{kind}", []).append((seconds, archive_size))
+        shutil.rmtree(output_dir)
+
+        seconds = timed(app.install_version, version, mono)
+        name = f"{version} (mono)" if mono else version
+        if not app.config.version_is_installed(name):
+            raise RuntimeError(f"Install of {name} failed, see {app.config.logfile}")
+        samples.setdefault(f"install/{kind}", []).append((seconds, archive_size))
+        engine_folder = app.config.get_engine_version_path(name)
+        shutil.rmtree(engine_folder)
+        app.registry.refresh([engine_folder])
+
+
+def summarize(samples):
+    results = {}
+    for name, runs in samples.items():
+        seconds = [run[0] for run in runs]
+        median = statistics.median(seconds)
+        size = runs[0][1]
+        results[name] = {
+            "median_s": median,
+            "min_s": min(seconds),
+            "bytes": size,
+            "mb_per_s": size / median / (1024 * 1024) if size and median else None,
+        }
+    return results
+
+
+def print_results(results, baseline=None):
+    header = f"{'benchmark':<24}{'median':>10}{'min':>10}{'MB/s':>10}"
+    print(header + ("    vs baseline" if baseline else ""))
+    for name, result in results.items():
+        rate = f"{result['mb_per_s']:.1f}" if result["mb_per_s"] else "-"
+        line = f"{name:<24}{result['median_s']:>9.3f}s{result['min_s']:>9.3f}s{rate:>10}"
+        if baseline and name in baseline:
+            change = (result["median_s"] - baseline[name]["median_s"]) / baseline[name]["median_s"] * 100
+            line += f"    {change:+.1f}% time"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--releases", type=int, default=300)
+    parser.add_argument("--binary-mb", type=int, default=64)
+    parser.add_argument("--small-files", type=int, default=2000)
+    parser.add_argument("--bandwidth-mbps", type=float, default=0, help="Per connection, 0 for unlimited")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--no-ranges", action="store_true", help="Serve archives without Range support")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Results file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    fake = FakeGitHub(args.cache_dir, args.releases, binary_mb=args.binary_mb, small_files=args.small_files,
+                      bandwidth=args.bandwidth_mbps * 1024 * 1024 / 8, latency=args.latency_ms / 1000,
+                      ranges=not args.no_ranges)
+    print(f"Preparing archives in {args.cache_dir}...", file=sys.stderr)
+    fake.start()
+
+    work_dir = tempfile.mkdtemp(prefix="godot_launcher_bench_")
+    # The launcher keeps everything under %APPDATA%, point it at the throwaway dir
+    os.environ["APPDATA"] = work_dir
+    import godot_launcher
+    app = godot_launcher.create_app(headless=True)
+    app.config.initialize()
+    app.apply_config()
+    # Every install has to download, not come from the archive cache
+    app.archive_cache.max_size = 0
+    app.archive_cache.shared_dir = None
+
+    samples = {}
+    try:
+        for run in range(args.runs):
+            print(f"Run {run + 1}/{args.runs}", file=sys.stderr)
+            run_once(app, fake, work_dir, args.connections, samples)
+    finally:
+        app.config.flush_config()
+        fake.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = summarize(samples)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if args.json:
+        params = {key: value for key, value in vars(args).items() if key not in ("json", "compare", "cache_dir")}
+        with open(args.json, 'w') as f:
+            json.dump({"params": params, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
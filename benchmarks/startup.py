@@ -0,0 +1,189 @@
+"""Startup benchmark for the launcher.
+
+Every sample runs in a fresh interpreter against a throwaway app dir, with Qt
+on the offscreen platform so it also works on build agents. Samples are taken
+"cold" (empty bytecode cache, via a new `PYTHONPYCACHEPREFIX`) and "warm"
+(cache reused), and the medians are checked against a budget file.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--budget benchmarks/startup_budget.json]
+                                 [--importtime-report importtime.txt] [--json results.json]
+
+Exits with 1 when a phase is over budget.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+
+PHASES = ["import", "app_init", "get_app_dir", "config_initialize", "import_ui", "main_window", "first_paint", "total"]
+
+
+def measure_phases():
+    """Runs in the child process, prints the phase timings in ms as JSON"""
+    timings = {}
+    start = last = time.perf_counter()
+
+    def mark(phase):
+        nonlocal last
+        now = time.perf_counter()
+        timings[phase] = (now - last) * 1000
+        last = now
+
+    import godot_launcher
+    mark("import")
+    app = godot_launcher.create_app(headless=True)
+    mark("app_init")
+    app.config.get_app_dir()
+    mark("get_app_dir")
+    app.config.initialize()
+    mark("config_initialize")
+
+    from godot_launcher.ui import UI
+    from PyQt5.QtCore import QObject, QEvent
+    mark("import_ui")
+    app.ui = UI(app)
+    app.ui.initialize()
+    mark("main_window")
+
+    class PaintWatcher(QObject):
+        painted = False
+
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint:
+                self.painted = True
+            return False
+
+    watcher = PaintWatcher()
+    app.ui.main_window.installEventFilter(watcher)
+    app.ui.main_window.show()
+    deadline = time.perf_counter() + 5
+    while not watcher.painted and time.perf_counter() < deadline:
+        app.ui.q_app.processEvents()
+    mark("first_paint")
+    timings["total"] = (time.perf_counter() - start) * 1000
+
+    # Pending config writes are not part of startup
+    app.config.config_store.dirty = False
+    print(json.dumps(timings))
+
+
+def get_child_env(app_data_dir, pycache_dir):
+    env = dict(os.environ)
+    env["APPDATA"] = app_data_dir
+    env["QT_QPA_PLATFORM"] = "offscreen"
+    env["PYTHONPYCACHEPREFIX"] = pycache_dir
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")]))
+    return env
+
+
+def run_child(env):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"],
+                            env=env, capture_output=True, text=True, cwd=REPO_DIR)
+    if result.returncode != 0:
+        raise RuntimeError(f"Benchmark child failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def collect_samples(runs, work_dir):
+    samples = {"cold": [], "warm": []}
+    app_data_dir = os.path.join(work_dir, "appdata")
+    os.makedirs(app_data_dir)
+    for run in range(runs):
+        # A new cache prefix means every module is compiled from source again
+        cold_cache = os.path.join(work_dir, f"pycache_cold_{run}")
+        samples["cold"].append(run_child(get_child_env(app_data_dir, cold_cache)))
+    warm_cache = os.path.join(work_dir, "pycache_warm")
+    run_child(get_child_env(app_data_dir, warm_cache))
+    for _ in range(runs):
+        samples["warm"].append(run_child(get_child_env(app_data_dir, warm_cache)))
+    return samples
+
+
+def summarize(samples):
+    summary = {}
+    for mode, runs in samples.items():
+        summary[mode] = {phase: statistics.median(run[phase] for run in runs) for phase in PHASES}
+    return summary
+
+
+def collect_importtime(work_dir, top=25):
+    """`-X importtime` breakdown of the GUI import path, heaviest modules first"""
+    env = get_child_env(os.path.join(work_dir, "appdata"), os.path.join(work_dir, "pycache_warm"))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import godot_launcher, godot_launcher.ui"],
+                            env=env, capture_output=True, text=True, cwd=REPO_DIR)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((int(self_us), int(cumulative_us), name.rstrip()))
+    modules.sort(reverse=True)
+
+    lines = [f"{'self ms':>9} {'cumul ms':>9}  module"]
+    for self_us, cumulative_us, name in modules[:top]:
+        lines.append(f"{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name.strip()}")
+    return "\n".join(lines)
+
+
+def check_budget(summary, budget):
+    failures = []
+    for mode, phases in budget.items():
+        for phase, limit in phases.items():
+            measured = summary.get(mode, {}).get(phase)
+            if measured is not None and measured > limit:
+                failures.append(f"{mode} {phase}: {measured:.1f} ms > budget {limit} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", default=DEFAULT_BUDGET, help="JSON of {mode: {phase: max ms}}")
+    parser.add_argument("--importtime-report", help="Also write the -X importtime breakdown to this file")
+    parser.add_argument("--json", help="Write the medians to this file")
+    args = parser.parse_args()
+
+    if args.child:
+        measure_phases()
+        return 0
+
+    work_dir = tempfile.mkdtemp(prefix="godot_launcher_bench_")
+    try:
+        summary = summarize(collect_samples(args.runs, work_dir))
+        importtime = collect_importtime(work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{'phase':<20}{'cold ms':>10}{'warm ms':>10}")
+    for phase in PHASES:
+        print(f"{phase:<20}{summary['cold'][phase]:>10.1f}{summary['warm'][phase]:>10.1f}")
+    print()
+    print(importtime)
+
+    if args.importtime_report:
+        with open(args.importtime_report, 'w') as f:
+            f.write(importtime + "\n")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+    with open(args.budget, 'r') as f:
+        budget = json.load(f)
+    failures = check_budget(summary, budget)
+    for failure in failures:
+        print(f"OVER BUDGET: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
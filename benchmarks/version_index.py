@@ -0,0 +1,75 @@
+"""Benchmark of `VersionIndex` against the linear config scans it replaced.
+
+Builds a synthetic catalog of `--versions` release names (stable, rc, beta and
+dev tags across many minors) and times index construction, the lookups the UI
+does on every combo box change, and the sorted views.
+
+Usage:
+    python benchmarks/version_index.py [--versions 5000] [--lookups 10000]
+"""
+import os
+import sys
+import random
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from godot_launcher.versions import VersionIndex, parse_version
+
+
+def make_catalog(count):
+    names = []
+    stages = ["stable", "rc1", "rc2", "beta3", "beta12", "dev5"]
+    major = 3
+    while len(names) < count:
+        for minor in range(12):
+            for patch in range(4):
+                for stage in stages:
+                    names.append(f"{major}.{minor}.{patch}-{stage}" if patch else f"{major}.{minor}-{stage}")
+        major += 1
+    names = names[:count]
+    random.shuffle(names)
+    available = {name: f"https://api.github.com/repos/godotengine/godot/releases/{i}" for i, name in enumerate(names)}
+    installed = {name: f"/versions/{name}" for name in random.sample(names, min(20, len(names)))}
+    return available, installed
+
+
+def report(label, seconds, repeat):
+    print(f"{label:<40}{seconds / repeat * 1e6:>12.2f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--versions", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=10000)
+    args = parser.parse_args()
+
+    available, installed = make_catalog(args.versions)
+    names = list(available)
+    urls = list(available.values())
+    index = VersionIndex()
+
+    report("index build (available + installed)", timeit.timeit(
+        lambda: (index.rebuild_available(available), index.rebuild_installed(installed)), number=10), 10)
+
+    probes = [random.choice(names) for _ in range(args.lookups)]
+    url_probes = [random.choice(urls) for _ in range(args.lookups)]
+
+    report("is_installed (index)", timeit.timeit(lambda: [index.is_installed(n) for n in probes], number=1), args.lookups)
+    report("is_installed (list scan, old)", timeit.timeit(
+        lambda: [n in [name for name, _ in installed.items()] for n in probes], number=1), args.lookups)
+    report("url -> name (index)", timeit.timeit(lambda: [index.get_name_for_url(u) for u in url_probes], number=1), args.lookups)
+    old_scan_count = min(args.lookups, 1000)
+    report("url -> name (linear scan, old)", timeit.timeit(
+        lambda: [next(k for k, v in available.items() if v == u) for u in url_probes[:old_scan_count]], number=1), old_scan_count)
+    report("sorted_available view", timeit.timeit(index.sorted_available, number=100), 100)
+    report("parse_version", timeit.timeit(lambda: [parse_version(n) for n in names], number=1), len(names))
+
+    ordered = index.sorted_available()
+    assert parse_version("4.10-stable") > parse_version("4.9.1-stable") > parse_version("4.9.1-rc2")
+    print(f"newest: {ordered[:3]}  oldest: {ordered[-3:]}")
+
+
+if __name__ == "__main__":
+    main()
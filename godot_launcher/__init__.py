@@ -1,11 +1,23 @@
 from godot_launcher.config import Config
-from godot_launcher.ui import UI
 from godot_launcher.scraper import Scraper
+from godot_launcher.store import ObjectStore
+from godot_launcher.scheduler import InstallScheduler
+from godot_launcher.archive_cache import ArchiveCache
+from godot_launcher.registry import InstalledRegistry
+from godot_launcher.disk_usage import DiskUsageService
+from godot_launcher.trash import TrashReclaimer
+from godot_launcher.prewarm import Prewarmer
+from godot_launcher.projects import ProjectIndex
+from godot_launcher.supervisor import ProcessSupervisor
 from godot_launcher import utils
+from godot_launcher import events
+from godot_launcher import http_client
+from godot_launcher.telemetry import metrics
 from godot_launcher.exceptions import *
-import tempfile
+import os
 import shutil
 import sys
+import time
 import subprocess
 import platform
 import logging
@@ -13,76 +25,212 @@ import logging
 class App():
     logger = logging.getLogger("App")
     
-    def __init__(self):
+    def __init__(self, headless=False):
+        """
+        Args:
+            headless: Skip building the Qt UI (and importing PyQt5), used by the CLI.
+        """
+        self.start_time = time.perf_counter()
         machine_info = utils.get_machine_info()
         if not machine_info:
+            if headless:
+                sys.exit("ERROR: Unsupported OS!")
             input("ERROR: Unsupported OS! Press Enter to exit")
             sys.exit()
         self.version = "0.1.0"
+        self.headless = headless
         self.config = Config(self)
-        self.ui = UI(self)
+        self.ui = None
+        if not headless:
+            # Imported here so headless use never pays for loading Qt
+            from godot_launcher.ui import UI
+            self.ui = UI(self)
         self.scraper = Scraper(self)
-        self.temp_install_dir = ""
+        self.store = ObjectStore(os.path.join(self.config.app_dir, "objects"))
+        self.scheduler = InstallScheduler(self)
+        self.archive_cache = ArchiveCache(os.path.join(self.config.app_dir, "archives"))
+        self.registry = InstalledRegistry(self)
+        self.disk_usage = DiskUsageService(self)
+        self.trash = TrashReclaimer(self)
+        self.prewarmer = Prewarmer(self)
+        self.projects = ProjectIndex(self)
+        self.supervisor = ProcessSupervisor(self)
         
         logging.basicConfig(filename=self.config.logfile, level=logging.DEBUG, format='%(asctime)s %(levelname)s:%(message)s')
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.DEBUG)
+        if headless:
+            # Keep the terminal for the CLI's own output, problems still go to stderr
+            console_handler = logging.StreamHandler(sys.stderr)
+            console_handler.setLevel(logging.WARNING)
+        else:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setLevel(logging.DEBUG)
         console_formatter = logging.Formatter('%(asctime)s %(levelname)s:%(message)s')
         console_handler.setFormatter(console_formatter)
+        metrics.open(self.config.metrics_file)
         self.logger.addHandler(console_handler)
         self.logger.info(f"Succuessfully initialized GodotLauncher v{self.version}. Running on {machine_info['bits']}-bit {machine_info['os_name']}")
 
-    def launch(self, version_folder):
-        engine_path = utils.get_executable_in_folder(version_folder)
-        if platform.system() == 'windows':
-            creation_flags = subprocess.CREATE_NEW_CONSOLE
-        else:
-            creation_flags = 0
+    def apply_config(self):
+        """Push the settings read by `Config.initialize` into the running components"""
+        events.bus.frequency = self.config.get_progress_frequency()
+        self.scheduler.max_parallel = self.config.get_max_parallel_installs()
+        self.archive_cache.max_size = self.config.get_archive_cache_size()
+        self.archive_cache.shared_dir = self.config.get_shared_archive_cache()
+        self.archive_cache.trim()
+        http_client.client.token = self.config.get_github_token()
+        http_client.client.retries = self.config.get_http_retries()
+        metrics.enabled = self.config.get_collect_metrics()
+        self.prewarmer.enabled = self.config.get_prewarm_selected_version()
+        rate_limit = self.config.get_api_rate_limit()
+        if rate_limit:
+            http_client.client.restore_rate_limit(*rate_limit)
 
-        try:
-            subprocess.Popen([engine_path], creationflags=creation_flags)
-        except OSError as e:
-            self.logger.error(f"Error launching the engine: {e}")
+    def launch(self, version_folder, requested_at=None, project_path=None):
+        """Start the engine of an installed version.
+        
+        Args:
+            version_folder: Engine folder of the installed version.
+            requested_at: `time.perf_counter()` of the launch request (e.g. the
+                button click), the latency up to `Popen` and the engine's
+                startup are timed from there.
+            project_path: Folder of a project to open in the editor, the
+                project manager opens without one.
+        
+        Returns:
+            True if the engine was started.
+        """
+        requested_at = requested_at or time.perf_counter()
+        with metrics.span("launch", started_at=requested_at, version=os.path.basename(version_folder)) as span:
+            engine_path = self.config.get_engine_executable(version_folder)
+            index_hit = engine_path is not None
+            span.set(indexed=index_hit)
+            if not index_hit:
+                engine_path = self.index_executable(version_folder)
+            if not engine_path:
+                self.logger.error(f"No engine executable found in {version_folder}")
+                span.fail("no executable")
+                return False
+            
+            if platform.system() == 'Windows':
+                creation_flags = subprocess.CREATE_NEW_CONSOLE
+            else:
+                creation_flags = 0
 
-    def install_version(self, version, use_mono):
-        self.temp_install_dir = tempfile.mkdtemp()
+            command = [engine_path]
+            if project_path:
+                command += ["--path", project_path, "--editor"]
+                span.set(project=True)
+            try:
+                process = subprocess.Popen(command, creationflags=creation_flags)
+            except OSError as e:
+                self.logger.error(f"Error launching the engine: {e}")
+                span.fail(str(e))
+                return False
+        # Prewarming only pays off once the engine runs, its startup is timed by the supervisor
+        self.supervisor.track(version_folder, process, project_path, requested_at,
+                              prewarmed=self.prewarmer.is_warm(version_folder))
+        elapsed = (time.perf_counter() - requested_at) * 1000
+        self.logger.info(f"Launch latency: {elapsed:.1f} ms ({'indexed' if index_hit else 'rescanned'} {engine_path})")
+        return True
+    
+    def launch_project(self, project, version=None, requested_at=None):
+        """Open a project from the `ProjectIndex` in the editor.
+        
+        Args:
+            version: Installed version to use, defaults to the best match
+                for the project's `config/features`.
+        
+        Returns:
+            True if the editor was started.
+        """
+        version = version or self.projects.match_engine(project)
+        if not version or not self.config.version_is_installed(version):
+            self.logger.error(f"No installed engine matches {project['name']} ({project['path']})")
+            return False
+        self.logger.info(f"Opening {project['name']} with {version}")
+        return self.launch(self.config.get_engine_version_path(version), requested_at, project["path"])
+    
+    def index_executable(self, version_folder):
+        """Find the engine executable of a folder and record it, returns its path or None"""
+        engine_path = utils.get_executable_in_folder(version_folder)
+        if engine_path:
+            self.config.set_engine_executable(version_folder, engine_path)
+        return engine_path
+
+    def install_version(self, version, use_mono, operation_id=None, cancel_event=None):
+        """Returns True if the version was installed.
+        
+        Every version gets its own staging folder under `download_dir`, so
+        concurrent installs never share (or delete) each other's files. Failed
+        downloads stay there so the next attempt can resume.
+        """
         version_url = self.config.get_version_url(version)
+        staging_dir = self.get_staging_dir(version, use_mono)
+        engine_folder = self.config.get_engine_folder_from_url(version_url, use_mono)
         try:
-            self.scraper.install_version(version_url, self.temp_install_dir, use_mono)
-             
+            os.makedirs(staging_dir, exist_ok=True)
+            with metrics.span("install", version=version, mono=use_mono), self.registry.installing(engine_folder):
+                self.scraper.install_version(version_url, staging_dir, use_mono, operation_id, cancel_event)
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return True
+        
+        except InstallCancelled as e:
+            self.logger.info(f"{version}: {e}")
+            
         except CustomException as e:
             self.logger.error(e)
             
         except Exception as e:
             self.logger.error(f"Error installing version: {e}")
- 
-        self.cleanup_temp_dir()
-        
-    def cleanup_temp_dir(self):
-        if self.temp_install_dir:
-            try:
-                shutil.rmtree(self.temp_install_dir)
-                self.temp_install_dir = ""
-            except OSError as e:
-                self.logger.warning(f"Error cleaning up temp directory: {e}")
+        return False
+    
+    def get_staging_dir(self, version, use_mono):
+        folder_name = f"{version}-mono" if use_mono else version
+        return os.path.join(self.config.download_dir, folder_name)
+
+    def is_running(self, version_folder):
+        """True while an engine runs from `version_folder`, whether this launcher started it or not"""
+        return bool(self.supervisor.get_processes_using(version_folder))
 
     def uninstall_version(self, engine_folder):
+        """Returns True if the engine was uninstalled.
+        
+        The folder is renamed into the trash, which is instant, and deleted
+        by the `TrashReclaimer` in the background.
+        """
+        pids = self.supervisor.get_processes_using(engine_folder)
+        if pids:
+            self.logger.error(f"Refusing to uninstall {engine_folder} while it is running (pid {', '.join(map(str, pids))})")
+            return False
         try:
-            shutil.rmtree(engine_folder)
-            self.config.update_installed_versions()
+            trashed_path = self.trash.move_to_trash(engine_folder)
         except OSError as e:
+            # e.g. Windows refuses to rename a folder with files in use
             self.logger.error(f"Error uninstalling version: {e}")
+            return False
+        self.registry.refresh([engine_folder])
+        self.trash.reclaim(trashed_path)
+        return True
 
     def run(self):
         try:
             self.config.initialize()
+            self.apply_config()
+            self.registry.start()
+            self.trash.resume()
+            self.disk_usage.start()
+            self.prewarmer.request_selected()
             self.ui.initialize()
             self.ui.launch()
+            self.supervisor.stop()
+            self.disk_usage.stop()
+            self.registry.stop()
+            self.config.flush_config()
         except Exception as e:
             self.logger.error(f"Launcher Runtime Error: {e}")
             self.logger.info(f"Application will now close")
             sys.exit()
 
-def create_app():
-    app = App()
+def create_app(headless=False):
+    app = App(headless)
     return app
@@ -0,0 +1,4 @@
+import sys
+from godot_launcher.cli import main
+
+sys.exit(main())
@@ -0,0 +1,187 @@
+import os
+import time
+import shutil
+import hashlib
+import logging
+import threading
+import contextlib
+from godot_launcher import utils
+
+
+class ArchiveCache():
+    """Size-capped LRU cache of downloaded release archives.
+
+    Archives are kept under `cache_dir` after an install, keyed by their
+    asset url and checked against the SHA512 the release publishes, so a
+    reinstall (or switching between the mono and standard build) unzips from
+    disk instead of downloading again. Once the cache grows over `max_size`
+    bytes the least recently used archives are evicted.
+
+    An optional `shared_dir` (e.g. a read-only network share filled by
+    another launcher) is consulted after the local cache and before the
+    internet, its archives are used in place and never evicted.
+
+    Archives a job is unzipping are pinned and skipped by eviction, one that
+    can't be deleted (locked, no permission) stays and is retried next time.
+    """
+    logger = logging.getLogger("ArchiveCache")
+    outcome_labels = {"hits": "hit", "shared_hits": "shared hit", "misses": "miss"}
+
+    def __init__(self, cache_dir, max_size=2 * 1024 ** 3, shared_dir=None):
+        self.cache_dir = cache_dir
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self.max_size = max_size
+        self.shared_dir = shared_dir
+        self.entries = None
+        # Urls of archives being unzipped, with the number of jobs using each
+        self.pinned = {}
+        self.lock = threading.RLock()
+        self.stats = {"hits": 0, "shared_hits": 0, "misses": 0, "evictions": 0, "bytes_saved": 0}
+
+    def is_enabled(self):
+        return self.max_size > 0 or bool(self.shared_dir)
+
+    def get_key(self, url):
+        return hashlib.sha1(url.encode()).hexdigest()[:16]
+
+    def get_entries(self):
+        with self.lock:
+            if self.entries is None:
+                self.entries = self.read_index(self.index_file)
+            return self.entries
+
+    def read_index(self, index_file):
+        return utils.read_json(index_file, self.logger, f"archive index {index_file}") or {}
+
+    def save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self.lock:
+            utils.write_json_atomic(self.index_file, self.entries, self.logger, "archive index")
+
+    @contextlib.contextmanager
+    def pin(self, url):
+        """Keep the archive of `url` from being evicted while the block runs"""
+        with self.lock:
+            self.pinned[url] = self.pinned.get(url, 0) + 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.pinned[url] -= 1
+                if not self.pinned[url]:
+                    del self.pinned[url]
+
+    def lookup(self, url, expected_digest=None):
+        """Path of a cached archive for `url`, or None on a miss.
+
+        An entry only counts as a hit if it matches `expected_digest` (when
+        given) and its file still has the size and mtime it was added with,
+        so the archive never needs to be hashed again.
+        """
+        with self.lock:
+            entry = self.get_entries().get(url)
+            archive_path = self.get_valid_path(self.cache_dir, entry, expected_digest)
+            if archive_path:
+                entry["last_used"] = time.time()
+                self.save_index()
+                self.count("hits", url, entry["size"])
+                return archive_path
+            if entry:
+                # Stale or modified, it would never be served again
+                self.remove_entry(url)
+                self.save_index()
+
+        if self.shared_dir:
+            shared_entry = self.read_index(os.path.join(self.shared_dir, "index.json")).get(url)
+            archive_path = self.get_valid_path(self.shared_dir, shared_entry, expected_digest)
+            if archive_path:
+                self.count("shared_hits", url, shared_entry["size"])
+                return archive_path
+
+        self.count("misses", url)
+        return None
+
+    def get_valid_path(self, cache_dir, entry, expected_digest):
+        if not entry:
+            return None
+        if expected_digest and entry["sha512"] != expected_digest:
+            return None
+        archive_path = os.path.join(cache_dir, entry["file"])
+        try:
+            stat = os.stat(archive_path)
+        except OSError:
+            return None
+        if stat.st_size != entry["size"] or stat.st_mtime_ns != entry["mtime_ns"]:
+            return None
+        return archive_path
+
+    def add(self, url, source_file, digest=None):
+        """Move a freshly downloaded archive into the cache, then evict down to `max_size`"""
+        if self.max_size <= 0:
+            os.remove(source_file)
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        file_name = f"{self.get_key(url)}-{os.path.basename(source_file)}"
+        archive_path = os.path.join(self.cache_dir, file_name)
+        # Same filesystem as the download folder, so this is a rename, not a copy
+        try:
+            os.replace(source_file, archive_path)
+        except OSError:
+            shutil.move(source_file, archive_path)
+        stat = os.stat(archive_path)
+        with self.lock:
+            self.get_entries()[url] = {
+                "file": file_name,
+                "sha512": digest,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "last_used": time.time(),
+            }
+            self.trim()
+            self.save_index()
+
+    def trim(self):
+        """Evict least recently used archives until the cache fits in `max_size`"""
+        with self.lock:
+            entries = self.get_entries()
+            total_size = sum(entry["size"] for entry in entries.values())
+            for url, entry in sorted(entries.items(), key=lambda item: item[1]["last_used"]):
+                if total_size <= self.max_size:
+                    break
+                if url in self.pinned:
+                    continue
+                if self.remove_entry(url):
+                    total_size -= entry["size"]
+                    self.stats["evictions"] += 1
+                    self.logger.info(f"Evicted {entry['file']} from the archive cache")
+            if os.path.isdir(self.cache_dir):
+                self.save_index()
+
+    def remove_entry(self, url):
+        """Delete an entry and its archive, returns False if the archive had to stay"""
+        entry = self.get_entries()[url]
+        try:
+            os.remove(os.path.join(self.cache_dir, entry["file"]))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"Could not remove {entry['file']} from the archive cache: {e}")
+            return False
+        del self.get_entries()[url]
+        return True
+
+    def count(self, outcome, url, size=0):
+        with self.lock:
+            self.stats[outcome] += 1
+            self.stats["bytes_saved"] += size
+            stats = dict(self.stats)
+        self.logger.info(f"Archive cache {self.outcome_labels[outcome]} for {os.path.basename(url)} "
+                         f"(hits {stats['hits']}, shared hits {stats['shared_hits']}, misses {stats['misses']}, "
+                         f"{stats['bytes_saved'] // (1024 * 1024)} MB not downloaded)")
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["size"] = sum(entry["size"] for entry in self.get_entries().values())
+            stats["archives"] = len(self.get_entries())
+        return stats
@@ -0,0 +1,94 @@
+import re
+
+
+ASSET_NAME_PATTERN = re.compile(r'^Godot_v(?P<version>[^_]+)_(?P<rest>.+?)(?P<extension>\.exe\.zip|\.zip|\.tpz)$')
+
+EDITOR = "editor"
+HEADLESS = "headless"
+EXPORT_TEMPLATES = "export_templates"
+
+
+def parse_asset_name(asset_name):
+    """Classify a Godot release asset by its file name.
+
+    Understands the 3.x (`x11.64`, `osx`, `linux_server`) and 4.x
+    (`linux.x86_64`, `macos`, `windows_arm64`) naming schemes.
+
+    Returns:
+        A (os_name, arch, mono, kind) tuple, or None for assets that aren't a
+        desktop editor, headless build or export templates (source tarballs,
+        web/android editors, checksums...). `os_name` and `arch` are None for
+        export templates, `arch` is "universal" for macOS builds.
+    """
+    match = ASSET_NAME_PATTERN.match(asset_name)
+    if not match:
+        return None
+    rest = match.group("rest").lower()
+    mono = rest.startswith("mono_")
+
+    if "export_templates" in rest:
+        return (None, None, mono, EXPORT_TEMPLATES)
+    if "web" in rest or "android" in rest:
+        return None
+    kind = HEADLESS if "headless" in rest or "server" in rest else EDITOR
+
+    if "win" in rest:
+        os_name = "windows"
+    elif "linux" in rest or "x11" in rest:
+        os_name = "linux"
+    elif "macos" in rest or "osx" in rest:
+        os_name = "mac_os"
+    else:
+        return None
+
+    if "arm64" in rest:
+        arch = "arm64"
+    elif "arm32" in rest:
+        arch = "arm32"
+    elif "universal" in rest or os_name == "mac_os":
+        arch = "universal"
+    elif "x86_32" in rest or re.search(r'(win|[._])32$', rest):
+        arch = "x86_32"
+    elif "x86_64" in rest or re.search(r'(win|[._])64$', rest):
+        arch = "x86_64"
+    else:
+        return None
+    return (os_name, arch, mono, kind)
+
+
+class AssetMatrix():
+    """All assets of one release, indexed by (os, arch, mono, kind).
+
+    Built once from the asset list of a release (cached in the release
+    catalog), so resolving the right download for a machine is a dict lookup
+    instead of a rescan of every asset name.
+    """
+
+    def __init__(self, assets):
+        """
+        Args:
+            assets: Iterable of (name, download url, size) entries.
+        """
+        self.matrix = {}
+        self.sums_url = None
+        for name, url, size in assets:
+            if name == "SHA512-SUMS.txt":
+                self.sums_url = url
+                continue
+            key = parse_asset_name(name)
+            if key:
+                self.matrix[key] = {"name": name, "url": url, "size": size}
+
+    def resolve(self, os_name, arch, mono, kind=EDITOR):
+        """Find the asset for a platform, returns the asset dict or None"""
+        if kind == EXPORT_TEMPLATES:
+            return self.matrix.get((None, None, mono, kind))
+        # macOS builds are universal binaries
+        for candidate_arch in (arch, "universal"):
+            asset = self.matrix.get((os_name, candidate_arch, mono, kind))
+            if asset:
+                return asset
+        return None
+
+    def get_platforms(self):
+        return sorted({(os_name, arch) for os_name, arch, _, _ in self.matrix if os_name})
@@ -0,0 +1,26 @@
+import hashlib
+from godot_launcher.exceptions import *
+
+
+def new_hasher():
+    """Hash used by Godot's SHA512-SUMS.txt release assets"""
+    return hashlib.sha512()
+
+def parse_sums(text):
+    """Parse a `sha512sum` style listing into a {file name: hex digest} dict"""
+    sums = {}
+    for line in text.splitlines():
+        parts = line.strip().split(None, 1)
+        if len(parts) != 2:
+            continue
+        digest, name = parts
+        # A leading "*" marks binary mode in sha512sum output
+        sums[name.lstrip("*")] = digest.lower()
+    return sums
+
+def verify_digest(hasher, expected_digest, name):
+    actual_digest = hasher.hexdigest()
+    if actual_digest != expected_digest:
+        raise ChecksumError(f"SHA512 mismatch for {name}: expected {expected_digest[:16]}..., got {actual_digest[:16]}...")
+    return actual_digest
+
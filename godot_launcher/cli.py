@@ -0,0 +1,310 @@
+"""Headless command line interface, usable over SSH without a display.
+
+Nothing in here may import PyQt5: the CLI builds the `App` with
+`headless=True` and renders install progress from the event bus.
+"""
+import sys
+import argparse
+import threading
+from godot_launcher import create_app, utils, telemetry, prewarm, supervisor
+from godot_launcher.events import bus
+
+
+class TerminalProgress():
+    """Draws event bus progress as a single rewritten terminal line.
+
+    Concurrent jobs share the line: each one gets a compact
+    "label stage percent rate" segment, keyed by its operation id.
+    """
+    bar_width = 20
+    labels = {"download": "Downloading", "unzip": "Extracting"}
+    short_labels = {"download": "dl", "unzip": "unzip"}
+
+    def __init__(self, stream=sys.stdout):
+        self.stream = stream
+        self.active = False
+        self.operations = {}
+        self.names = {}
+        self.line_length = 0
+        # Events arrive on the worker threads of every running job
+        self.lock = threading.Lock()
+
+    def on_event(self, event):
+        with self.lock:
+            if event.kind == "job_state":
+                self.names[event.operation_id] = event.data["label"]
+                if event.data["state"] not in ("queued", "running"):
+                    self.end_operation(event.operation_id)
+            elif event.kind in self.labels:
+                self.operations[event.operation_id] = event
+                self.draw()
+            elif event.kind == "unzip_finished":
+                self.end_operation(event.operation_id)
+
+    def end_operation(self, operation_id):
+        self.operations.pop(operation_id, None)
+        if not self.operations and self.active:
+            self.stream.write("\n")
+            self.stream.flush()
+            self.active = False
+            self.line_length = 0
+
+    def draw(self):
+        if len(self.operations) == 1:
+            line = self.format_single(next(iter(self.operations.values())))
+        else:
+            line = " | ".join(self.format_compact(event) for event in self.operations.values())
+        # Pad so a shorter line fully overwrites the previous one
+        self.stream.write("\r" + line.ljust(self.line_length))
+        self.stream.flush()
+        self.line_length = len(line)
+        self.active = True
+
+    def format_single(self, event):
+        fraction = event.current / event.total if event.total else 0
+        filled = int(fraction * self.bar_width)
+        bar = "#" * filled + " " * (self.bar_width - filled)
+        line = (f"{self.labels[event.kind]:<12}[{bar}] {int(fraction * 100):3d}% "
+                f"{utils.convert_bytes(event.current)} / {utils.convert_bytes(event.total)}")
+        if event.kind == "download":
+            line += f"  {utils.convert_bytes(int(event.rate))}/s  ETA {utils.format_duration(event.eta)}"
+        return line
+
+    def format_compact(self, event):
+        fraction = event.current / event.total if event.total else 0
+        segment = f"{self.names.get(event.operation_id, event.operation_id)} {self.short_labels[event.kind]} {int(fraction * 100)}%"
+        if event.kind == "download":
+            segment += f" {utils.convert_bytes(int(event.rate))}/s"
+        return segment
+
+
+def list_versions(app, args):
+    installed = app.config.get_installed_versions()
+    selected = app.config.get_selected_version()
+    print("Installed versions:")
+    if not installed:
+        print("  (none)")
+    for version in installed:
+        marker = "*" if version == selected else " "
+        print(f"{marker} {version}")
+
+    if args.available:
+        print("Available versions:")
+        for version in app.config.get_available_versions():
+            marker = "installed" if app.config.version_is_installed(version) else ""
+            print(f"  {version:<24}{marker}")
+    return 0
+
+
+def install_version(app, args):
+    available_versions = app.config.get_available_versions()
+    for version in args.versions:
+        if version not in available_versions:
+            print(f"Unknown version '{version}', run `refresh` or `list --available`", file=sys.stderr)
+            return 1
+    progress = TerminalProgress()
+    bus.subscribe(progress.on_event)
+    jobs = [app.scheduler.submit_install(version, args.mono) for version in args.versions]
+    try:
+        app.scheduler.wait(jobs)
+    except KeyboardInterrupt:
+        # Let every job clean up its partial install before exiting
+        for job in jobs:
+            app.scheduler.cancel(job.job_id)
+        app.scheduler.wait(jobs)
+    bus.unsubscribe(progress.on_event)
+    if progress.active:
+        print()
+
+    exit_code = 0
+    for job in jobs:
+        if job.state == "done":
+            print(f"Installed {job.version}")
+        else:
+            print(f"Failed to install {job.version} ({job.state}), see {app.config.logfile}")
+            exit_code = 1
+    return exit_code
+
+
+def uninstall_version(app, args):
+    if not app.config.version_is_installed(args.version):
+        print(f"'{args.version}' is not installed", file=sys.stderr)
+        return 1
+    engine_folder = app.config.get_engine_version_path(args.version)
+    pids = app.supervisor.get_processes_using(engine_folder)
+    if pids:
+        print(f"{args.version} is running (pid {', '.join(map(str, pids))}), close it before uninstalling", file=sys.stderr)
+        return 1
+    if not app.uninstall_version(engine_folder):
+        print(f"Failed to uninstall {args.version}, see {app.config.logfile}", file=sys.stderr)
+        return 1
+    # Don't leave the deletion half done when the process exits
+    app.trash.wait()
+    print(f"Uninstalled {args.version}")
+    return 0
+
+
+def launch_version(app, args):
+    if args.project:
+        app.projects.scan()
+        project = app.projects.find(args.project)
+        if not project:
+            print(f"No project '{args.project}' found, check `project_roots` or pass its folder", file=sys.stderr)
+            return 1
+        return 0 if app.launch_project(project, args.version) else 1
+
+    version = args.version or app.config.get_selected_version()
+    if not version or not app.config.version_is_installed(version):
+        print(f"'{version}' is not installed", file=sys.stderr)
+        return 1
+    return 0 if app.launch(app.config.get_engine_version_path(version)) else 1
+
+
+def list_processes(app, args):
+    # Launched by other launcher runs or by hand too, so found through /proc instead of the supervisor's sessions
+    rows = []
+    for version in app.config.get_installed_versions():
+        for pid in supervisor.find_processes_using(app.config.get_engine_version_path(version)):
+            try:
+                cpu_time, rss, _ = supervisor.read_proc_sample(pid)
+            except (OSError, ValueError, IndexError):
+                continue
+            rows.append((version, pid, rss, cpu_time))
+    if not rows:
+        print("No engines running")
+        return 0
+    print(f"{'version':<28}{'pid':>8}{'memory':>12}{'cpu time':>12}")
+    for version, pid, rss, cpu_time in rows:
+        print(f"{version:<28}{pid:>8}{utils.convert_bytes(rss):>12}{utils.format_duration(cpu_time):>12}")
+    return 0
+
+
+def list_projects(app, args):
+    projects = app.projects.scan(args.roots)
+    if not projects:
+        print("No projects found, set `project_roots` in config.ini or pass --root")
+        return 0
+    for project in projects:
+        engine = project["engine"]
+        required = "?" if not engine else ".".join(str(part) for part in engine if part is not None)
+        if project["mono"]:
+            required += " C#"
+        match = app.projects.match_engine(project) or "(no installed match)"
+        print(f"{project['name']:<32}{required:<10}{match:<28}{project['path']}")
+    return 0
+
+
+def prewarm_version(app, args):
+    version = args.version or app.config.get_selected_version()
+    if not version or not app.config.version_is_installed(version):
+        print(f"'{version}' is not installed", file=sys.stderr)
+        return 1
+    # In the foreground, e.g. from a login script, so it runs whatever the config says
+    prewarm.lower_io_priority()
+    covered = app.prewarmer.prewarm(app.config.get_engine_version_path(version))
+    print(f"Prewarmed {utils.convert_bytes(covered)} of {version}")
+    return 0
+
+
+def refresh_versions(app, args):
+    # Asked for explicitly, so it runs even if the API quota is low
+    available_versions = app.config.refresh_available_versions(urgent=True)
+    if available_versions is None:
+        print("Could not refresh the release catalog", file=sys.stderr)
+        return 1
+    print(f"{len(available_versions)} versions available")
+    return 0
+
+
+def report_metrics(app, args):
+    records = telemetry.load_records(app.config.metrics_file)
+    if args.phase:
+        records = [record for record in records if record["phase"] == args.phase]
+    if args.sessions:
+        recent_sessions = list(dict.fromkeys(record["session"] for record in reversed(records)))[:args.sessions]
+        records = [record for record in records if record["session"] in recent_sessions]
+    if not records:
+        print(f"No metrics recorded yet in {app.config.metrics_file}")
+        return 0
+
+    summaries = telemetry.summarize(records, args.split_by)
+
+    def seconds(value):
+        return "-" if value is None else f"{value:.3f}s"
+
+    def throughput(value):
+        return "-" if value is None else f"{utils.convert_bytes(value)}/s"
+
+    width = max(16, max(len(phase) for phase in summaries) + 2)
+    print(f"{'phase':<{width}}{'runs':>6}{'failed':>8}{'retries':>9}{'p50':>11}{'p95':>11}{'p50 rate':>15}{'p95 rate':>15}")
+    for phase, summary in summaries.items():
+        failed = summary["failed"] + summary["cancelled"]
+        print(f"{phase:<{width}}{summary['count']:>6}{failed:>8}{summary['retries']:>9}"
+              f"{seconds(summary['p50']):>11}{seconds(summary['p95']):>11}"
+              f"{throughput(summary['p50_throughput']):>15}{throughput(summary['p95_throughput']):>15}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="godot_launcher", description="Manage and launch Godot engine versions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="List installed versions")
+    list_parser.add_argument("--available", action="store_true", help="Also list versions available to install")
+    list_parser.set_defaults(handler=list_versions)
+
+    install_parser = commands.add_parser("install", help="Download and install one or more versions")
+    install_parser.add_argument("versions", nargs="+", metavar="version")
+    install_parser.add_argument("--mono", action="store_true", help="Install the C# (mono) build")
+    install_parser.add_argument("--jobs", type=int, help="Maximum number of parallel installs")
+    install_parser.set_defaults(handler=install_version)
+
+    uninstall_parser = commands.add_parser("uninstall", help="Remove an installed version")
+    uninstall_parser.add_argument("version", help="Installed name, e.g. '4.2-stable (mono)'")
+    uninstall_parser.set_defaults(handler=uninstall_version)
+
+    launch_parser = commands.add_parser("launch", help="Start an installed engine")
+    launch_parser.add_argument("version", nargs="?",
+                               help="Defaults to the selected version, or the best match for --project")
+    launch_parser.add_argument("--project", help="Name or folder of a project to open in the editor")
+    launch_parser.set_defaults(handler=launch_version)
+
+    ps_parser = commands.add_parser("ps", help="List running engines with their memory and CPU time")
+    ps_parser.set_defaults(handler=list_processes)
+
+    projects_parser = commands.add_parser("projects", help="List projects and the engine each one would open with")
+    projects_parser.add_argument("--root", dest="roots", action="append", help="Search here instead of `project_roots`")
+    projects_parser.set_defaults(handler=list_projects)
+
+    prewarm_parser = commands.add_parser("prewarm", help="Read an engine into the page cache ahead of a launch")
+    prewarm_parser.add_argument("version", nargs="?", help="Defaults to the selected version")
+    prewarm_parser.set_defaults(handler=prewarm_version)
+
+    refresh_parser = commands.add_parser("refresh", help="Refresh the release catalog")
+    refresh_parser.set_defaults(handler=refresh_versions)
+
+    report_parser = commands.add_parser("report", help="Summarize recorded timings per phase")
+    report_parser.add_argument("--phase", help="Only this phase, e.g. 'download'")
+    report_parser.add_argument("--sessions", type=int, help="Only the last N launcher runs")
+    report_parser.add_argument("--split-by", help="Split phases by a recorded field, e.g. 'prewarmed'")
+    report_parser.set_defaults(handler=report_metrics)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    app = create_app(headless=True)
+    app.config.initialize()
+    app.apply_config()
+    # Pick up versions added or removed by hand since the last run
+    app.registry.reconcile()
+    app.trash.resume()
+    if getattr(args, "jobs", None):
+        app.scheduler.max_parallel = args.jobs
+    exit_code = args.handler(app, args)
+    app.config.flush_config()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
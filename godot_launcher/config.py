@@ -2,7 +2,9 @@ import os
 import sys
 from datetime import datetime
 from configparser import ConfigParser
-from godot_launcher import utils
+from godot_launcher import utils, http_client
+from godot_launcher.config_store import ConfigStore
+from godot_launcher.versions import VersionIndex
 from godot_launcher.exceptions import *
 
 class Config():
@@ -12,13 +14,26 @@ class Config():
         self.cfg = ConfigParser()
         self.app_dir, self.config_file = self.get_app_dir()
         self.logfile = os.path.join(self.app_dir, "launcher.log")
+        self.metrics_file = os.path.join(self.app_dir, "metrics.jsonl")
+        self.download_dir = os.path.join(self.app_dir, "downloads")
+        self.config_store = ConfigStore(self.cfg, self.config_file)
+        self.catalog_is_stale = False
+        self.version_index = VersionIndex()
 
     def initialize(self):
+        """Read (or create) the config without touching the network.
+
+        The cached 'AvailableVersions' are used as they are, `catalog_is_stale`
+        tells the UI whether to refresh them in the background.
+        """
         if not os.path.exists(self.config_file):
             self.create_initial_config()
+            self.catalog_is_stale = True
             self.app.logger.info("Config file created successfully")
         else:
             self.cfg.read(self.config_file)
+            if not self.cfg.has_section("Executables"):
+                self.cfg["Executables"] = {}
             last_ran = self.cfg["Config"]["last_run"]
             now = datetime.now().strftime(self.time_format)
             self.cfg["Config"]["last_run"] = now
@@ -29,31 +44,9 @@ class Config():
             or the initial 'AvailableVersions' config was blank, indicating it failed
             when running for the first time
             """
-            
-            scanned_this_init = False                       
-            if utils.time_diff_greater_than(last_ran, now, 1):
-                scanned_this_init = True
-                available_versions = {}
-                try:
-                    available_versions = self.app.scraper.get_release_versions()
-                except APIError as e:
-                    self.app.logger.error(e)
-                
-                if available_versions:
-                    self.cfg["AvailableVersions"] = available_versions
-                
-            
-            if not last_versions and not scanned_this_init:
-                
-                available_versions = {}
-                try:
-                    available_versions = self.app.scraper.get_release_versions()
-                except APIError as e:
-                    self.app.logger.error(e)
-                
-                if available_versions:
-                    self.cfg["AvailableVersions"] = available_versions
+            self.catalog_is_stale = utils.time_diff_greater_than(last_ran, now, 1) or not last_versions
 
+        self.rebuild_version_index()
         self.save_config()
         self.app.logger.info("Config file read successfully")
 
@@ -61,34 +54,144 @@ class Config():
         """ Runs when no `config.ini` file is found"""
         installed, latest = self.import_installed_versions()
         
-        available_versions = {}
-        try:
-            available_versions = self.app.scraper.get_release_versions()
-        except APIError as e:
-            self.app.logger.error(e)
-            
-        
         self.cfg["InstalledVersions"] = installed
-        self.cfg["AvailableVersions"] = available_versions
+        self.cfg["AvailableVersions"] = {}
+        self.cfg["Executables"] = {}
         self.cfg["Config"] = {
             "last_run":datetime.now().strftime(self.time_format),
             "selected_version":"",
-            "latest_installed_version":latest
+            "latest_installed_version":latest,
+            "streaming_install":"true",
+            "use_object_store":"false",
+            "progress_frequency":"30",
+            "catalog_timeout":"10",
+            "max_parallel_installs":"3",
+            "verify_checksums":"true",
+            "archive_cache_size_mb":"2048",
+            "shared_archive_cache":"",
+            "github_token":"",
+            "http_retries":"3",
+            "api_rate_limit":"",
+            "collect_metrics":"true",
+            "prewarm_selected_version":"false",
+            "project_roots":""
         }
         if latest:
             self.cfg["Config"]["selected_version"] = latest
         
         self.save_config()
     
+    def refresh_available_versions(self, urgent=False):
+        """Pull the release catalog, called from a worker thread.
+
+        Args:
+            urgent: Refresh even if the GitHub API quota is nearly spent,
+                background refreshes are deferred until it resets instead.
+
+        Returns:
+            The new dict of version names and urls, or None if the refresh failed.
+        """
+        if not urgent and http_client.client.should_defer():
+            wait = http_client.client.get_seconds_until_reset()
+            self.app.logger.info(f"GitHub API quota is spent, deferring the catalog refresh for {wait:.0f}s")
+            return None
+        try:
+            available_versions = self.app.scraper.get_release_versions(timeout=self.get_catalog_timeout())
+        except APIError as e:
+            self.app.logger.error(e)
+            return None
+        finally:
+            self.save_rate_limit()
+        
+        if not available_versions:
+            return None
+        with self.config_store.lock:
+            self.cfg["AvailableVersions"] = available_versions
+        self.version_index.rebuild_available(self.cfg["AvailableVersions"])
+        self.catalog_is_stale = False
+        self.save_config()
+        return available_versions
+    
+    def rebuild_version_index(self):
+        self.version_index.rebuild_available(self.cfg["AvailableVersions"])
+        self.version_index.rebuild_installed(self.cfg["InstalledVersions"])
+    
     def get_installed_versions(self):
-        return [name for name, _ in self.cfg["InstalledVersions"].items()]
+        """Installed version names, newest first"""
+        return self.version_index.sorted_installed()
     
     def get_available_versions(self):        
-        return [name for name, _ in self.cfg["AvailableVersions"].items()]
+        """Available version names, newest first"""
+        return self.version_index.sorted_available()
         
     def get_selected_version(self):
         return self.cfg["Config"]["selected_version"]
     
+    def get_streaming_install(self):
+        return self.cfg["Config"].getboolean("streaming_install", fallback=True)
+    
+    def get_use_object_store(self):
+        return self.cfg["Config"].getboolean("use_object_store", fallback=False)
+    
+    def get_progress_frequency(self):
+        return self.cfg["Config"].getint("progress_frequency", fallback=30)
+    
+    def get_catalog_timeout(self):
+        return self.cfg["Config"].getfloat("catalog_timeout", fallback=10)
+    
+    def get_max_parallel_installs(self):
+        return self.cfg["Config"].getint("max_parallel_installs", fallback=3)
+    
+    def get_verify_checksums(self):
+        return self.cfg["Config"].getboolean("verify_checksums", fallback=True)
+    
+    def get_archive_cache_size(self):
+        """Archive cache cap in bytes, 0 disables the local cache"""
+        return self.cfg["Config"].getint("archive_cache_size_mb", fallback=2048) * 1024 * 1024
+    
+    def get_shared_archive_cache(self):
+        """Read-only archive cache folder to try before downloading, None if unset"""
+        return self.cfg["Config"].get("shared_archive_cache", fallback="") or None
+    
+    def get_github_token(self):
+        """Token sent to the GitHub API for a higher rate limit, falls back to $GITHUB_TOKEN"""
+        return self.cfg["Config"].get("github_token", fallback="") or os.getenv("GITHUB_TOKEN") or None
+    
+    def get_http_retries(self):
+        return self.cfg["Config"].getint("http_retries", fallback=3)
+    
+    def get_collect_metrics(self):
+        return self.cfg["Config"].getboolean("collect_metrics", fallback=True)
+    
+    def get_prewarm_selected_version(self):
+        return self.cfg["Config"].getboolean("prewarm_selected_version", fallback=False)
+    
+    def get_project_roots(self):
+        """Folders searched for Godot projects, separated like $PATH"""
+        roots = self.cfg["Config"].get("project_roots", fallback="")
+        return [root for root in roots.split(os.pathsep) if root]
+    
+    def get_api_rate_limit(self):
+        """(remaining, reset timestamp) of the GitHub API quota seen last run, None if unknown"""
+        entry = self.cfg["Config"].get("api_rate_limit", fallback="")
+        if not entry:
+            return None
+        try:
+            remaining, reset = entry.split("|")
+            return int(remaining), int(reset)
+        except ValueError:
+            # Cut short or edited by hand, the next API response tells us again
+            self.app.logger.warning(f"Ignoring unreadable api_rate_limit '{entry}'")
+            return None
+    
+    def save_rate_limit(self):
+        client = http_client.client
+        if client.rate_limit_reset is None:
+            return
+        with self.config_store.lock:
+            self.cfg["Config"]["api_rate_limit"] = f"{client.rate_limit_remaining}|{client.rate_limit_reset}"
+        self.save_config()
+    
     def get_version_url(self, version):
         return self.cfg["AvailableVersions"][version]
         
@@ -97,19 +200,66 @@ class Config():
         if use_mono:
             base_dir = "mono"
             
-        for key, val in self.cfg["AvailableVersions"].items():
-            if val == version_url:
-                engine_folder = os.path.join(self.app_dir, base_dir, key)
-                return engine_folder
+        version = self.version_index.get_name_for_url(version_url)
+        if version:
+            engine_folder = os.path.join(self.app_dir, base_dir, version)
+            return engine_folder
                 
     def get_engine_version_path(self, version):
         return self.cfg["InstalledVersions"][version]
     
-    def update_installed_versions(self):
-        installed, latest = self.import_installed_versions()
-        self.cfg["InstalledVersions"] = installed
-        self.cfg["Config"]["latest_installed_version"] = latest
-        self.cfg["Config"]["selected_version"] = latest
+    def get_engine_executable(self, engine_folder):
+        """Executable recorded for an engine folder, None if unknown or changed since.
+        
+        Entries are stored as "path|size|mtime_ns", checking them costs one
+        `os.stat` instead of a walk of the engine folder.
+        """
+        entry = self.cfg["Executables"].get(self.get_executable_key(engine_folder))
+        if not entry:
+            return None
+        executable_path, size, mtime_ns = entry.rsplit("|", 2)
+        try:
+            stat = os.stat(executable_path)
+        except OSError:
+            return None
+        if stat.st_size != int(size) or stat.st_mtime_ns != int(mtime_ns):
+            return None
+        return executable_path
+    
+    def set_engine_executable(self, engine_folder, executable_path):
+        stat = os.stat(executable_path)
+        with self.config_store.lock:
+            self.cfg["Executables"][self.get_executable_key(engine_folder)] = f"{executable_path}|{stat.st_size}|{stat.st_mtime_ns}"
+        self.save_config()
+    
+    def get_executable_key(self, engine_folder):
+        # Keys are lowercased by ConfigParser, version folder names already are
+        return os.path.relpath(engine_folder, self.app_dir).replace(os.sep, "/")
+    
+    def apply_installed_changes(self, added, removed):
+        """Apply a delta from the `InstalledRegistry` instead of rescanning the version folders.
+        
+        Args:
+            added: Mapping of newly installed names to their engine folder.
+            removed: Names that are no longer installed.
+        """
+        with self.config_store.lock:
+            for name in removed:
+                engine_folder = self.cfg["InstalledVersions"].pop(name, None)
+                if engine_folder:
+                    self.cfg["Executables"].pop(self.get_executable_key(engine_folder), None)
+            for name, engine_folder in added.items():
+                self.cfg["InstalledVersions"][name] = engine_folder
+            self.version_index.rebuild_installed(self.cfg["InstalledVersions"])
+            
+            latest = self.version_index.sorted_installed()[0] if self.version_index.installed else ""
+            self.cfg["Config"]["latest_installed_version"] = latest
+            if added:
+                # A fresh install becomes the selection, the newest one if several appeared at once
+                self.cfg["Config"]["selected_version"] = next(
+                    name for name in self.version_index.sorted_installed() if name in added)
+            elif not self.version_is_installed(self.cfg["Config"]["selected_version"]):
+                self.cfg["Config"]["selected_version"] = latest
         
         self.save_config()
         
@@ -130,9 +280,16 @@ class Config():
         
     def get_app_dir(self):
         appdata_dir = os.getenv('APPDATA')
+        if not appdata_dir:
+            # Linux / macOS equivalents of %APPDATA%
+            if sys.platform == "darwin":
+                appdata_dir = os.path.expanduser("~/Library/Application Support")
+            else:
+                appdata_dir = os.getenv('XDG_DATA_HOME') or os.path.expanduser("~/.local/share")
         app_dir = os.path.join(appdata_dir, "godot_launcher")
         version_dir = os.path.join(app_dir, "versions")
         mono_dir = os.path.join(app_dir, "mono")
+        download_dir = os.path.join(app_dir, "downloads")
         config_file = os.path.join(app_dir, "config.ini")
         
         if not os.path.exists(app_dir):
@@ -141,27 +298,27 @@ class Config():
             os.makedirs(version_dir)        
         if not os.path.exists(mono_dir):
             os.makedirs(mono_dir)
+        if not os.path.exists(download_dir):
+            os.makedirs(download_dir)
 
         return app_dir, config_file
     
     def version_is_installed(self, version):
-        if version in [name for name, _ in self.cfg["InstalledVersions"].items()]:
-            return True
-        else:
-            return False
+        return self.version_index.is_installed(version)
     
     def set_selected_version(self, version):
-        self.cfg["Config"]["selected_version"] = version
+        if self.cfg["Config"]["selected_version"] == version:
+            return
+        with self.config_store.lock:
+            self.cfg["Config"]["selected_version"] = version
         self.save_config()
     
     def get_installed_version_path(version):
         return self.cfg["InstalledVersions"][version]
         
     def save_config(self):
-        with open(self.config_file, 'w') as configfile:
-            self.cfg.write(configfile)
-        self.app.logger.info("Config saved successfully")
-            
+        """Schedule a write of `config.ini`, see `ConfigStore`"""
+        self.config_store.mark_dirty()
     
-
-        
\ No newline at end of file
+    def flush_config(self):
+        self.config_store.flush()
@@ -0,0 +1,57 @@
+import os
+import atexit
+import logging
+import threading
+from godot_launcher.telemetry import metrics
+
+
+class ConfigStore():
+    """Write-behind persistence for the launcher's `ConfigParser`.
+
+    Mutations only mark the config dirty, a timer flushes all of them in one
+    write at most `flush_delay` seconds later, and whatever is still pending
+    is flushed at exit. Writes go to a temp file that replaces `config.ini`
+    with `os.replace`, so a crash mid-write never leaves a truncated config.
+    `lock` serializes writers and must be held while mutating the parser from
+    worker threads.
+    """
+    logger = logging.getLogger("Config")
+
+    def __init__(self, cfg, config_file, flush_delay=1.0):
+        self.cfg = cfg
+        self.config_file = config_file
+        self.flush_delay = flush_delay
+        self.lock = threading.RLock()
+        self.dirty = False
+        self.timer = None
+        atexit.register(self.flush)
+
+    def mark_dirty(self):
+        with self.lock:
+            self.dirty = True
+            if self.timer is None:
+                self.timer = threading.Timer(self.flush_delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.dirty:
+                return
+
+            temp_file = f"{self.config_file}.tmp"
+            try:
+                with metrics.span("config_save") as span:
+                    with open(temp_file, 'w') as configfile:
+                        self.cfg.write(configfile)
+                        configfile.flush()
+                        os.fsync(configfile.fileno())
+                        span.add(bytes=configfile.tell())
+                    os.replace(temp_file, self.config_file)
+                self.dirty = False
+                self.logger.info("Config saved successfully")
+            except OSError as e:
+                self.logger.error(f"Could not save config: {e}")
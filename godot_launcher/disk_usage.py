@@ -0,0 +1,132 @@
+import os
+import logging
+import threading
+from godot_launcher import utils
+from godot_launcher.events import bus
+
+
+class DiskUsageService():
+    """Measures the disk usage of installed engines in the background.
+
+    Every folder of an engine is listed by a pool of `scandir` workers. The
+    result is cached per folder as (mtime, bytes of the files directly in
+    it): adding or removing an entry changes a folder's mtime, so on the
+    next measurement only folders whose mtime moved have their files
+    stat'ed again, the others are only listed to find their subfolders.
+
+    Sizes are published as "disk_usage" events, the UI never waits on a
+    measurement. Measurements follow the "installed_changed" events of the
+    `InstalledRegistry`, so installs and uninstalls update the totals on
+    their own.
+    """
+    logger = logging.getLogger("DiskUsage")
+
+    def __init__(self, app, workers=8):
+        self.app = app
+        self.cache_file = os.path.join(app.config.app_dir, "disk_usage.json")
+        self.workers = workers
+        self.cache = {}
+        self.scan_pool = None
+        self.job_pool = None
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        self.cache = utils.read_json(self.cache_file, self.logger, "disk usage cache") or {}
+
+    def save(self):
+        with self.lock:
+            utils.write_json_atomic(self.cache_file, self.cache, self.logger, "disk usage cache")
+
+    def start(self):
+        """Measure every installed engine, then follow install changes"""
+        # Deferred like the other worker pools, startup doesn't need them
+        from concurrent.futures import ThreadPoolExecutor
+        self.scan_pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="DiskUsageScan")
+        # Engines are measured one at a time, each one fans out over the scan pool
+        self.job_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DiskUsage")
+        bus.subscribe(self.on_event)
+        self.prune()
+        self.request(self.app.config.version_index.installed.values())
+
+    def stop(self):
+        bus.unsubscribe(self.on_event)
+        for pool in (self.job_pool, self.scan_pool):
+            if pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def on_event(self, event):
+        if event.kind != "installed_changed":
+            return
+        if event.data["removed"]:
+            self.prune()
+            bus.emit("disk_usage", None, size=0)
+        installed = self.app.config.version_index.installed
+        self.request(installed[name] for name in event.data["added"] if name in installed)
+
+    def request(self, engine_folders):
+        for engine_folder in engine_folders:
+            self.job_pool.submit(self.measure, engine_folder)
+
+    def get_size(self, engine_folder):
+        """Last known size of an engine folder in bytes, None if it was never measured"""
+        entry = self.cache.get(engine_folder)
+        return entry["size"] if entry else None
+
+    def get_total(self):
+        installed = self.app.config.version_index.installed.values()
+        return sum(self.cache[folder]["size"] for folder in installed if folder in self.cache)
+
+    def prune(self):
+        installed = set(self.app.config.version_index.installed.values())
+        with self.lock:
+            for engine_folder in list(self.cache):
+                if engine_folder not in installed:
+                    del self.cache[engine_folder]
+
+    def measure(self, engine_folder):
+        from concurrent.futures import wait, FIRST_COMPLETED
+        cached_dirs = self.cache.get(engine_folder, {}).get("dirs", {})
+        dirs = {}
+        total_size = 0
+        reused = 0
+        futures = {self.scan_pool.submit(self.scan_dir, engine_folder, cached_dirs.get(engine_folder))}
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    path, mtime, size, subdirs, was_cached = future.result()
+                except OSError as e:
+                    # Removed while we were looking, the next event will take care of it
+                    self.logger.debug(f"Skipping {engine_folder} folder: {e}")
+                    continue
+                dirs[path] = [mtime, size]
+                total_size += size
+                reused += was_cached
+                for subdir in subdirs:
+                    futures.add(self.scan_pool.submit(self.scan_dir, subdir, cached_dirs.get(subdir)))
+
+        if not dirs:
+            return
+        with self.lock:
+            self.cache[engine_folder] = {"size": total_size, "dirs": dirs}
+        self.save()
+        self.logger.info(f"{engine_folder}: {total_size} bytes in {len(dirs)} folders ({reused} unchanged)")
+        bus.emit("disk_usage", engine_folder, size=total_size)
+
+    def scan_dir(self, path, cached):
+        """Returns (path, mtime, bytes of its files, subfolders, whether the cache was reused)"""
+        # Read the mtime before listing, a change during the listing then shows up next time
+        mtime = os.stat(path).st_mtime_ns
+        subdirs = []
+        size = 0
+        reuse = cached is not None and cached[0] == mtime
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif not reuse:
+                    size += entry.stat(follow_symlinks=False).st_size
+        if reuse:
+            size = cached[1]
+        return path, mtime, size, subdirs, reuse
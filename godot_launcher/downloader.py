@@ -0,0 +1,231 @@
+import os
+import json
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from godot_launcher.http_client import client
+from godot_launcher.telemetry import metrics
+from godot_launcher.exceptions import *
+
+
+class RangedDownloader():
+    """Download a file over several concurrent HTTP `Range` requests.
+
+    The file is split into fixed size chunks that are fetched by a small pool
+    of connections and written straight to their offset in the destination.
+    A sidecar journal (`<destination>.journal`) records every completed chunk,
+    so an interrupted or crashed download picks up where it stopped instead
+    of starting from zero. Servers that don't support ranges get a plain
+    single stream.
+
+    An optional `hasher` (any `hashlib` object) is fed the file in order while
+    it downloads: the chunk at the hashing frontier is hashed from the network
+    blocks directly, and only chunks that finished ahead of the frontier are
+    read back, while they are still in the page cache.
+    """
+    logger = logging.getLogger("Downloader")
+    chunk_size = 4 * 1024 * 1024
+    block_size = 64 * 1024
+    chunk_retries = 3
+    timeout = 30
+    # Byte ranges only make sense on the file itself, never on a compressed transfer
+    base_headers = {"Accept-Encoding": "identity"}
+
+    def __init__(self, url, destination, connections=4, progress_callback=None, hasher=None):
+        self.url = url
+        self.destination = destination
+        self.journal_file = f"{destination}.journal"
+        self.connections = connections
+        self.progress_callback = progress_callback
+        self.total_size = 0
+        self.downloaded = 0
+        self.resumed_size = 0
+        self.completed_chunks = set()
+        self.lock = threading.Lock()
+        self.hasher = hasher
+        self.hashed_size = 0
+        self.hash_lock = threading.Lock()
+
+    def download(self):
+        """Download `url` to `destination`, resuming from the journal if possible"""
+        # A one byte range probe tells us the size and whether ranges work at all
+        response = client.get(self.url, headers={**self.base_headers, "Range": "bytes=0-0"},
+                              timeout=self.timeout, stream=True)
+        response.raise_for_status()
+
+        content_range = response.headers.get("Content-Range", "")
+        accepts_ranges = response.status_code == 206 or response.headers.get("Accept-Ranges") == "bytes"
+        if response.status_code != 206 or "/" not in content_range or not accepts_ranges:
+            self.logger.info(f"Server does not support ranges, using a single stream for {self.url}")
+            self.download_single_stream(response)
+            return
+
+        # Reading the one byte body hands the connection back to the pool for the chunks
+        response.content
+        self.total_size = int(content_range.rsplit("/", 1)[1])
+        # Follow redirects once instead of once per chunk
+        resolved_url = response.url
+        validator = response.headers.get("ETag") or response.headers.get("Last-Modified") or ""
+
+        self.load_journal(validator)
+        chunks = self.get_chunks()
+        pending = [chunk for chunk in chunks if chunk[0] not in self.completed_chunks]
+        self.downloaded = sum(end - start + 1 for index, start, end in chunks if index in self.completed_chunks)
+        self.resumed_size = self.downloaded
+        if self.completed_chunks:
+            self.logger.info(f"Resuming download of {self.url}: {len(self.completed_chunks)}/{len(chunks)} chunks already done")
+
+        mode = 'r+b' if self.completed_chunks and os.path.exists(self.destination) else 'wb'
+        with open(self.destination, mode) as f:
+            f.truncate(self.total_size)
+        self.write_journal(validator)
+        # Chunks restored from the journal have to be hashed from disk
+        self.hash_completed_chunks()
+
+        # Retries on the chunk workers count towards the caller's span
+        span = metrics.get_current()
+        with ThreadPoolExecutor(max_workers=self.connections) as executor:
+            futures = [executor.submit(self.download_chunk, resolved_url, chunk, validator, span) for chunk in pending]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                # Don't start the remaining chunks after a failure or cancellation
+                executor.shutdown(cancel_futures=True)
+                raise
+
+        self.report_progress(0)
+        os.remove(self.journal_file)
+        self.hash_completed_chunks()
+        if self.hasher and self.hashed_size != self.total_size:
+            raise DownloadError(f"Only {self.hashed_size} of {self.total_size} bytes were hashed")
+
+    def get_chunks(self):
+        chunks = []
+        for index, start in enumerate(range(0, self.total_size, self.chunk_size)):
+            end = min(start + self.chunk_size, self.total_size) - 1
+            chunks.append((index, start, end))
+        return chunks
+
+    def download_chunk(self, url, chunk, validator, span=None):
+        with metrics.bind(span):
+            self.download_chunk_with_retries(url, chunk, validator)
+
+    def download_chunk_with_retries(self, url, chunk, validator):
+        index, start, end = chunk
+        last_error = None
+        for attempt in range(self.chunk_retries):
+            written = 0
+            try:
+                headers = {**self.base_headers, "Range": f"bytes={start}-{end}"}
+                with client.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                    if response.status_code != 206 or not response.headers.get("Content-Range", "").startswith(f"bytes {start}-"):
+                        raise DownloadError(f"Server ignored range {start}-{end}")
+                    with open(self.destination, 'r+b') as f:
+                        f.seek(start)
+                        for block in response.iter_content(self.block_size):
+                            f.write(block)
+                            if self.hasher:
+                                self.hash_block(f, start, start + written, block)
+                            written += len(block)
+                            self.report_progress(len(block))
+                if written != end - start + 1:
+                    raise DownloadError(f"Chunk {index} ended after {written} of {end - start + 1} bytes")
+
+                with self.lock:
+                    self.completed_chunks.add(index)
+                    self.write_journal(validator)
+                self.hash_completed_chunks()
+                return
+
+            except (OSError, DownloadError) as e:
+                # Take back the partial progress of the failed attempt before retrying
+                self.report_progress(-written)
+                last_error = e
+                metrics.add(retries=1)
+                self.logger.warning(f"Chunk {index} attempt {attempt + 1} failed: {e}")
+
+        raise DownloadError(f"Could not download chunk {index} of {self.url}: {last_error}")
+
+    def download_single_stream(self, response):
+        self.total_size = int(response.headers.get("Content-Length") or 0)
+        with response, open(self.destination, 'wb') as f:
+            for block in response.iter_content(self.block_size):
+                f.write(block)
+                if self.hasher:
+                    self.hasher.update(block)
+                self.report_progress(len(block))
+
+        if self.total_size and self.downloaded != self.total_size:
+            raise DownloadError(f"Download ended after {self.downloaded} of {self.total_size} bytes")
+
+    def hash_block(self, f, chunk_start, position, block):
+        """Hash a block just written at `position`, if the hash frontier is inside its chunk"""
+        end = position + len(block)
+        with self.hash_lock:
+            if not chunk_start <= self.hashed_size < end:
+                return
+            if self.hashed_size < position:
+                # The frontier reached this chunk after its first blocks were written
+                f.flush()
+                self.hash_file_range(self.hashed_size, position)
+            self.hasher.update(block[self.hashed_size - position:])
+            self.hashed_size = end
+
+    def hash_completed_chunks(self):
+        """Advance the hash frontier over chunks that finished ahead of it"""
+        if not self.hasher:
+            return
+        with self.hash_lock:
+            while self.hashed_size < self.total_size:
+                index = self.hashed_size // self.chunk_size
+                if index not in self.completed_chunks:
+                    break
+                self.hash_file_range(self.hashed_size, min((index + 1) * self.chunk_size, self.total_size))
+
+    def hash_file_range(self, start, end):
+        with open(self.destination, 'rb') as f:
+            f.seek(start)
+            while start < end:
+                data = f.read(min(self.block_size, end - start))
+                if not data:
+                    raise DownloadError(f"{self.destination} is shorter than expected")
+                self.hasher.update(data)
+                start += len(data)
+        self.hashed_size = end
+
+    def report_progress(self, block_length):
+        with self.lock:
+            self.downloaded += block_length
+            downloaded = self.downloaded
+        if self.progress_callback:
+            self.progress_callback(downloaded, self.total_size)
+
+    def load_journal(self, validator):
+        """Restore completed chunks, unless the remote file changed since"""
+        self.completed_chunks = set()
+        if not os.path.exists(self.journal_file) or not os.path.exists(self.destination):
+            return
+        try:
+            with open(self.journal_file, 'r') as f:
+                journal = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable download journal: {e}")
+            return
+
+        if (journal.get("url") == self.url and journal.get("size") == self.total_size
+                and journal.get("validator") == validator and journal.get("chunk_size") == self.chunk_size):
+            self.completed_chunks = set(journal.get("completed", []))
+
+    def write_journal(self, validator):
+        journal = {
+            "url": self.url,
+            "size": self.total_size,
+            "validator": validator,
+            "chunk_size": self.chunk_size,
+            "completed": sorted(self.completed_chunks),
+        }
+        temp_file = f"{self.journal_file}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(journal, f)
+        os.replace(temp_file, self.journal_file)
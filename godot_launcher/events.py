@@ -0,0 +1,137 @@
+import time
+import logging
+import threading
+
+
+class Event():
+    """A single update published on the `EventBus`.
+
+    Progress events carry `current`/`total` in bytes plus a smoothed
+    throughput (bytes per second) and an ETA in seconds, other events only
+    use `kind` and `operation_id`.
+    """
+    def __init__(self, kind, operation_id, current=0, total=0, rate=0.0, eta=None, data=None):
+        self.kind = kind
+        self.operation_id = operation_id
+        self.current = current
+        self.total = total
+        self.rate = rate
+        self.eta = eta
+        self.data = data or {}
+
+    def __repr__(self):
+        return f"Event({self.kind}, {self.operation_id}, {self.current}/{self.total})"
+
+
+class ProgressTracker():
+    """Coalescing state of one (operation, kind) progress stream"""
+    smoothing = 0.3
+
+    def __init__(self):
+        self.last_emit_time = 0.0
+        self.last_sample_time = time.monotonic()
+        self.last_sample_bytes = 0
+        self.rate = 0.0
+        self.current = 0
+        self.total = 0
+        self.pending = False
+
+    def sample(self, now):
+        elapsed = now - self.last_sample_time
+        if elapsed > 0:
+            instant_rate = max(0, self.current - self.last_sample_bytes) / elapsed
+            if self.rate:
+                self.rate = self.smoothing * instant_rate + (1 - self.smoothing) * self.rate
+            else:
+                self.rate = instant_rate
+        self.last_sample_time = now
+        self.last_sample_bytes = self.current
+
+    def get_eta(self):
+        if not self.rate or not self.total:
+            return None
+        return max(0, self.total - self.current) / self.rate
+
+
+class EventBus():
+    """Thread-safe publish/subscribe bus for install progress and state changes.
+
+    Progress is coalesced per operation: no matter how often a downloader
+    reports, subscribers see at most `frequency` updates per second for each
+    operation, plus the final one when the total is known. Subscribers are
+    plain callables, so headless code can listen directly while the UI
+    bridges them into Qt.
+    """
+    logger = logging.getLogger("EventBus")
+
+    def __init__(self, frequency=30):
+        self.frequency = frequency
+        self.subscribers = []
+        self.trackers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, callback):
+        with self.lock:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def dispatch(self, event):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                self.logger.error(f"Event subscriber failed on {event}: {e}")
+
+    def progress(self, operation_id, kind, current, total):
+        """Report progress, dropped if the last update for this operation is too recent"""
+        now = time.monotonic()
+        with self.lock:
+            tracker = self.trackers.get((operation_id, kind))
+            if tracker is None:
+                tracker = self.trackers[(operation_id, kind)] = ProgressTracker()
+            tracker.current = current
+            tracker.total = total
+            # Without a total there is no final update to let through early
+            is_final = total and current >= total
+            if now - tracker.last_emit_time < 1 / max(1, self.frequency) and not is_final:
+                tracker.pending = True
+                return
+            event = self.take_progress_event(operation_id, kind, tracker, now)
+        self.dispatch(event)
+
+    def finish(self, operation_id, kind):
+        """Flush the last coalesced progress of an operation and report it finished"""
+        now = time.monotonic()
+        with self.lock:
+            tracker = self.trackers.pop((operation_id, kind), None)
+            event = None
+            if tracker and tracker.pending:
+                event = self.take_progress_event(operation_id, kind, tracker, now)
+        if event:
+            self.dispatch(event)
+        self.dispatch(Event(f"{kind}_finished", operation_id))
+
+    def discard(self, operation_id):
+        """Forget the progress of an operation that failed or was cancelled, nothing is dispatched"""
+        with self.lock:
+            for key in [key for key in self.trackers if key[0] == operation_id]:
+                del self.trackers[key]
+
+    def emit(self, kind, operation_id, **data):
+        """Publish a non-progress event right away"""
+        self.dispatch(Event(kind, operation_id, data=data))
+
+    def take_progress_event(self, operation_id, kind, tracker, now):
+        tracker.sample(now)
+        tracker.last_emit_time = now
+        tracker.pending = False
+        return Event(kind, operation_id, tracker.current, tracker.total, tracker.rate, tracker.get_eta())
+
+
+bus = EventBus()
@@ -12,4 +12,16 @@ class UnzipError(CustomException):
         
 class APIError(CustomException):
     def __str__(self):
-        return f'API Error -> {self.message}'            
\ No newline at end of file
+        return f'API Error -> {self.message}'            
+        
+class PipelineError(CustomException):
+    def __str__(self):
+        return f'Pipeline Error -> {self.message}'
+        
+class InstallCancelled(CustomException):
+    def __str__(self):
+        return f'Install Cancelled -> {self.message}'
+
+class ChecksumError(CustomException):
+    def __str__(self):
+        return f'Checksum Error -> {self.message}'
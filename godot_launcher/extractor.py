@@ -0,0 +1,175 @@
+import os
+import zlib
+import struct
+import hashlib
+import zipfile
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from godot_launcher.exceptions import *
+
+
+class ParallelExtractor():
+    """Extract a zip archive with a pool of workers.
+
+    Every worker thread opens its own `ZipFile` handle, so entries are
+    inflated and written independently (zlib and file writes release the
+    GIL). Stored entries skip `ZipExtFile` and are copied straight out of the
+    archive with a large buffer. Progress is counted in uncompressed bytes and
+    the callback only fires when the whole percentage changes.
+    
+    With an `ObjectStore`, entries the store already holds are hardlinked
+    instead of being inflated again.
+    """
+    logger = logging.getLogger("Extractor")
+    copy_buffer_size = 1024 * 1024
+
+    def __init__(self, source_file, output_dir, workers=None, progress_callback=None, store=None):
+        self.source_file = source_file
+        self.store = store
+        self.output_dir = output_dir
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.progress_callback = progress_callback
+        self.total_bytes = 0
+        self.extracted_bytes = 0
+        self.file_count = 0
+        self.last_percent = -1
+        self.lock = threading.Lock()
+        self.handles = threading.local()
+        self.open_handles = []
+
+    def extract(self):
+        with zipfile.ZipFile(self.source_file, 'r') as zip_ref:
+            entries = zip_ref.infolist()
+
+        files = []
+        for entry in entries:
+            target_path = get_safe_member_path(self.output_dir, entry.filename)
+            if entry.is_dir():
+                os.makedirs(target_path, exist_ok=True)
+            else:
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                files.append((entry, target_path))
+        self.total_bytes = sum(entry.file_size for entry, _ in files)
+        self.file_count = len(files)
+
+        # Largest first, so the editor binary doesn't end up as the straggler
+        files.sort(key=lambda item: item[0].file_size, reverse=True)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(self.extract_entry, *item) for item in files]
+                try:
+                    for future in futures:
+                        future.result()
+                except BaseException:
+                    executor.shutdown(cancel_futures=True)
+                    raise
+        finally:
+            for handle in self.open_handles:
+                handle.close()
+
+        self.report_progress(0, force=True)
+
+    def get_handles(self):
+        """Per worker `ZipFile` and raw file handles"""
+        if not hasattr(self.handles, "zip_ref"):
+            self.handles.zip_ref = zipfile.ZipFile(self.source_file, 'r')
+            self.handles.raw_file = open(self.source_file, 'rb')
+            with self.lock:
+                self.open_handles.extend([self.handles.zip_ref, self.handles.raw_file])
+        return self.handles.zip_ref, self.handles.raw_file
+
+    def extract_entry(self, entry, target_path):
+        zip_ref, raw_file = self.get_handles()
+        entry_key = self.get_entry_key(raw_file, entry) if self.store else None
+        if entry_key and self.store.link_known(entry_key, target_path):
+            self.report_progress(entry.file_size)
+            return
+        if entry.compress_type == zipfile.ZIP_STORED and not entry.flag_bits & 0x1:
+            self.copy_stored_entry(raw_file, entry, target_path)
+        else:
+            with zip_ref.open(entry) as source, open(target_path, 'wb') as target:
+                while True:
+                    data = source.read(self.copy_buffer_size)
+                    if not data:
+                        break
+                    target.write(data)
+                    self.report_progress(len(data))
+        apply_unix_mode(target_path, entry.create_system, entry.external_attr)
+        if entry_key:
+            self.store.note_entry(target_path, entry_key)
+
+    def seek_to_data(self, raw_file, entry):
+        """Position `raw_file` at the first byte of the entry's (compressed) data"""
+        raw_file.seek(entry.header_offset)
+        header = raw_file.read(30)
+        if header[:4] != b'PK\x03\x04':
+            raise UnzipError(f"Corrupt local header for {entry.filename}")
+        name_length, extra_length = struct.unpack_from('<2H', header, 26)
+        raw_file.seek(name_length + extra_length, os.SEEK_CUR)
+
+    def get_entry_key(self, raw_file, entry):
+        """Object store key of an entry: its compression method, size and the SHA-256 of its compressed bytes.
+
+        The same compressed bytes always inflate to the same file, so a match
+        needs no further check. None for encrypted entries.
+        """
+        if entry.flag_bits & 0x1:
+            return None
+        self.seek_to_data(raw_file, entry)
+        sha = hashlib.sha256()
+        remaining = entry.compress_size
+        while remaining:
+            data = raw_file.read(min(self.copy_buffer_size, remaining))
+            if not data:
+                raise UnzipError(f"Archive ended inside {entry.filename}")
+            remaining -= len(data)
+            sha.update(data)
+        return f"{entry.compress_type}:{entry.file_size}:{sha.hexdigest()}"
+
+    def copy_stored_entry(self, raw_file, entry, target_path):
+        self.seek_to_data(raw_file, entry)
+
+        crc = 0
+        remaining = entry.file_size
+        with open(target_path, 'wb') as target:
+            while remaining:
+                data = raw_file.read(min(self.copy_buffer_size, remaining))
+                if not data:
+                    raise UnzipError(f"Archive ended inside {entry.filename}")
+                remaining -= len(data)
+                crc = zlib.crc32(data, crc)
+                target.write(data)
+                self.report_progress(len(data))
+
+        if crc != entry.CRC:
+            raise UnzipError(f"CRC mismatch for {entry.filename}")
+
+    def report_progress(self, byte_count, force=False):
+        with self.lock:
+            self.extracted_bytes += byte_count
+            percent = int(self.extracted_bytes * 100 / self.total_bytes) if self.total_bytes else 100
+            if percent == self.last_percent and not force:
+                return
+            self.last_percent = percent
+            extracted_bytes = self.extracted_bytes
+        if self.progress_callback:
+            self.progress_callback(extracted_bytes, self.total_bytes)
+
+
+def get_safe_member_path(output_dir, member_name):
+    """Map an archive member name into `output_dir` the way `ZipFile.extract` does"""
+    member_name = member_name.replace('\\', '/')
+    parts = [part for part in member_name.split('/') if part not in ('', '.', '..')]
+    parts = [os.path.splitdrive(part)[1] for part in parts]
+    target_path = os.path.join(output_dir, *parts)
+    if member_name.endswith('/'):
+        target_path = os.path.join(target_path, '')
+    return target_path
+
+
+def apply_unix_mode(target_path, create_system, external_attr):
+    """Restore the executable bits of entries zipped on Unix (Linux/macOS editor binaries)"""
+    mode = (external_attr >> 16) & 0o777
+    if create_system == 3 and mode & 0o111 and os.name == "posix":
+        os.chmod(target_path, mode)
@@ -0,0 +1,79 @@
+import logging
+import threading
+from godot_launcher import utils
+
+
+class HttpCache():
+    """On-disk cache of HTTP validators and parsed payloads, keyed by url.
+
+    Each entry keeps the `ETag` / `Last-Modified` validators of the last
+    full response, the already parsed payload and the url of the next page
+    (from the `Link` header) so an unchanged page answered with a 304 never
+    has to be downloaded or parsed again.
+
+    Entries are stored and pruned by the catalog refresh while installs read
+    them from other threads, every access goes through the lock.
+    """
+    logger = logging.getLogger("HttpCache")
+
+    def __init__(self, cache_file, schema=1):
+        """
+        Args:
+            cache_file: JSON file the cache persists to.
+            schema: Version of the cached payload format, a cache file written
+                with another schema is discarded instead of served.
+        """
+        self.cache_file = cache_file
+        self.schema = schema
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        # A broken cache only costs us a full refresh
+        cache = utils.read_json(self.cache_file, self.logger, "http cache")
+        if isinstance(cache, dict) and cache.get("schema") == self.schema and isinstance(cache.get("entries"), dict):
+            self.entries = cache["entries"]
+
+    def save(self):
+        with self.lock:
+            utils.write_json_atomic(self.cache_file, {"schema": self.schema, "entries": self.entries},
+                                    self.logger, "http cache")
+
+    def get(self, url):
+        with self.lock:
+            return self.entries.get(url)
+
+    def get_pages(self):
+        """Snapshot of every cached entry, safe to iterate while the cache changes"""
+        with self.lock:
+            return list(self.entries.values())
+
+    def conditional_headers(self, url):
+        """Build `If-None-Match` / `If-Modified-Since` headers for a cached url"""
+        headers = {}
+        entry = self.get(url)
+        if not entry:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, response_headers, data, next_url=None):
+        entry = {
+            "etag": response_headers.get("ETag", ""),
+            "last_modified": response_headers.get("Last-Modified", ""),
+            "next": next_url,
+            "data": data,
+        }
+        with self.lock:
+            self.entries[url] = entry
+
+    def prune(self, keep_urls):
+        """Drop entries for pages that are no longer part of the listing"""
+        with self.lock:
+            for url in list(self.entries.keys()):
+                if url not in keep_urls:
+                    del self.entries[url]
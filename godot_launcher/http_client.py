@@ -0,0 +1,154 @@
+import time
+import random
+import logging
+import threading
+from urllib.parse import urlparse
+from godot_launcher.telemetry import metrics
+
+
+class HttpClient():
+    """The one HTTP layer for GitHub API calls and release downloads.
+
+    A single `requests.Session` keeps connections (and their TLS sessions)
+    alive across the catalog refresh, checksum fetches and every download
+    worker. Requests get connect/read timeouts and are retried with full
+    jitter backoff on connection errors and retryable statuses, honoring
+    `Retry-After`. GitHub's `X-RateLimit-*` headers are tracked so callers
+    can defer work that isn't urgent instead of burning the remaining quota.
+    """
+    logger = logging.getLogger("HttpClient")
+    connect_timeout = 10
+    read_timeout = 30
+    retries = 3
+    backoff = 0.5
+    max_backoff = 8.0
+    # Never sleep longer than this for a rate limit, callers should defer instead
+    max_retry_wait = 60
+    retry_statuses = {429, 500, 502, 503, 504}
+    token_hosts = {"api.github.com"}
+
+    def __init__(self, token=None, pool_size=16):
+        self.token = token
+        self.pool_size = pool_size
+        self.session = None
+        self.rate_limit_remaining = None
+        self.rate_limit_reset = None
+        self.lock = threading.Lock()
+
+    def get_session(self):
+        with self.lock:
+            if self.session is None:
+                # Imported on first use, startup never needs requests
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = "godot_launcher"
+                self.session = session
+            return self.session
+
+    def get(self, url, headers=None, timeout=None, stream=False, retries=None):
+        return self.request("GET", url, headers, timeout, stream, retries)
+
+    def request(self, method, url, headers=None, timeout=None, stream=False, retries=None):
+        """Send a request, retrying transient failures.
+
+        Args:
+            timeout: Read timeout in seconds, defaults to `read_timeout`.
+            stream: Leave the body unread, for downloads.
+            retries: Override the number of retries.
+
+        Returns:
+            The `requests.Response`, which may still be an error status once
+            the retries are exhausted. Connection errors are raised as
+            `requests.RequestException`.
+        """
+        import requests
+        session = self.get_session()
+        headers = dict(headers or {})
+        if self.token and urlparse(url).hostname in self.token_hosts:
+            # requests drops this header when a redirect leaves the host
+            headers["Authorization"] = f"Bearer {self.token}"
+        retries = self.retries if retries is None else retries
+        timeout = (self.connect_timeout, timeout or self.read_timeout)
+
+        for attempt in range(retries + 1):
+            try:
+                response = session.request(method, url, headers=headers, timeout=timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == retries:
+                    raise
+                delay = self.get_backoff(attempt)
+                metrics.add(retries=1)
+                self.logger.warning(f"{method} {url} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            self.update_rate_limit(response)
+            if attempt == retries or not self.is_retryable(response):
+                return response
+            delay = self.get_retry_delay(response, attempt)
+            if delay is None:
+                return response
+            metrics.add(retries=1)
+            self.logger.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.1f}s")
+            response.close()
+            time.sleep(delay)
+
+    def is_retryable(self, response):
+        if response.status_code in self.retry_statuses:
+            return True
+        # GitHub answers an exhausted quota with a 403
+        return response.status_code == 403 and response.headers.get("X-RateLimit-Remaining") == "0"
+
+    def get_backoff(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def get_retry_delay(self, response, attempt):
+        """Seconds to wait before retrying, None if it's too long to be worth waiting"""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            delay = int(retry_after)
+        elif response.headers.get("X-RateLimit-Remaining") == "0" and self.rate_limit_reset:
+            delay = self.rate_limit_reset - time.time()
+        else:
+            return self.get_backoff(attempt)
+        return max(0, delay) if delay <= self.max_retry_wait else None
+
+    def update_rate_limit(self, response):
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            with self.lock:
+                previous = self.rate_limit_remaining
+                self.rate_limit_remaining = int(remaining)
+                self.rate_limit_reset = int(reset)
+        except ValueError:
+            return
+        # Warn once when crossing the threshold, not on every page of a refresh
+        if self.rate_limit_remaining < 10 and (previous is None or previous >= 10):
+            self.logger.warning(f"GitHub API quota almost exhausted: {remaining} requests left")
+
+    def restore_rate_limit(self, remaining, reset):
+        """Seed the quota state saved by a previous run"""
+        with self.lock:
+            if self.rate_limit_reset is None:
+                self.rate_limit_remaining = remaining
+                self.rate_limit_reset = reset
+
+    def should_defer(self, reserve=5):
+        """True if the API quota is (nearly) spent until its reset, see `get_seconds_until_reset`"""
+        with self.lock:
+            if self.rate_limit_remaining is None or self.rate_limit_reset is None:
+                return False
+            return self.rate_limit_remaining <= reserve and self.rate_limit_reset > time.time()
+
+    def get_seconds_until_reset(self):
+        return max(0, (self.rate_limit_reset or 0) - time.time())
+
+
+client = HttpClient()
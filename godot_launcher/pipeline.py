@@ -0,0 +1,276 @@
+import os
+import zlib
+import queue
+import struct
+import logging
+import threading
+from godot_launcher.extractor import get_safe_member_path, apply_unix_mode
+from godot_launcher.http_client import client
+from godot_launcher.exceptions import *
+
+
+END_OF_CENTRAL_DIR = struct.Struct('<4s4H2LH')
+CENTRAL_DIR_ENTRY = struct.Struct('<4s6H3L5H2L')
+LOCAL_FILE_HEADER = struct.Struct('<4s5H3L2H')
+
+STORED = 0
+DEFLATED = 8
+
+
+class ZipEntry():
+    def __init__(self, name, method, flags, crc, compressed_size, file_size, header_offset,
+                 create_system=0, external_attr=0):
+        self.name = name
+        self.method = method
+        self.flags = flags
+        self.crc = crc
+        self.compressed_size = compressed_size
+        self.file_size = file_size
+        self.header_offset = header_offset
+        self.create_system = create_system
+        self.external_attr = external_attr
+
+    def is_dir(self):
+        return self.name.endswith('/')
+
+
+class StreamReader():
+    """File-like view over blocks that a background thread pulls off the network.
+
+    Network reads and the inflate/write work of the consumer run concurrently,
+    the bounded queue keeps memory use flat if the disk falls behind.
+    """
+    max_queued_blocks = 64
+
+    def __init__(self, response, block_size, progress_callback=None, hasher=None, sink=None):
+        self.response = response
+        self.block_size = block_size
+        self.progress_callback = progress_callback
+        self.hasher = hasher
+        self.sink = sink
+        self.blocks = queue.Queue(maxsize=self.max_queued_blocks)
+        self.buffer = b""
+        self.position = 0
+        self.received = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.fetch_blocks, daemon=True)
+        self.thread.start()
+
+    def fetch_blocks(self):
+        try:
+            for block in self.response.iter_content(self.block_size):
+                if self.stopped.is_set():
+                    return
+                self.received += len(block)
+                if self.hasher:
+                    # Hashed on the network thread, off the inflate/write path
+                    self.hasher.update(block)
+                if self.sink:
+                    self.sink.write(block)
+                if self.progress_callback:
+                    self.progress_callback(self.received)
+                self.put(block)
+            self.put(None)
+        except Exception as e:
+            self.put(e)
+
+    def put(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.blocks.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def read(self, size):
+        """Read exactly `size` bytes, or fewer at the end of the stream"""
+        parts = []
+        remaining = size
+        while remaining:
+            if not self.buffer:
+                block = self.blocks.get()
+                if block is None:
+                    self.blocks.put(None)
+                    break
+                if isinstance(block, InstallCancelled):
+                    raise block
+                if isinstance(block, Exception):
+                    raise PipelineError(f"Download interrupted: {block}")
+                self.buffer = block
+            part = self.buffer[:remaining]
+            self.buffer = self.buffer[remaining:]
+            parts.append(part)
+            remaining -= len(part)
+        data = b"".join(parts)
+        self.position += len(data)
+        return data
+
+    def skip_to(self, offset):
+        while self.position < offset:
+            if not self.read(min(self.block_size, offset - self.position)):
+                raise PipelineError("Stream ended before the next entry")
+
+    def close(self):
+        self.stopped.set()
+        self.response.close()
+
+
+class StreamingInstaller():
+    """Extract a zip archive straight from the network into a folder.
+
+    The central directory is read first with a ranged request for the tail of
+    the archive, after which the archive body is streamed once and every entry
+    is inflated into `output_dir` as its bytes arrive. No temporary copy of the
+    archive touches the disk. Anything this can't handle (no range support,
+    zip64, encryption, exotic compression) raises `PipelineError` so callers
+    can fall back to the download-then-unzip path.
+
+    With a `hasher`, every byte of the archive is hashed on the way through:
+    the streamed body first, then the already fetched central directory.
+    With an `archive_file`, the same bytes are also written there, leaving a
+    complete copy of the archive behind for the archive cache.
+    """
+    logger = logging.getLogger("Pipeline")
+    tail_size = 64 * 1024
+    block_size = 256 * 1024
+    timeout = 30
+    # Zip offsets refer to the file itself, never to a compressed transfer
+    base_headers = {"Accept-Encoding": "identity"}
+
+    def __init__(self, url, output_dir, download_callback=None, unzip_callback=None, hasher=None, archive_file=None):
+        self.url = url
+        self.output_dir = output_dir
+        self.download_callback = download_callback
+        self.unzip_callback = unzip_callback
+        self.hasher = hasher
+        self.archive_file = archive_file
+        self.total_size = 0
+        self.file_count = 0
+        self.trailer = b""
+
+    def install(self):
+        entries, body_size = self.read_central_directory()
+        entries.sort(key=lambda entry: entry.header_offset)
+        self.file_count = len(entries)
+
+        headers = {**self.base_headers, "Range": f"bytes=0-{body_size - 1}"}
+        response = client.get(self.url, headers=headers, timeout=self.timeout, stream=True)
+        if response.status_code != 206:
+            response.close()
+            raise PipelineError("Server ignored the range request for the archive body")
+
+        def on_received(received):
+            if self.download_callback:
+                self.download_callback(received, self.total_size)
+
+        # Extraction progress is counted in uncompressed bytes, like `ParallelExtractor`
+        total_bytes = sum(entry.file_size for entry in entries)
+        extracted_bytes = 0
+        sink = open(self.archive_file, 'wb') if self.archive_file else None
+        reader = StreamReader(response, self.block_size, on_received, self.hasher, sink)
+        try:
+            for entry in entries:
+                reader.skip_to(entry.header_offset)
+                self.extract_entry(reader, entry)
+                extracted_bytes += entry.file_size
+                if self.unzip_callback and entry.file_size:
+                    self.unzip_callback(extracted_bytes, total_bytes)
+            if self.hasher or sink:
+                # Whatever follows the last entry still has to go through the hash
+                reader.skip_to(body_size)
+        finally:
+            reader.close()
+            if sink:
+                # The network thread may still be between a read and its write
+                reader.thread.join()
+                sink.write(self.trailer)
+                sink.close()
+        if self.hasher:
+            self.hasher.update(self.trailer)
+
+    def fetch_range(self, start, end):
+        headers = {**self.base_headers, "Range": f"bytes={start}-{end}"}
+        with client.get(self.url, headers=headers, timeout=self.timeout) as response:
+            content_range = response.headers.get("Content-Range", "")
+            if response.status_code != 206 or "/" not in content_range:
+                raise PipelineError("Server does not support range requests")
+            self.total_size = int(content_range.rsplit("/", 1)[1])
+            return response.content
+
+    def read_central_directory(self):
+        # The first request only learns the size, the tail holds the directory
+        self.fetch_range(0, 0)
+        tail_start = max(0, self.total_size - self.tail_size)
+        tail = self.fetch_range(tail_start, self.total_size - 1)
+
+        eocd_position = tail.rfind(b'PK\x05\x06')
+        if eocd_position < 0:
+            raise PipelineError("End of central directory not found")
+        (_, _, _, _, entry_count, directory_size,
+         directory_offset, _) = END_OF_CENTRAL_DIR.unpack_from(tail, eocd_position)
+        if entry_count == 0xFFFF or directory_size == 0xFFFFFFFF or directory_offset == 0xFFFFFFFF:
+            raise PipelineError("Zip64 archives are not supported")
+
+        if directory_offset >= tail_start:
+            directory = tail[directory_offset - tail_start:directory_offset - tail_start + directory_size]
+            self.trailer = tail[directory_offset - tail_start:]
+        else:
+            directory = self.fetch_range(directory_offset, directory_offset + directory_size - 1)
+            self.trailer = directory[:tail_start - directory_offset] + tail
+
+        entries = []
+        position = 0
+        for _ in range(entry_count):
+            (signature, version_made_by, _, flags, method, _, _, crc, compressed_size, file_size, name_length,
+             extra_length, comment_length, _, _, external_attr, header_offset) = CENTRAL_DIR_ENTRY.unpack_from(directory, position)
+            if signature != b'PK\x01\x02':
+                raise PipelineError("Corrupt central directory")
+            position += CENTRAL_DIR_ENTRY.size
+            raw_name = directory[position:position + name_length]
+            position += name_length + extra_length + comment_length
+
+            if flags & 0x1:
+                raise PipelineError("Encrypted archives are not supported")
+            if method not in (STORED, DEFLATED):
+                raise PipelineError(f"Unsupported compression method {method}")
+            name = raw_name.decode('utf-8' if flags & 0x800 else 'cp437')
+            entries.append(ZipEntry(name, method, flags, crc, compressed_size, file_size, header_offset,
+                                    version_made_by >> 8, external_attr))
+
+        return entries, directory_offset
+
+    def extract_entry(self, reader, entry):
+        header = reader.read(LOCAL_FILE_HEADER.size)
+        if len(header) != LOCAL_FILE_HEADER.size or header[:4] != b'PK\x03\x04':
+            raise PipelineError(f"Corrupt local header for {entry.name}")
+        name_length, extra_length = struct.unpack_from('<2H', header, 26)
+        reader.read(name_length + extra_length)
+
+        target_path = get_safe_member_path(self.output_dir, entry.name)
+        if entry.is_dir():
+            os.makedirs(target_path, exist_ok=True)
+            return
+
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        decompressor = zlib.decompressobj(-15) if entry.method == DEFLATED else None
+        crc = 0
+        remaining = entry.compressed_size
+        with open(target_path, 'wb') as f:
+            while remaining:
+                data = reader.read(min(self.block_size, remaining))
+                if not data:
+                    raise PipelineError(f"Stream ended inside {entry.name}")
+                remaining -= len(data)
+                if decompressor:
+                    data = decompressor.decompress(data)
+                crc = zlib.crc32(data, crc)
+                f.write(data)
+            if decompressor:
+                data = decompressor.flush()
+                crc = zlib.crc32(data, crc)
+                f.write(data)
+
+        if crc != entry.crc:
+            raise PipelineError(f"CRC mismatch for {entry.name}")
+        apply_unix_mode(target_path, entry.create_system, entry.external_attr)
+
@@ -0,0 +1,203 @@
+import os
+import sys
+import glob
+import time
+import logging
+import threading
+from godot_launcher import utils
+from godot_launcher.events import bus
+from godot_launcher.telemetry import metrics
+
+
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_IDLE = 3
+IOPRIO_CLASS_SHIFT = 13
+# ioprio_set isn't wrapped by libc, these are its syscall numbers
+IOPRIO_SET_SYSCALLS = {"x86_64": 251, "i386": 289, "i686": 289, "aarch64": 30, "arm64": 30}
+
+
+def lower_io_priority():
+    """Put the calling thread in the idle I/O class and lower its CPU priority, Linux only.
+
+    Returns:
+        True if the idle I/O class could be set.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    thread_id = threading.get_native_id()
+    try:
+        # Per thread on Linux, the UI thread keeps its priority
+        os.setpriority(os.PRIO_PROCESS, thread_id, 19)
+    except OSError:
+        pass
+    syscall_number = IOPRIO_SET_SYSCALLS.get(os.uname().machine)
+    if syscall_number is None:
+        return False
+    import ctypes
+    libc = ctypes.CDLL(None, use_errno=True)
+    priority = IOPRIO_CLASS_IDLE << IOPRIO_CLASS_SHIFT
+    return libc.syscall(syscall_number, IOPRIO_WHO_PROCESS, thread_id, priority) == 0
+
+
+def get_folder_identity(folder):
+    """Changes when the folder is replaced, e.g. by a reinstall, None if it is gone"""
+    try:
+        stat = os.stat(folder)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+class Prewarmer():
+    """Reads an engine's executable and key data files into the page cache ahead of a launch.
+
+    After a reboot the 100+ MB editor binary is paged in from disk while the
+    editor starts. With prewarming enabled, the selected version is read
+    ahead in a background thread at idle I/O priority: the kernel is asked to
+    read it with `posix_fadvise(WILLNEED)` where that exists, and it is read
+    in chunks elsewhere. Only the latest request matters, selecting another
+    version abandons the one being read.
+
+    A prewarmed engine counts as warm for `warm_expiry` seconds, after which
+    the kernel may have evicted its pages, and only while its folder is the
+    one that was read: uninstalls and reinstalls (which swap in a new folder)
+    make it cold again.
+    """
+    logger = logging.getLogger("Prewarm")
+    chunk_size = 4 * 1024 * 1024
+    # Never read more than this per engine, mono builds carry large assemblies
+    max_bytes = 1024 * 1024 * 1024
+    warm_expiry = 15 * 60
+
+    def __init__(self, app):
+        self.app = app
+        self.enabled = False
+        self.requested = None
+        # Engine folder -> (folder identity, `time.monotonic()` it was prewarmed at)
+        self.warm = {}
+        self.thread = None
+        self.condition = threading.Condition()
+        bus.subscribe(self.on_event)
+
+    def request(self, engine_folder):
+        """Prewarm `engine_folder` in the background, if enabled and not already warm"""
+        if not self.enabled or not engine_folder or self.is_warm(engine_folder):
+            return
+        with self.condition:
+            if engine_folder == self.requested:
+                return
+            self.requested = engine_folder
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True, name="Prewarmer")
+                self.thread.start()
+            self.condition.notify()
+
+    def request_selected(self):
+        selected = self.app.config.get_selected_version()
+        if self.app.config.version_is_installed(selected):
+            self.request(self.app.config.get_engine_version_path(selected))
+
+    def is_warm(self, engine_folder):
+        with self.condition:
+            entry = self.warm.get(engine_folder)
+        if entry is None:
+            return False
+        identity, warmed_at = entry
+        if time.monotonic() - warmed_at > self.warm_expiry or get_folder_identity(engine_folder) != identity:
+            self.forget(engine_folder)
+            return False
+        return True
+
+    def forget(self, engine_folder):
+        with self.condition:
+            self.warm.pop(engine_folder, None)
+
+    def on_event(self, event):
+        if event.kind != "installed_changed":
+            return
+        with self.condition:
+            engine_folders = list(self.warm)
+        # Drops the removed engines along with any other stale entry
+        for engine_folder in engine_folders:
+            self.is_warm(engine_folder)
+
+    def run(self):
+        lower_io_priority()
+        while True:
+            with self.condition:
+                while self.requested is None:
+                    self.condition.wait()
+                engine_folder = self.requested
+            self.prewarm(engine_folder)
+            with self.condition:
+                if self.requested == engine_folder:
+                    self.requested = None
+
+    def is_superseded(self, engine_folder):
+        return self.requested not in (None, engine_folder)
+
+    def prewarm(self, engine_folder):
+        """Read ahead the files of one engine, returns the number of bytes covered"""
+        identity = get_folder_identity(engine_folder)
+        files = self.get_prewarm_files(engine_folder)
+        if not files:
+            return 0
+        method = "fadvise" if hasattr(os, "posix_fadvise") else "read"
+        with metrics.span("prewarm", version=os.path.basename(engine_folder), method=method) as span:
+            covered = 0
+            for path in files:
+                if self.is_superseded(engine_folder):
+                    self.logger.debug(f"Prewarm of {engine_folder} superseded")
+                    span.set(superseded=True)
+                    return covered
+                try:
+                    covered += self.prewarm_file(path, engine_folder, method)
+                except OSError as e:
+                    self.logger.debug(f"Could not prewarm {path}: {e}")
+            # fadvise only queues the reads, a throughput for it would mean nothing
+            span.add(files=len(files), **{"bytes" if method == "read" else "advised_bytes": covered})
+        with self.condition:
+            self.warm[engine_folder] = (identity, time.monotonic())
+        self.logger.info(f"Prewarmed {len(files)} files ({utils.convert_bytes(covered)}) of {engine_folder}")
+        return covered
+
+    def prewarm_file(self, path, engine_folder, method):
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if method == "fadvise":
+                # Starts the reads and returns, the kernel fills the page cache
+                os.posix_fadvise(f.fileno(), 0, size, os.POSIX_FADV_WILLNEED)
+                return size
+            read = 0
+            while read < size:
+                if self.is_superseded(engine_folder):
+                    break
+                data = f.read(self.chunk_size)
+                if not data:
+                    break
+                read += len(data)
+            return read
+
+    def get_prewarm_files(self, engine_folder):
+        """The executable, then the .pck files and C# assemblies, as many as fit in `max_bytes`"""
+        executable = self.app.config.get_engine_executable(engine_folder) or utils.get_executable_in_folder(engine_folder)
+        if not executable:
+            return []
+        executable_dir = os.path.dirname(executable)
+        candidates = [executable]
+        # Next to the binary on Linux/Windows, in Contents/Resources of a macOS bundle
+        for base_dir in (executable_dir, os.path.join(os.path.dirname(executable_dir), "Resources")):
+            candidates += glob.glob(os.path.join(base_dir, "GodotSharp", "Api", "Release", "*.dll"))
+            candidates += glob.glob(os.path.join(base_dir, "*.pck"))
+
+        files = []
+        budget = self.max_bytes
+        for path in dict.fromkeys(candidates):
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            if size <= budget:
+                files.append(path)
+                budget -= size
+        return files
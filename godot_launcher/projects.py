@@ -0,0 +1,224 @@
+import os
+import re
+import logging
+import threading
+from godot_launcher import utils
+from godot_launcher.versions import parse_version, STAGE_RANKS
+from godot_launcher.telemetry import metrics
+
+
+FEATURE_VERSION_PATTERN = re.compile(r'^(\d+)\.(\d+)$')
+QUOTED_STRING_PATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"')
+# `config_version` of project.godot files written by the 3.x editors, which have no `config/features`
+LEGACY_CONFIG_VERSIONS = {3: (3, 0), 4: (3, None)}
+
+
+def unescape(value):
+    return re.sub(r'\\(.)', r'\1', value)
+
+
+def parse_project_file(project_file):
+    """Read the name and required engine of a project from its project.godot.
+
+    Only the top-level `config_version` and the `[application]` keys
+    `config/name` and `config/features` are looked at, the rest of the file
+    (which can hold multi-line values) is skipped.
+
+    Returns:
+        A dict with "name", "features", "engine" as a (major, minor) tuple
+        (minor is None when only the major version is known, None if
+        unknown) and "mono".
+    """
+    config_version = None
+    name = None
+    features = []
+    section = None
+    with open(project_file, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("["):
+                section = line.strip("[]")
+            elif line.startswith("config_version=") and section is None:
+                try:
+                    config_version = int(line.split("=", 1)[1])
+                except ValueError:
+                    pass
+            elif section == "application" and line.startswith("config/name="):
+                match = QUOTED_STRING_PATTERN.search(line)
+                name = unescape(match.group(1)) if match else None
+            elif section == "application" and line.startswith("config/features="):
+                features = [unescape(feature) for feature in QUOTED_STRING_PATTERN.findall(line)]
+
+    engine = None
+    for feature in features:
+        match = FEATURE_VERSION_PATTERN.match(feature)
+        if match:
+            engine = (int(match.group(1)), int(match.group(2)))
+            break
+    if engine is None:
+        engine = LEGACY_CONFIG_VERSIONS.get(config_version)
+    return {
+        "name": name or os.path.basename(os.path.dirname(project_file)),
+        "features": features,
+        "engine": engine,
+        "mono": "C#" in features,
+    }
+
+
+def match_engine(project, installed_names):
+    """Best installed version for a project, None if nothing fits.
+
+    Prefers the newest build of the project's major.minor (stable over
+    prereleases), then the closest newer minor of the same major, which the
+    editor can upgrade the project to. C# projects only match mono builds
+    and the other way around.
+    """
+    engine = project["engine"]
+    if not engine:
+        return None
+    major, minor = engine
+    keys = {name: parse_version(name) for name in installed_names}
+    candidates = [name for name, key in keys.items() if key[0] == major and key[5] == int(project["mono"])]
+
+    def preference(name):
+        # A stable build beats a newer prerelease
+        return (keys[name][3] == STAGE_RANKS["stable"], keys[name])
+
+    if minor is None:
+        return max(candidates, key=preference, default=None)
+    same_minor = [name for name in candidates if keys[name][1] == minor]
+    if same_minor:
+        return max(same_minor, key=preference)
+    newer = [name for name in candidates if keys[name][1] > minor]
+    if not newer:
+        return None
+    closest_minor = min(keys[name][1] for name in newer)
+    return max((name for name in newer if keys[name][1] == closest_minor), key=preference)
+
+
+class ProjectIndex():
+    """Finds Godot projects under the configured roots.
+
+    Like the `DiskUsageService`, every folder is cached with its mtime: on a
+    rescan, folders whose mtime didn't move aren't listed again, only
+    stat'ed, and a project.godot is only parsed again when its own mtime
+    changed. Project folders are not descended into, their `.godot` and
+    asset folders can be huge. Folders are listed by a pool of workers, which
+    mostly matters for the first, cold scan.
+    """
+    logger = logging.getLogger("Projects")
+    max_depth = 8
+
+    def __init__(self, app, workers=8):
+        self.app = app
+        self.cache_file = os.path.join(app.config.app_dir, "projects.json")
+        self.workers = workers
+        self.dirs = {}
+        self.projects = {}
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        cache = utils.read_json(self.cache_file, self.logger, "project cache")
+        if isinstance(cache, dict) and "dirs" in cache and "projects" in cache:
+            self.dirs = cache["dirs"]
+            self.projects = cache["projects"]
+
+    def save(self):
+        with self.lock:
+            cache = {"dirs": self.dirs, "projects": self.projects}
+        utils.write_json_atomic(self.cache_file, cache, self.logger, "project cache")
+
+    def get_projects(self):
+        """Known projects, by name"""
+        with self.lock:
+            projects = self.projects
+        return sorted(({"path": path, **project} for path, project in projects.items()),
+                      key=lambda project: (project["name"].lower(), project["path"]))
+
+    def find(self, name_or_path):
+        """A project by folder (or project.godot) path or by its name, None if unknown"""
+        path = os.path.abspath(os.path.expanduser(name_or_path))
+        if os.path.basename(path) == "project.godot":
+            path = os.path.dirname(path)
+        if path not in self.projects and os.path.isfile(os.path.join(path, "project.godot")):
+            # Outside the roots, still worth launching
+            project = self.read_project(path, None)
+            with self.lock:
+                # Replaced, never changed in place, `get_projects` may be iterating the current dict
+                self.projects = {**self.projects, path: project}
+        for project in self.get_projects():
+            if project["path"] == path or project["name"] == name_or_path:
+                return project
+        return None
+
+    def scan(self, roots=None):
+        """Bring the index up to date with the project roots, returns the projects"""
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+        roots = [os.path.abspath(os.path.expanduser(root)) for root in (roots or self.app.config.get_project_roots())]
+        dirs = {}
+        projects = {}
+        listed = 0
+        with metrics.span("project_scan") as span, ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ProjectScan") as executor:
+            futures = {executor.submit(self.scan_dir, root, 0) for root in roots if os.path.isdir(root)}
+            while futures:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        path, mtime, subdirs, project, depth, was_listed = future.result()
+                    except OSError as e:
+                        # Unreadable or removed while we were looking
+                        self.logger.debug(f"Skipping folder: {e}")
+                        continue
+                    dirs[path] = {"mtime": mtime, "subdirs": subdirs, "project": project is not None}
+                    listed += was_listed
+                    if project:
+                        projects[path] = project
+                    elif depth < self.max_depth:
+                        for subdir in subdirs:
+                            futures.add(executor.submit(self.scan_dir, subdir, depth + 1))
+            span.add(folders=len(dirs), listed=listed, files=len(projects))
+
+        with self.lock:
+            self.dirs = dirs
+            self.projects = projects
+        self.save()
+        self.logger.info(f"Found {len(projects)} projects in {len(dirs)} folders ({listed} listed)")
+        return self.get_projects()
+
+    def scan_dir(self, path, depth):
+        """Returns (path, mtime, subfolders, project or None, depth, whether it had to be listed)"""
+        # Read first, a project added during the listing still gets the folder relisted next scan
+        mtime = os.stat(path).st_mtime_ns
+        cached = self.dirs.get(path)
+        if cached and cached["mtime"] == mtime:
+            subdirs = cached["subdirs"]
+            has_project = cached["project"]
+            was_listed = False
+        else:
+            subdirs = []
+            has_project = False
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name == "project.godot" and entry.is_file():
+                        has_project = True
+                    elif entry.is_dir(follow_symlinks=False) and not entry.name.startswith("."):
+                        subdirs.append(entry.path)
+            was_listed = True
+        project = self.read_project(path, self.projects.get(path)) if has_project else None
+        return path, mtime, subdirs, project, depth, was_listed
+
+    def read_project(self, project_dir, cached):
+        """Parse a project.godot, unless `cached` was parsed from the same mtime"""
+        project_file = os.path.join(project_dir, "project.godot")
+        mtime = os.stat(project_file).st_mtime_ns
+        if cached and cached["mtime"] == mtime:
+            return cached
+        project = parse_project_file(project_file)
+        # JSON has no tuples, the cache and a fresh parse should look the same
+        project["engine"] = list(project["engine"]) if project["engine"] else None
+        project["mtime"] = mtime
+        return project
+
+    def match_engine(self, project):
+        return match_engine(project, self.app.config.get_installed_versions())
@@ -0,0 +1,235 @@
+import os
+import sys
+import struct
+import select
+import logging
+import threading
+import contextlib
+from godot_launcher.events import bus
+
+
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_ONLYDIR = 0x1000000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct('iIII')
+
+
+class InotifyWatcher():
+    """Reports entries created, deleted or moved in a few folders, using Linux inotify.
+
+    Only the watched folders themselves are observed, not their content, so
+    extracting an engine produces a single event for its top-level folder.
+    """
+    logger = logging.getLogger("Registry")
+    mask = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+
+    def __init__(self, folders, on_change, on_overflow):
+        """
+        Args:
+            folders: Folders to watch.
+            on_change: Called with the path of every changed entry.
+            on_overflow: Called when the kernel dropped events, callers
+                should fall back to a full scan.
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        import ctypes
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.on_change = on_change
+        self.on_overflow = on_overflow
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.folders = {}
+        for folder in folders:
+            watch = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), self.mask)
+            if watch < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"Could not watch {folder}")
+            self.folders[watch] = folder
+        # Writing to this pipe wakes the reader thread up for `stop`
+        self.wake_read, self.wake_write = os.pipe()
+        self.thread = threading.Thread(target=self.read_events, daemon=True, name="InotifyWatcher")
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        os.write(self.wake_write, b"x")
+        self.thread.join()
+        for fd in (self.fd, self.wake_read, self.wake_write):
+            os.close(fd)
+
+    def read_events(self):
+        while True:
+            readable, _, _ = select.select([self.fd, self.wake_read], [], [])
+            if self.wake_read in readable:
+                return
+            data = os.read(self.fd, 64 * 1024)
+            position = 0
+            while position < len(data):
+                watch, mask, _, name_length = INOTIFY_EVENT.unpack_from(data, position)
+                position += INOTIFY_EVENT.size
+                name = data[position:position + name_length].rstrip(b"\0")
+                position += name_length
+                if mask & IN_Q_OVERFLOW:
+                    self.on_overflow()
+                elif watch in self.folders and name:
+                    self.on_change(os.path.join(self.folders[watch], os.fsdecode(name)))
+
+
+class PollingWatcher():
+    """Portable stand-in for `InotifyWatcher`.
+
+    Adding or removing an entry bumps the mtime of its parent folder, so each
+    poll costs one `os.stat` per watched folder. A folder is only listed again
+    when its mtime moved.
+    """
+    logger = logging.getLogger("Registry")
+
+    def __init__(self, folders, on_change, poll_interval=2.0):
+        self.folders = folders
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.snapshots = {folder: self.snapshot(folder) for folder in folders}
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.poll, daemon=True, name="PollingWatcher")
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def snapshot(self, folder):
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+            names = {entry.name for entry in os.scandir(folder) if entry.is_dir()}
+        except OSError:
+            return (None, set())
+        return (mtime, names)
+
+    def poll(self):
+        while not self.stopped.wait(self.poll_interval):
+            for folder in self.folders:
+                try:
+                    mtime = os.stat(folder).st_mtime_ns
+                except OSError:
+                    continue
+                if mtime == self.snapshots[folder][0]:
+                    continue
+                old_names = self.snapshots[folder][1]
+                self.snapshots[folder] = self.snapshot(folder)
+                for name in old_names ^ self.snapshots[folder][1]:
+                    self.on_change(os.path.join(folder, name))
+
+
+class InstalledRegistry():
+    """Keeps the installed versions in sync with the `versions` and `mono` folders.
+
+    Changes are picked up from filesystem events (inotify on Linux, polling
+    elsewhere), so engines added or removed outside the launcher show up on
+    their own. Events are coalesced: the touched folders are collected until
+    `settle_delay` passes without a new event, then only those folders are
+    checked and the delta is applied to the config and published as an
+    "installed_changed" event. Folders the launcher is still installing into
+    are held back until the install finishes.
+    """
+    logger = logging.getLogger("Registry")
+    settle_delay = 0.5
+
+    def __init__(self, app):
+        self.app = app
+        self.versions_dir = os.path.join(app.config.app_dir, "versions")
+        self.mono_dir = os.path.join(app.config.app_dir, "mono")
+        self.pending = set()
+        self.in_progress = set()
+        self.timer = None
+        self.watcher = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Reconcile with the disk once, then follow changes as they happen"""
+        self.reconcile()
+        folders = [self.versions_dir, self.mono_dir]
+        try:
+            self.watcher = InotifyWatcher(folders, self.on_folder_changed, self.reconcile)
+        except (OSError, AttributeError) as e:
+            self.logger.info(f"Watching installed versions by polling: {e}")
+            self.watcher = PollingWatcher(folders, self.on_folder_changed)
+        self.watcher.start()
+
+    def stop(self):
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+
+    @contextlib.contextmanager
+    def installing(self, engine_folder):
+        """Hold back `engine_folder` while an install writes to it, then register it"""
+        with self.lock:
+            self.in_progress.add(engine_folder)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_progress.discard(engine_folder)
+        # Only reached if the install succeeded, a broken folder stays unregistered
+        self.refresh([engine_folder])
+
+    def get_version_name(self, engine_folder):
+        name = os.path.basename(engine_folder)
+        if os.path.dirname(engine_folder) == self.mono_dir:
+            return f"{name} (mono)"
+        return name
+
+    def on_folder_changed(self, engine_folder):
+        with self.lock:
+            self.pending.add(engine_folder)
+            # Every new event restarts the wait, a burst is handled once
+            if self.timer:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.settle_delay, self.flush_pending)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush_pending(self):
+        with self.lock:
+            engine_folders = self.pending
+            self.pending = set()
+            self.timer = None
+        self.refresh(engine_folders)
+
+    def reconcile(self):
+        """Full comparison with the disk, at startup or after lost events"""
+        on_disk, _ = self.app.config.import_installed_versions()
+        self.refresh(set(on_disk.values()) | set(self.app.config.version_index.installed.values()))
+
+    def refresh(self, engine_folders):
+        """Check only the given engine folders and apply what changed"""
+        added = {}
+        removed = []
+        with self.lock:
+            in_progress = set(self.in_progress)
+        for engine_folder in engine_folders:
+            name = self.get_version_name(engine_folder)
+            is_installed = self.app.config.version_is_installed(name)
+            if os.path.isdir(engine_folder):
+                if not is_installed and engine_folder not in in_progress:
+                    added[name] = engine_folder
+            elif is_installed:
+                removed.append(name)
+
+        if not added and not removed:
+            return
+        self.app.config.apply_installed_changes(added, removed)
+        self.logger.info(f"Installed versions changed: +{sorted(added)} -{sorted(removed)}")
+        bus.emit("installed_changed", "registry", added=sorted(added), removed=sorted(removed))
@@ -0,0 +1,150 @@
+import logging
+import threading
+from collections import deque
+from godot_launcher.events import bus
+
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+INSTALL = "install"
+UNINSTALL = "uninstall"
+
+
+class InstallJob():
+    """One queued install or uninstall and its state"""
+    def __init__(self, job_id, action, version, use_mono, engine_folder):
+        self.job_id = job_id
+        self.action = action
+        self.version = version
+        self.use_mono = use_mono
+        self.engine_folder = engine_folder
+        self.state = QUEUED
+        self.cancel_event = threading.Event()
+        self.finished_event = threading.Event()
+
+    def get_label(self):
+        return f"{self.version} (mono)" if self.use_mono else self.version
+
+
+class InstallScheduler():
+    """Runs install and uninstall jobs, up to `max_parallel` at a time.
+
+    Jobs are keyed by their engine folder: two jobs on the same version
+    (an install racing an uninstall, a double click...) never run at the same
+    time, the later one waits in the queue. Each job publishes its progress on
+    the event bus under its own job id, plus "job_state" events whenever it
+    changes state, and can be cancelled while queued or running.
+    """
+    logger = logging.getLogger("Scheduler")
+
+    def __init__(self, app, max_parallel=3):
+        self.app = app
+        self.max_parallel = max_parallel
+        self.jobs = {}
+        self.pending = deque()
+        self.busy_folders = set()
+        self.running_count = 0
+        self.job_counter = 0
+        self.lock = threading.Lock()
+
+    def submit_install(self, version, use_mono):
+        """Returns the queued job, None if `version` isn't in the catalog"""
+        try:
+            version_url = self.app.config.get_version_url(version)
+        except KeyError:
+            # e.g. clicked before the first catalog refresh finished
+            self.logger.error(f"Cannot install '{version}', it is not in the release catalog")
+            return None
+        engine_folder = self.app.config.get_engine_folder_from_url(version_url, use_mono)
+        return self.submit(INSTALL, version, use_mono, engine_folder)
+
+    def submit_uninstall(self, version, engine_folder):
+        return self.submit(UNINSTALL, version, False, engine_folder)
+
+    def submit(self, action, version, use_mono, engine_folder):
+        with self.lock:
+            self.job_counter += 1
+            job = InstallJob(f"job-{self.job_counter}", action, version, use_mono, engine_folder)
+            self.jobs[job.job_id] = job
+            self.pending.append(job)
+        self.logger.info(f"Queued {action} of {job.get_label()} as {job.job_id}")
+        self.publish_state(job)
+        self.dispatch()
+        return job
+
+    def cancel(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.finished_event.is_set():
+                return
+            job.cancel_event.set()
+            was_queued = job in self.pending
+            if was_queued:
+                self.pending.remove(job)
+        if was_queued:
+            self.finish(job, CANCELLED, started=False)
+
+    def wait(self, jobs=None, timeout=None):
+        """Block until the given jobs (default: all known jobs) are finished"""
+        for job in list(jobs if jobs is not None else self.jobs.values()):
+            job.finished_event.wait(timeout)
+
+    def get_active_jobs(self):
+        with self.lock:
+            return [job for job in self.jobs.values() if not job.finished_event.is_set()]
+
+    def dispatch(self):
+        """Start queued jobs while there is capacity and their version is free"""
+        to_start = []
+        with self.lock:
+            for job in list(self.pending):
+                if self.running_count >= self.max_parallel:
+                    break
+                if job.engine_folder in self.busy_folders:
+                    continue
+                self.pending.remove(job)
+                self.busy_folders.add(job.engine_folder)
+                self.running_count += 1
+                job.state = RUNNING
+                to_start.append(job)
+
+        for job in to_start:
+            self.publish_state(job)
+            thread = threading.Thread(target=self.run_job, args=(job,), daemon=True, name=job.job_id)
+            thread.start()
+
+    def run_job(self, job):
+        state = FAILED
+        try:
+            if job.action == INSTALL:
+                # Installs are extracted aside and swapped in, a failure leaves nothing to clean up
+                succeeded = self.app.install_version(job.version, job.use_mono, job.job_id, job.cancel_event)
+                if job.cancel_event.is_set() and not succeeded:
+                    state = CANCELLED
+                elif succeeded:
+                    state = DONE
+            else:
+                state = DONE if self.app.uninstall_version(job.engine_folder) else FAILED
+        except Exception as e:
+            self.logger.error(f"{job.job_id} crashed: {e}")
+        self.finish(job, state)
+
+    def finish(self, job, state, started=True):
+        with self.lock:
+            job.state = state
+            if started:
+                self.busy_folders.discard(job.engine_folder)
+                self.running_count -= 1
+        job.finished_event.set()
+        # A failed or cancelled job never finishes its progress streams
+        bus.discard(job.job_id)
+        self.logger.info(f"{job.job_id} ({job.action} {job.get_label()}) {state}")
+        self.publish_state(job)
+        self.dispatch()
+
+    def publish_state(self, job):
+        bus.emit("job_state", job.job_id, state=job.state, action=job.action, label=job.get_label())
@@ -1,72 +1,269 @@
-import requests
 from godot_launcher import utils
+from godot_launcher.http_cache import HttpCache
+from godot_launcher.assets import AssetMatrix
+from godot_launcher import checksums
+from godot_launcher.http_client import client
+from godot_launcher.telemetry import metrics
 from godot_launcher.exceptions import *
 import os
-import urllib.request
+import shutil
 
 
 class Scraper:
+    releases_url = 'https://api.github.com/repos/godotengine/godot/releases'
+    releases_per_page = 100
+    
     def __init__(self, app):
         self.app = app
+        cache_file = os.path.join(self.app.config.app_dir, "release_cache.json")
+        # Schema 2 pages also carry every release's asset list
+        self.release_cache = HttpCache(cache_file, schema=2)
+        self.asset_matrices = {}
+        self.release_sums = {}
         
-    def get_release_versions(self):
+    def get_release_versions(self, timeout=None):
         """Pull available releases from Godot repo.
+        
+        Follows the `Link` pagination of the releases API. Every page is
+        requested conditionally with the validators stored in the release
+        cache, so pages that did not change come back as a 304 and are
+        served from their cached, already parsed data.
+        
+        Args:
+            timeout: Seconds to wait for each page, None waits forever.
 
         Returns:
             Returns a dict of version names and their url.
         """
+        with metrics.span("catalog_refresh") as span:
+            versions = self.fetch_release_versions(timeout, span)
+        return versions
+    
+    def fetch_release_versions(self, timeout, span):
+        import requests
+        
         versions = {}
-        url = 'https://api.github.com/repos/godotengine/godot/releases'
+        url = f"{self.releases_url}?per_page={self.releases_per_page}"
+        visited_pages = []
+        changed_pages = 0
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            releases = response.json()
-            for release in releases:                
-                versions[release["name"]] = release["url"]
-            return versions
+            while url:
+                visited_pages.append(url)
+                headers = self.release_cache.conditional_headers(url)
+                response = client.get(url, headers=headers, timeout=timeout)
+                cached_page = self.release_cache.get(url)
+                
+                if response.status_code == 304 and cached_page:
+                    releases = cached_page["data"]
+                    next_url = response.links.get("next", {}).get("url", cached_page["next"])
+                else:
+                    response.raise_for_status()
+                    span.add(bytes=len(response.content))
+                    releases = self.parse_release_page(response.json())
+                    next_url = response.links.get("next", {}).get("url")
+                    self.release_cache.store(url, response.headers, releases, next_url)
+                    changed_pages += 1
+                
+                for name, release_url, _ in releases:
+                    versions[name] = release_url
+                url = next_url
+                
         except requests.RequestException as e:
+            self.release_cache.save()
             raise APIError(f"Error retrieving release versions: {e}")
+        
+        # Only a complete walk tells us which pages disappeared
+        self.release_cache.prune(visited_pages)
+        self.release_cache.save()
+        self.asset_matrices = {}
+        span.add(pages=len(visited_pages), changed_pages=changed_pages)
+        self.app.logger.info(f"Release catalog refreshed: {len(visited_pages)} pages, {changed_pages} changed")
+        return versions
+    
+    def parse_release_page(self, releases):
+        """Reduce a page of the releases API to (name, url, assets) entries"""
+        return [[release["name"], release["url"], self.parse_assets(release)] for release in releases]
+    
+    def parse_assets(self, release):
+        return [[asset["name"], asset["browser_download_url"], asset["size"]] for asset in release["assets"]]
+    
+    def get_asset_matrix(self, version_url):
+        """Asset matrix of a release, from the catalog cache when possible"""
+        if version_url in self.asset_matrices:
+            return self.asset_matrices[version_url]
+        
+        assets = None
+        for page in self.release_cache.get_pages():
+            for _, release_url, release_assets in page["data"]:
+                if release_url == version_url:
+                    assets = release_assets
+        
+        if assets is None:
+            # Not in the cached catalog, ask the API for this one release
+            import requests
+            try:
+                response = client.get(version_url, timeout=self.app.config.get_catalog_timeout())
+            except requests.RequestException as e:
+                raise DownloadError(f"Could not retrieve assets from {version_url}: {e}")
+            if response.status_code != 200:
+                raise DownloadError(f"Could not retrieve assets from {version_url}")
+            assets = self.parse_assets(response.json())
+        
+        asset_matrix = AssetMatrix(assets)
+        self.asset_matrices[version_url] = asset_matrix
+        return asset_matrix
+            
+    def get_expected_digest(self, asset_matrix, asset_name):
+        """SHA512 the release publishes for an asset, None if there is nothing to check against"""
+        if not self.app.config.get_verify_checksums():
+            return None
+        if not asset_matrix.sums_url:
+            self.app.logger.info(f"No SHA512-SUMS.txt published for {asset_name}, skipping verification")
+            return None
+        
+        if asset_matrix.sums_url not in self.release_sums:
+            import requests
+            try:
+                response = client.get(asset_matrix.sums_url, timeout=self.app.config.get_catalog_timeout())
+                response.raise_for_status()
+            except requests.RequestException as e:
+                raise DownloadError(f"Could not retrieve checksums from {asset_matrix.sums_url}: {e}")
+            self.release_sums[asset_matrix.sums_url] = checksums.parse_sums(response.text)
+        
+        expected_digest = self.release_sums[asset_matrix.sums_url].get(asset_name)
+        if not expected_digest:
+            self.app.logger.warning(f"{asset_name} is not listed in SHA512-SUMS.txt, skipping verification")
+        return expected_digest
             
-    def install_version(self, version_url, temp_dir, use_mono):
+    def install_version(self, version_url, temp_dir, use_mono, operation_id=None, cancel_event=None):
         """Download and install a version of Godot.
 
-        Zip file is downloaded and unzipped to "versions" folder.
+        The engine is extracted into `temp_dir` and only moved to the
+        "versions" folder once complete, so a failed or cancelled install
+        never leaves a partial folder behind or damages the one it replaces.
+        The zip file is streamed and extracted in one pass when the server
+        supports it, otherwise it is downloaded to `temp_dir` first and
+        unzipped afterwards. Either way the archive is hashed as it arrives
+        and checked against the release's SHA512-SUMS.txt.
 
         Args:
             version_url: Godot repo release url.
-            temp_dir: Path to temporary folder where zip file will be downloaded to.
+            temp_dir: Path to the folder where the zip file will be downloaded to.
+                Partial downloads are kept there so a later attempt can resume.
             use_mono: Boolean to download with c# compatibility or not.
+            operation_id: Key of the progress events published for this install.
+            cancel_event: `threading.Event` that aborts the install with
+                `InstallCancelled` once set.
         """
+        asset_matrix = self.get_asset_matrix(version_url)
+        machine_info = utils.get_machine_info()
+        asset = asset_matrix.resolve(machine_info["os_name"], machine_info["arch"], use_mono)
+        if not asset:
+            raise DownloadError(f"Could not find a download for {machine_info['os_name']} {machine_info['arch']}")
+        download_url = asset["url"]
+        expected_digest = self.get_expected_digest(asset_matrix, asset["name"])
         
-        response = requests.get(version_url)
-        if response.status_code != 200:
-            raise DownloadError(f"Could not retrieve assets from {version_url}")
-        else:
-            data = response.json()
-            asset_data = {}            
-            for asset in data["assets"]:
-                asset_data[asset["name"]] = asset["browser_download_url"]                
-            
-            download_url = utils.get_download_url_for_platform(asset_data, use_mono)
- 
-            if download_url:
-                _, file_extension = os.path.splitext(download_url)
-                temp_file = os.path.join(temp_dir, f"{utils.generate_hex(8)}{file_extension}")
-                try:
-                    utils.download_file_with_progress(download_url, temp_file)
-                except Exception as e:
-                    raise DownloadError(f"Error downloading file: {e}")
-                
-                engine_folder = self.app.config.get_engine_folder_from_url(version_url, use_mono)
-                try:
-                    utils.unzip_file_with_progress(temp_file, engine_folder)
-                except Exception as e:
-                    raise UnzipError(f"Error unzipping file: {e}")
-                    
-                self.app.config.update_installed_versions()
-            
+        engine_folder = self.app.config.get_engine_folder_from_url(version_url, use_mono)
+        operation_id = operation_id or os.path.basename(engine_folder)
+        store = self.app.store if self.app.config.get_use_object_store() else None
+        
+        staging_folder = os.path.join(temp_dir, "engine")
+        shutil.rmtree(staging_folder, ignore_errors=True)
+        try:
+            self.extract_release(download_url, expected_digest, temp_dir, staging_folder, store,
+                                 operation_id, cancel_event)
+            # Before the swap, the entries noted while unzipping are keyed by their staging path
+            self.ingest_into_store(store, staging_folder)
+            self.replace_engine_folder(staging_folder, engine_folder)
+        finally:
+            # Gone after a successful swap, whatever a failure left otherwise
+            shutil.rmtree(staging_folder, ignore_errors=True)
+        # Indexed last, deduplication replaces files and changes their stat
+        self.app.index_executable(engine_folder)
+    
+    def extract_release(self, download_url, expected_digest, temp_dir, staging_folder, store, operation_id, cancel_event):
+        """Fill `staging_folder` from the archive cache, a streaming install or a download and unzip"""
+        archive_cache = self.app.archive_cache if self.app.archive_cache.is_enabled() else None
+        if archive_cache:
+            # Pinned first, another job's eviction could delete it between lookup and unzip
+            with archive_cache.pin(download_url):
+                cached_archive = archive_cache.lookup(download_url, expected_digest)
+                if cached_archive:
+                    self.unzip_archive(cached_archive, staging_folder, store, operation_id, cancel_event)
+                    return
+        
+        # A stable name lets an interrupted download resume from its journal
+        temp_file = os.path.join(temp_dir, os.path.basename(download_url))
+        
+        if self.app.config.get_streaming_install():
+            # Keep a copy of the streamed archive only if the cache will take it
+            archive_file = temp_file if archive_cache else None
+            try:
+                utils.stream_install_with_progress(download_url, staging_folder, operation_id, cancel_event,
+                                                   expected_digest, archive_file)
+            except (PipelineError, OSError) as e:
+                shutil.rmtree(staging_folder, ignore_errors=True)
+                self.app.logger.warning(f"Streaming install unavailable, falling back to download and unzip: {e}")
             else:
-                raise DownloadError(f"Could not find appropriate download url")
-
+                if archive_file:
+                    self.cache_archive(archive_cache, download_url, temp_file, expected_digest)
+                return
         
-    
\ No newline at end of file
+        try:
+            utils.download_file_with_progress(download_url, temp_file, operation_id=operation_id,
+                                              cancel_event=cancel_event, expected_digest=expected_digest)
+        except (InstallCancelled, ChecksumError):
+            raise
+        except Exception as e:
+            raise DownloadError(f"Error downloading file: {e}")
+        
+        try:
+            self.unzip_archive(temp_file, staging_folder, store, operation_id, cancel_event)
+        except BaseException:
+            # Verified against the release's sums, the cache serves it to the next attempt
+            if archive_cache and expected_digest:
+                self.cache_archive(archive_cache, download_url, temp_file, expected_digest)
+            raise
+        if archive_cache:
+            self.cache_archive(archive_cache, download_url, temp_file, expected_digest)
+        else:
+            os.remove(temp_file)
+    
+    def replace_engine_folder(self, new_folder, engine_folder):
+        """Move a complete install into place, the install it replaces goes to the trash"""
+        trashed_path = self.app.trash.move_to_trash(engine_folder) if os.path.exists(engine_folder) else None
+        try:
+            os.makedirs(os.path.dirname(engine_folder), exist_ok=True)
+            os.replace(new_folder, engine_folder)
+        except OSError:
+            if trashed_path:
+                os.rename(trashed_path, engine_folder)
+            raise
+        if trashed_path:
+            self.app.trash.reclaim(trashed_path)
+    
+    def unzip_archive(self, archive_file, engine_folder, store, operation_id, cancel_event):
+        try:
+            utils.unzip_file_with_progress(archive_file, engine_folder, store, operation_id, cancel_event)
+        except InstallCancelled:
+            raise
+        except Exception as e:
+            raise UnzipError(f"Error unzipping file: {e}")
+    
+    def cache_archive(self, archive_cache, download_url, archive_file, digest):
+        """Hand a downloaded archive over to the archive cache, which may drop it right away"""
+        try:
+            archive_cache.add(download_url, archive_file, digest)
+        except OSError as e:
+            # The install itself is fine, only the next reinstall will download again
+            self.app.logger.warning(f"Could not add {archive_file} to the archive cache: {e}")
+    
+    def ingest_into_store(self, store, engine_folder):
+        """Deduplicate a fresh install against the object store, if enabled"""
+        if not store:
+            return
+        try:
+            store.ingest_tree(engine_folder)
+        except OSError as e:
+            # e.g. a filesystem without hardlinks, the install itself is fine
+            self.app.logger.warning(f"Could not add {engine_folder} to the object store: {e}")
@@ -0,0 +1,144 @@
+import os
+import hashlib
+import logging
+import threading
+from godot_launcher import utils
+
+
+class ObjectStore():
+    """Content-addressed store that deduplicates files across installed engines.
+
+    Installed files are hashed into `objects/<aa>/<sha256>` and the copy in
+    the version folder is replaced by a hardlink to the object, so identical
+    files (GodotSharp assemblies, data files...) of neighbouring releases are
+    only stored once. The hardlink count doubles as the reference count: an
+    object whose only remaining link is the store itself is garbage.
+
+    A small index maps archive entries to the digest of their content so the
+    extractor can link a known file instead of inflating it again. An entry
+    is keyed by the SHA-256 of its compressed bytes (with its compression
+    method and size): hashing those is much cheaper than inflating them, and
+    unlike the zip CRC it can't match a different file.
+    """
+    logger = logging.getLogger("ObjectStore")
+    hash_buffer_size = 1024 * 1024
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self.index_file = os.path.join(store_dir, "index.json")
+        self.index = None
+        # Entry keys of freshly extracted files, until `ingest_tree` stores them
+        self.pending_keys = {}
+        self.lock = threading.Lock()
+
+    def get_index(self):
+        with self.lock:
+            if self.index is None:
+                index = utils.read_json(self.index_file, self.logger, "object index") or {}
+                # Indexes written before entries were keyed by content held `crc32:size` keys
+                self.index = {key: digest for key, digest in index.items() if key.count(":") == 2}
+            return self.index
+
+    def save_index(self):
+        index = self.get_index()
+        os.makedirs(self.store_dir, exist_ok=True)
+        with self.lock:
+            utils.write_json_atomic(self.index_file, index, self.logger, "object index")
+
+    def get_object_path(self, digest):
+        return os.path.join(self.store_dir, digest[:2], digest[2:])
+
+    def hash_file(self, file_path):
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            while True:
+                data = f.read(self.hash_buffer_size)
+                if not data:
+                    break
+                sha.update(data)
+        return sha.hexdigest()
+
+    def link_into(self, object_path, target_path):
+        """Atomically point `target_path` at an existing object"""
+        temp_path = f"{target_path}.link"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        os.link(object_path, temp_path)
+        os.replace(temp_path, target_path)
+
+    def link_known(self, entry_key, target_path):
+        """Link the file of an archive entry the store already holds, returns False if it is unknown"""
+        digest = self.get_index().get(entry_key)
+        if not digest:
+            return False
+        try:
+            self.link_into(self.get_object_path(digest), target_path)
+            return True
+        except OSError:
+            # Collected since, or a filesystem without hardlinks
+            return False
+
+    def note_entry(self, file_path, entry_key):
+        """Remember which archive entry a file was extracted from, for `ingest_tree` to index"""
+        with self.lock:
+            self.pending_keys[os.path.normpath(file_path)] = entry_key
+
+    def ingest_tree(self, folder):
+        """Move every file of `folder` into the store and link it back.
+
+        Returns the number of bytes that were already stored, i.e. saved.
+        """
+        index = self.get_index()
+        saved_bytes = 0
+        for root, _, files in os.walk(folder):
+            for name in files:
+                file_path = os.path.join(root, name)
+                stat = os.stat(file_path)
+                if stat.st_nlink > 1:
+                    # Already linked from the store by the extractor
+                    continue
+                digest = self.hash_file(file_path)
+                object_path = self.get_object_path(digest)
+
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                try:
+                    os.link(file_path, object_path)
+                except FileExistsError:
+                    # Already stored, possibly just now by a concurrent install
+                    self.link_into(object_path, file_path)
+                    saved_bytes += stat.st_size
+
+                with self.lock:
+                    entry_key = self.pending_keys.pop(os.path.normpath(file_path), None)
+                    if entry_key:
+                        index[entry_key] = digest
+
+        self.save_index()
+        self.logger.info(f"Ingested {folder} into the object store, {saved_bytes} bytes deduplicated")
+        return saved_bytes
+
+    def collect_garbage(self):
+        """Delete objects that are no longer linked from any version folder"""
+        if not os.path.isdir(self.store_dir):
+            return 0
+        reclaimed_bytes = 0
+        removed_digests = set()
+        for prefix in os.scandir(self.store_dir):
+            if not prefix.is_dir():
+                continue
+            for entry in os.scandir(prefix.path):
+                # DirEntry.stat() reports st_nlink as 0 on Windows
+                stat = os.stat(entry.path)
+                if stat.st_nlink <= 1:
+                    os.remove(entry.path)
+                    reclaimed_bytes += stat.st_size
+                    removed_digests.add(prefix.name + entry.name)
+
+        if removed_digests:
+            index = self.get_index()
+            with self.lock:
+                for key in [key for key, digest in index.items() if digest in removed_digests]:
+                    del index[key]
+            self.save_index()
+        self.logger.info(f"Object store garbage collection removed {len(removed_digests)} objects, {reclaimed_bytes} bytes")
+        return reclaimed_bytes
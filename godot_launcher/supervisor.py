@@ -0,0 +1,280 @@
+import os
+import sys
+import time
+import logging
+import threading
+from godot_launcher import utils
+from godot_launcher.events import bus
+from godot_launcher.telemetry import metrics
+
+
+def read_proc_sample(pid):
+    """CPU seconds used, resident bytes and major page faults of a process, from /proc (Linux only).
+
+    Raises:
+        OSError: If the process is gone or /proc isn't available.
+    """
+    with open(f"/proc/{pid}/stat", 'rb') as f:
+        stat = f.read()
+    # The command name is in parentheses and may contain spaces, fields follow the last ")"
+    fields = stat[stat.rindex(b")") + 2:].split()
+    cpu_ticks = int(fields[11]) + int(fields[12])
+    major_faults = int(fields[9])
+    with open(f"/proc/{pid}/statm", 'rb') as f:
+        resident_pages = int(f.read().split()[1])
+    return cpu_ticks / os.sysconf("SC_CLK_TCK"), resident_pages * os.sysconf("SC_PAGE_SIZE"), major_faults
+
+
+def find_processes_using(folder):
+    """Pids of every process whose executable lives under `folder`, Linux only.
+
+    Also finds engines the launcher didn't start (by hand, or from an
+    earlier launcher run), which is what matters before deleting a folder.
+    """
+    if not sys.platform.startswith("linux"):
+        return []
+    prefix = os.path.realpath(folder) + os.sep
+    pids = []
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            executable = os.readlink(f"/proc/{entry.name}/exe")
+        except OSError:
+            # Other users' processes and kernel threads
+            continue
+        if executable.startswith(prefix):
+            pids.append(int(entry.name))
+    return pids
+
+
+class EngineSession():
+    """One engine process started by the launcher, with its latest resource sample"""
+
+    def __init__(self, version_folder, process, project_path=None, requested_at=None, prewarmed=False):
+        self.version_folder = version_folder
+        self.process = process
+        self.pid = process.pid
+        self.project_path = project_path
+        self.started_at = time.monotonic()
+        # Startup, see `ProcessSupervisor.check_startup`, timed on the perf_counter clock of the request
+        self.requested_at = requested_at or time.perf_counter()
+        self.prewarmed = prewarmed
+        self.starting = True
+        self.first_rss = None
+        self.stable_rss = None
+        self.stable_since = None
+        self.stable_faults = 0
+        self.rss = None
+        self.peak_rss = 0
+        self.cpu_percent = None
+        self.cpu_time = None
+        self.sampled_at = None
+
+    def update(self, cpu_time, rss, now):
+        if self.cpu_time is not None and now > self.sampled_at:
+            self.cpu_percent = (cpu_time - self.cpu_time) / (now - self.sampled_at) * 100
+        self.cpu_time = cpu_time
+        self.sampled_at = now
+        self.rss = rss
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def get_uptime(self):
+        return time.monotonic() - self.started_at
+
+    def snapshot(self):
+        return {
+            "pid": self.pid,
+            "version_folder": self.version_folder,
+            "version": os.path.basename(self.version_folder),
+            "project_path": self.project_path,
+            "uptime": self.get_uptime(),
+            "rss": self.rss,
+            "peak_rss": self.peak_rss,
+            "cpu_percent": self.cpu_percent,
+        }
+
+
+class ProcessSupervisor():
+    """Keeps track of the engines the launcher started.
+
+    Every `sample_interval` seconds each tracked process is polled (which
+    also reaps it once it exits) and, on Linux, its CPU time and resident
+    memory are read from /proc: two small reads per process, nothing is
+    sampled while no engine runs. Every sample is published as a "processes"
+    event with the current sessions. When a session ends, its duration and
+    peak memory are logged and recorded as an "engine_session" metric.
+
+    While an engine starts up, its memory alone is also read every
+    `startup_sample_interval` seconds: startup ends where the resident size
+    stops growing, which is recorded as an "engine_startup" metric from the
+    launch request, with the major page faults (reads from disk) up to that
+    point. Only measured on Linux.
+    """
+    logger = logging.getLogger("Supervisor")
+    sample_interval = 2.0
+    startup_sample_interval = 0.1
+    # Started once the resident size stayed within this fraction for `startup_settle_time` seconds
+    startup_settle_ratio = 0.02
+    startup_settle_time = 1.0
+    startup_timeout = 120.0
+
+    def __init__(self, app):
+        self.app = app
+        self.sessions = {}
+        self.thread = None
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+
+    def track(self, version_folder, process, project_path=None, requested_at=None, prewarmed=False):
+        """
+        Args:
+            requested_at: `time.perf_counter()` of the launch request, the
+                engine's startup is timed from there.
+            prewarmed: Whether the engine was in the page cache, recorded
+                with its startup.
+        """
+        session = EngineSession(version_folder, process, project_path, requested_at, prewarmed)
+        if not self.sample_session(session, time.monotonic()):
+            # No /proc to tell when it's done starting
+            session.starting = False
+        with self.lock:
+            self.sessions[session.pid] = session
+            if self.thread is None and not self.stopped.is_set():
+                self.thread = threading.Thread(target=self.run, daemon=True, name="ProcessSupervisor")
+                self.thread.start()
+        self.publish()
+        return session
+
+    def stop(self):
+        """Stop sampling, logging the engines that outlive the launcher"""
+        self.stopped.set()
+        with self.lock:
+            sessions = list(self.sessions.values())
+        for session in sessions:
+            self.logger.info(f"{self.describe(session)} still running at exit")
+
+    def run(self):
+        next_sample = time.monotonic() + self.sample_interval
+        while not self.stopped.wait(self.get_wait(next_sample)):
+            self.sample_startups()
+            if time.monotonic() >= next_sample:
+                next_sample = time.monotonic() + self.sample_interval
+                self.sample()
+            # Decided under the lock, so `track` never adds to a sampler that is exiting
+            with self.lock:
+                if not self.sessions:
+                    self.thread = None
+                    return
+
+    def get_wait(self, next_sample):
+        wait = max(0, next_sample - time.monotonic())
+        with self.lock:
+            if any(session.starting for session in self.sessions.values()):
+                return min(wait, self.startup_sample_interval)
+        return wait
+
+    def sample_startups(self):
+        with self.lock:
+            sessions = [session for session in self.sessions.values() if session.starting]
+        for session in sessions:
+            try:
+                _, rss, major_faults = read_proc_sample(session.pid)
+            except (OSError, ValueError, IndexError):
+                # Exited, the next full sample finishes it
+                continue
+            session.peak_rss = max(session.peak_rss, rss)
+            self.check_startup(session, rss, major_faults, time.perf_counter())
+
+    def check_startup(self, session, rss, major_faults, now):
+        """Record the startup once the resident size settled, after having grown"""
+        if session.first_rss is None:
+            session.first_rss = rss
+        if rss <= session.first_rss:
+            pass
+        elif session.stable_rss is None or abs(rss - session.stable_rss) > session.stable_rss * self.startup_settle_ratio:
+            session.stable_rss = rss
+            session.stable_since = now
+            session.stable_faults = major_faults
+        elif now - session.stable_since >= self.startup_settle_time:
+            # Ready from the point it stopped growing, not after the settle time
+            self.finish_startup(session, "ok", session.stable_since)
+            return
+        if now - session.requested_at > self.startup_timeout:
+            self.finish_startup(session, "error", now, "timed out")
+
+    def finish_startup(self, session, status, ended_at, error=None):
+        session.starting = False
+        fields = {
+            "version": os.path.basename(session.version_folder),
+            "prewarmed": session.prewarmed,
+            "major_faults": session.stable_faults,
+            "rss": session.stable_rss,
+            "project": session.project_path is not None,
+        }
+        if error:
+            fields["error"] = error
+        metrics.record("engine_startup", ended_at - session.requested_at, status, fields)
+
+    def sample(self):
+        now = time.monotonic()
+        with self.lock:
+            sessions = list(self.sessions.values())
+        for session in sessions:
+            exit_code = session.process.poll()
+            if exit_code is None:
+                self.sample_session(session, now)
+            else:
+                self.finish(session, exit_code)
+        self.publish()
+
+    def sample_session(self, session, now):
+        """Returns False if nothing could be read"""
+        try:
+            cpu_time, rss, major_faults = read_proc_sample(session.pid)
+        except (OSError, ValueError, IndexError):
+            # Not Linux, or exited since the poll, liveness is all we know
+            return False
+        session.update(cpu_time, rss, now)
+        if session.starting:
+            self.check_startup(session, rss, major_faults, time.perf_counter())
+        return True
+
+    def finish(self, session, exit_code):
+        with self.lock:
+            self.sessions.pop(session.pid, None)
+        if session.starting:
+            self.finish_startup(session, "error", time.perf_counter(), f"exited with code {exit_code}")
+        duration = session.get_uptime()
+        self.logger.info(f"{self.describe(session)} exited with code {exit_code}")
+        metrics.record("engine_session", duration, "ok" if exit_code == 0 else "error", {
+            "version": os.path.basename(session.version_folder),
+            "peak_rss": session.peak_rss,
+            "exit_code": exit_code,
+            "project": session.project_path is not None,
+        })
+
+    def describe(self, session):
+        peak = utils.convert_bytes(session.peak_rss) if session.peak_rss else "unknown"
+        return (f"{os.path.basename(session.version_folder)} (pid {session.pid}) ran for "
+                f"{utils.format_duration(session.get_uptime())}, peak memory {peak},")
+
+    def publish(self):
+        bus.emit("processes", "supervisor", sessions=self.get_sessions())
+
+    def get_sessions(self):
+        """Snapshots of the running engines, oldest first"""
+        with self.lock:
+            sessions = list(self.sessions.values())
+        return [session.snapshot() for session in sorted(sessions, key=lambda session: session.started_at)]
+
+    def get_processes_using(self, version_folder):
+        """Pids of the live processes running from `version_folder`, tracked or not"""
+        with self.lock:
+            tracked = [session for session in self.sessions.values() if session.version_folder == version_folder]
+        pids = {session.pid for session in tracked if session.process.poll() is None}
+        try:
+            pids.update(find_processes_using(version_folder))
+        except OSError as e:
+            self.logger.debug(f"Could not scan /proc: {e}")
+        return sorted(pids)
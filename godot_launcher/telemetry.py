@@ -0,0 +1,190 @@
+import os
+import json
+import math
+import time
+import logging
+import threading
+import contextlib
+from godot_launcher.exceptions import InstallCancelled
+
+
+class Span():
+    """Wall time and counters of one phase, recorded when the `with` block exits.
+
+    Counters (`bytes`, `files`, `retries`, ...) are added with `add`, other
+    fields like the version being installed with `set`. The span is the
+    current one of its thread while open, so code deeper down (e.g. the HTTP
+    client counting retries) can report into it without being passed it.
+    """
+    def __init__(self, recorder, phase, started_at=None, **fields):
+        self.recorder = recorder
+        self.phase = phase
+        self.started_at = started_at
+        self.fields = fields
+        self.counters = {}
+        self.status = None
+        self.lock = threading.Lock()
+
+    def add(self, **counters):
+        with self.lock:
+            for name, value in counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def fail(self, reason):
+        """Record the span as failed without raising, for callers that log and return"""
+        self.status = "error"
+        self.fields["error"] = reason
+
+    def __enter__(self):
+        self.started_at = self.started_at or time.perf_counter()
+        self.previous = self.recorder.bind_current(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self.started_at
+        self.recorder.bind_current(self.previous)
+        if self.status:
+            status = self.status
+        elif exc_type is None:
+            status = "ok"
+        elif issubclass(exc_type, InstallCancelled):
+            status = "cancelled"
+        else:
+            status = "error"
+        self.recorder.record(self.phase, duration, status, {**self.fields, **self.counters})
+        return False
+
+
+class MetricsRecorder():
+    """Appends spans as JSON lines to `metrics.jsonl`, next to `launcher.log`.
+
+    Every line is one finished span: phase, status, duration in seconds and
+    its counters and fields. A run is identified by `session`, so the report
+    can compare runs across a fleet. Past `max_size` the file is rotated once
+    to `metrics.jsonl.1`.
+    """
+    logger = logging.getLogger("Metrics")
+    max_size = 5 * 1024 * 1024
+
+    def __init__(self):
+        self.metrics_file = None
+        self.enabled = True
+        self.session = os.urandom(4).hex()
+        self.current = threading.local()
+        self.lock = threading.Lock()
+
+    def open(self, metrics_file):
+        self.metrics_file = metrics_file
+
+    def span(self, phase, started_at=None, **fields):
+        """
+        Args:
+            phase: Name the report groups by, e.g. "download".
+            started_at: `time.perf_counter()` the phase really started at,
+                defaults to entering the span.
+        """
+        return Span(self, phase, started_at, **fields)
+
+    def get_current(self):
+        return getattr(self.current, "span", None)
+
+    def bind_current(self, span):
+        """Make `span` the current one of this thread, returns the previous one"""
+        previous = self.get_current()
+        self.current.span = span
+        return previous
+
+    @contextlib.contextmanager
+    def bind(self, span):
+        """Report into `span` from a worker thread"""
+        previous = self.bind_current(span)
+        try:
+            yield span
+        finally:
+            self.bind_current(previous)
+
+    def add(self, **counters):
+        """Add to the counters of this thread's current span, if there is one"""
+        span = self.get_current()
+        if span:
+            span.add(**counters)
+
+    def record(self, phase, duration, status, fields):
+        if not self.enabled or not self.metrics_file:
+            return
+        record = {"ts": round(time.time(), 3), "session": self.session, "phase": phase,
+                  "status": status, "duration": round(duration, 4), **fields}
+        line = json.dumps(record) + "\n"
+        with self.lock:
+            try:
+                if os.path.exists(self.metrics_file) and os.path.getsize(self.metrics_file) > self.max_size:
+                    os.replace(self.metrics_file, f"{self.metrics_file}.1")
+                with open(self.metrics_file, 'a') as f:
+                    f.write(line)
+            except OSError as e:
+                self.logger.warning(f"Could not write metrics: {e}")
+
+
+def load_records(metrics_file):
+    """Spans from `metrics_file` and its rotated predecessor, oldest first"""
+    records = []
+    for path in (f"{metrics_file}.1", metrics_file):
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # A line cut short by a crash
+                    continue
+    return records
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    index = max(0, math.ceil(fraction * len(values)) - 1)
+    return values[index]
+
+
+def summarize(records, split_by=None):
+    """Per phase: span counts, p50/p95 duration and throughput over successful spans.
+
+    Args:
+        split_by: Field to split each phase by, e.g. "prewarmed" shows cold
+            and prewarmed engine startups as separate rows.
+
+    Returns:
+        A dict of phase names to summary dicts, throughput is None for
+        phases that don't move bytes.
+    """
+    phases = {}
+    for record in records:
+        phase = record["phase"]
+        if split_by and split_by in record:
+            phase = f"{phase} {split_by}={record[split_by]}"
+        phases.setdefault(phase, []).append(record)
+
+    summary = {}
+    for phase, phase_records in sorted(phases.items()):
+        succeeded = [record for record in phase_records if record["status"] == "ok"]
+        durations = sorted(record["duration"] for record in succeeded)
+        throughputs = sorted(record["bytes"] / record["duration"] for record in succeeded
+                             if record.get("bytes") and record["duration"] > 0)
+        summary[phase] = {
+            "count": len(phase_records),
+            "failed": sum(record["status"] == "error" for record in phase_records),
+            "cancelled": sum(record["status"] == "cancelled" for record in phase_records),
+            "retries": sum(record.get("retries", 0) for record in phase_records),
+            "p50": percentile(durations, 0.5) if durations else None,
+            "p95": percentile(durations, 0.95) if durations else None,
+            "p50_throughput": percentile(throughputs, 0.5) if throughputs else None,
+            "p95_throughput": percentile(throughputs, 0.95) if throughputs else None,
+        }
+    return summary
+
+
+metrics = MetricsRecorder()
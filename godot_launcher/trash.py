@@ -0,0 +1,104 @@
+import os
+import queue
+import logging
+import threading
+from godot_launcher import utils
+from godot_launcher.events import bus
+
+
+class TrashReclaimer():
+    """Uninstalls by renaming into a trash folder, then deletes in the background.
+
+    The rename is a single metadata operation on the same filesystem, so the
+    engine disappears from the versions folder instantly. A worker thread
+    then deletes the trashed tree, reporting "reclaim" progress on the event
+    bus. Anything still in the trash when the launcher exits (or crashes)
+    is picked up again by `resume` on the next start.
+    """
+    logger = logging.getLogger("Trash")
+    progress_every = 200
+
+    def __init__(self, app):
+        self.app = app
+        self.trash_dir = os.path.join(app.config.app_dir, "trash")
+        self.pending = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def move_to_trash(self, engine_folder):
+        """Atomically move an engine folder out of the way, returns its path in the trash"""
+        os.makedirs(self.trash_dir, exist_ok=True)
+        trashed_path = os.path.join(self.trash_dir, f"{os.path.basename(engine_folder)}-{utils.generate_hex(8)}")
+        os.rename(engine_folder, trashed_path)
+        return trashed_path
+
+    def reclaim(self, trashed_path):
+        """Queue a trashed folder for deletion"""
+        with self.lock:
+            self.pending.put(trashed_path)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True, name="TrashReclaimer")
+                self.thread.start()
+
+    def resume(self):
+        """Queue whatever a previous run left in the trash"""
+        if not os.path.isdir(self.trash_dir):
+            return
+        leftovers = [entry.path for entry in os.scandir(self.trash_dir)]
+        if leftovers:
+            self.logger.info(f"Resuming deletion of {len(leftovers)} trashed folders")
+        for trashed_path in leftovers:
+            self.reclaim(trashed_path)
+
+    def wait(self):
+        """Block until the trash is empty, used by the CLI before it exits"""
+        self.pending.join()
+
+    def run(self):
+        while True:
+            # Decided under the lock, so `reclaim` never queues behind an exiting worker
+            with self.lock:
+                if self.pending.empty():
+                    self.thread = None
+                    return
+                trashed_path = self.pending.get_nowait()
+            try:
+                self.delete_tree(trashed_path)
+                if self.app.config.get_use_object_store():
+                    self.app.store.collect_garbage()
+            except OSError as e:
+                # Stays in the trash, the next start tries again
+                self.logger.error(f"Could not delete {trashed_path}: {e}")
+                bus.discard(self.get_operation_id(trashed_path))
+            finally:
+                self.pending.task_done()
+
+    def get_operation_id(self, trashed_path):
+        return f"reclaim-{os.path.basename(trashed_path)}"
+
+    def delete_tree(self, trashed_path):
+        operation_id = self.get_operation_id(trashed_path)
+        # Counting first is a listing only, the deletes are what takes the time
+        total = sum(len(dirs) + len(files) for _, dirs, files in os.walk(trashed_path)) + 1
+        removed = 0
+        if os.path.isfile(trashed_path) or os.path.islink(trashed_path):
+            os.remove(trashed_path)
+        else:
+            for root, dirs, files in os.walk(trashed_path, topdown=False):
+                for name in files:
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+                    if removed % self.progress_every == 0:
+                        bus.progress(operation_id, "reclaim", removed, total)
+                for name in dirs:
+                    path = os.path.join(root, name)
+                    # Symlinks to folders show up in `dirs` but are removed like files
+                    if os.path.islink(path):
+                        os.remove(path)
+                    else:
+                        os.rmdir(path)
+                    removed += 1
+            os.rmdir(trashed_path)
+        bus.progress(operation_id, "reclaim", total, total)
+        bus.finish(operation_id, "reclaim")
+        self.logger.info(f"Deleted {trashed_path} ({total} entries)")
@@ -1,13 +1,13 @@
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QLabel, QComboBox,
                             QPushButton, QHBoxLayout, QVBoxLayout, QWidget,
                             QProgressBar, QToolButton, QMenu, QAction,
-                            QSpacerItem, QSizePolicy, QCheckBox)
+                            QSpacerItem, QSizePolicy, QCheckBox, QStyledItemDelegate)
 
-from PyQt5.QtCore import Qt, QObject, QThread, pyqtSignal, QUrl
+from PyQt5.QtCore import Qt, QObject, QThread, QTimer, pyqtSignal, QUrl
 from PyQt5.QtGui import QColor, QDesktopServices
+import time
 from godot_launcher import utils
-
-signaler = utils.signaler
+from godot_launcher.events import bus
 
 godot_colors = {
     "background": "#262C3B",
@@ -61,26 +61,110 @@ stylesheet = f"""
 
 """
 
-class InstallThread(QThread):
+class QtEventBridge(QObject):
+    """Re-emits `EventBus` events as a Qt signal so they are handled on the UI thread"""
+    event_signal = pyqtSignal(object)
+    
+    def __init__(self, event_bus):
+        super().__init__()
+        event_bus.subscribe(self.event_signal.emit)
+
+
+class JobWidget(QWidget):
+    """Progress row of one scheduled install or uninstall job"""
+    
+    def __init__(self, job_id, label, scheduler):
+        super().__init__()
+        self.job_id = job_id
+        self.scheduler = scheduler
+        self.total_download_size = ""
+        
+        self.message_label = QLabel(f"{label}: queued")
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.zip_bar = QProgressBar()
+        self.zip_bar.setRange(0, 100)
+        self.zip_bar.hide()
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.on_cancel_clicked)
+        self.label = label
+        
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        header_layout = QHBoxLayout()
+        header_layout.addWidget(self.message_label)
+        header_layout.addWidget(self.cancel_button)
+        layout.addLayout(header_layout)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.zip_bar)
+        
+    def on_cancel_clicked(self):
+        self.cancel_button.setEnabled(False)
+        self.message_label.setText(f"{self.label}: cancelling...")
+        self.scheduler.cancel(self.job_id)
+    
+    def on_state_changed(self, state, action):
+        if state == "running" and action == "uninstall":
+            self.message_label.setText(f"{self.label}: uninstalling...")
+            self.progress_bar.setRange(0, 0)
+        elif state == "running":
+            self.message_label.setText(f"{self.label}: starting download...")
+        
+    def on_progress_update(self, event):
+        if not self.total_download_size:
+            self.total_download_size = utils.convert_bytes(event.total)
+        # Updates arrive already coalesced, so every one of them is worth drawing
+        percent = int(event.current * 100 / event.total) if event.total else 0
+        speed = utils.convert_bytes(int(event.rate))
+        eta = utils.format_duration(event.eta)
+        self.message_label.setText(f"{self.label}: {utils.convert_bytes(event.current)} - {self.total_download_size} ({speed}/s, ETA {eta})")
+        self.progress_bar.setValue(percent)
+        
+    def on_download_finished(self):
+        self.progress_bar.hide()
+        self.message_label.setText(f"{self.label}: unzipping...")
+        self.zip_bar.show()
+
+    def on_unzip_progress(self, event):
+        percent = int((event.current / event.total) * 100) if event.total else 0
+        # Installs from the archive cache never report a download
+        self.progress_bar.hide()
+        self.message_label.setText(f"{self.label}: unzipping...")
+        self.zip_bar.show()
+        self.zip_bar.setValue(percent)
+        
+        
+class SizeItemDelegate(QStyledItemDelegate):
+    """Draws an installed version's disk usage right-aligned next to its name"""
+    size_role = Qt.UserRole + 1
+    
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        size_text = index.data(self.size_role)
+        if size_text:
+            painter.save()
+            painter.setPen(QColor(godot_colors["text_disabled"]))
+            painter.drawText(option.rect.adjusted(0, 0, -8, 0), Qt.AlignRight | Qt.AlignVCenter, size_text)
+            painter.restore()
+        
+        
+class CatalogRefreshThread(QThread):
 
-    install_finished = pyqtSignal()
+    refresh_finished = pyqtSignal(object)
 
-    def __init__(self, app, selected_avail, use_mono):
+    def __init__(self, app):
         super().__init__()
-        self.selected_avail = selected_avail
-        self.use_mono = use_mono
         self.app = app
 
     def run(self):
-        self.app.install_version(self.selected_avail, self.use_mono)
-
-        self.install_finished.emit()
+        available_versions = self.app.config.refresh_available_versions()
+        self.refresh_finished.emit(available_versions)
         
         
 class UI:
     def __init__(self, app):
         self.app = app
-        self.q_app = QApplication([])
+        self.q_app = QApplication.instance() or QApplication([])
         self.main_window = MainWindow(self)
     
     def initialize(self):
@@ -95,26 +179,34 @@ class UI:
 
     def launch(self):
         self.main_window.show()
+        # Runs once the event loop has painted the window for the first time
+        QTimer.singleShot(0, self.on_first_window)
+        
+        if self.app.config.catalog_is_stale:
+            self.start_catalog_refresh()
         self.q_app.exec_()
         
+    def on_first_window(self):
+        elapsed = (time.perf_counter() - self.app.start_time) * 1000
+        self.app.logger.info(f"Time to first window: {elapsed:.0f} ms")
+        
+    def start_catalog_refresh(self):
+        """Refresh the release catalog without blocking the window"""
+        self.catalog_thread = CatalogRefreshThread(self.app)
+        self.catalog_thread.refresh_finished.connect(self.main_window.on_catalog_refreshed)
+        self.catalog_thread.start()
+        
 class MainWindow(QMainWindow):
     def __init__(self, ui):
         self.ui = ui
-        
-        self.download_percent = 0
-        self.total_download_size = ""
-        
-        self.zip_percent = 0
-        self.total_zip_size = ""
-        
-        signaler.percent_signal.connect(self.on_progress_update)
-        signaler.download_finished_signal.connect(self.on_download_finished)
-        signaler.unzip_percent_signal.connect(self.on_unzip_progress)
-        signaler.unzip_finished_signal.connect(self.on_unzip_finished)
+        self.job_widgets = {}
         
         super().__init__()
         self.setStyleSheet(stylesheet)
         
+        self.event_bridge = QtEventBridge(bus)
+        self.event_bridge.event_signal.connect(self.on_event)
+        
         # Create Widgets
         self.installed_label = QLabel("Installed Versions:")
         self.installed_label.setAlignment(Qt.AlignCenter)    
@@ -126,7 +218,12 @@ class MainWindow(QMainWindow):
 
         # Create the comboboxes
         self.installed_combo = QComboBox()
+        self.installed_combo.setItemDelegate(SizeItemDelegate(self.installed_combo))
+        self.installed_combo.view().setMinimumWidth(260)
         self.installed_combo.currentIndexChanged.connect(self.on_installed_changed)
+        
+        self.disk_usage_label = QLabel("")
+        self.disk_usage_label.setAlignment(Qt.AlignCenter)
 
         self.available_combo = QComboBox()
         self.available_combo.currentIndexChanged.connect(self.on_available_changed)
@@ -160,13 +257,8 @@ class MainWindow(QMainWindow):
         self.action2.triggered.connect(self.open_engine_folder)
 
         self.message_label = QLabel("")
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setRange(0, 100)
-        self.progress_bar.hide()
-        
-        self.zip_bar = QProgressBar()
-        self.zip_bar.setRange(0, 100)
-        self.zip_bar.hide()
+        self.running_label = QLabel("")
+        self.jobs_layout = QVBoxLayout()
         
 
         # Set up the layout
@@ -180,6 +272,7 @@ class MainWindow(QMainWindow):
         installed_layout = QVBoxLayout()
         installed_layout.addWidget(self.installed_label)
         installed_layout.addWidget(self.installed_combo)
+        installed_layout.addWidget(self.disk_usage_label)
         installed_layout.addWidget(self.settings_button)
         
         available_layout = QVBoxLayout()
@@ -201,8 +294,8 @@ class MainWindow(QMainWindow):
         bottom_layout = QVBoxLayout()        
         bottom_layout.addWidget(self.launch_button)
         bottom_layout.addWidget(self.message_label)
-        bottom_layout.addWidget(self.progress_bar)
-        bottom_layout.addWidget(self.zip_bar)
+        bottom_layout.addWidget(self.running_label)
+        bottom_layout.addLayout(self.jobs_layout)
         self.launch_button.setFixedHeight(50)
         
         main_layout.addLayout(top_layout)
@@ -219,12 +312,33 @@ class MainWindow(QMainWindow):
     def populate_release_versions(self):
         versions = self.ui.app.config.get_available_versions()
         self.available_combo.clear()
-        if self.ui.app.config.version_is_installed(versions[0]):
-            self.install_button.setEnabled(False)
-            self.install_button.setText("Installed")
-            
         for version in versions:
             self.available_combo.addItem(version)
+        # Empty until the first catalog refresh, there is nothing to install yet
+        self.on_available_changed()
+            
+    def on_catalog_refreshed(self, versions):
+        """Merge a refreshed catalog into the combo box without repopulating it"""
+        if not versions:
+            return
+        # Use the index's sorted view so new releases land in version order
+        versions = self.ui.app.config.get_available_versions()
+        current = [self.available_combo.itemText(x) for x in range(self.available_combo.count())]
+        new_versions = set(versions)
+        existing_versions = set(current)
+        
+        for x in reversed(range(len(current))):
+            if current[x] not in new_versions:
+                self.available_combo.removeItem(x)
+        
+        added = 0
+        for x, version in enumerate(versions):
+            if version not in existing_versions:
+                self.available_combo.insertItem(x, version)
+                added += 1
+        
+        self.on_available_changed()
+        self.ui.app.logger.info(f"Release catalog updated: {added} added, {len(existing_versions - new_versions)} removed")
             
     def populate_installed_versions(self):
         self.installed_combo.clear()
@@ -246,9 +360,64 @@ class MainWindow(QMainWindow):
             self.installed_combo.addItem("No Engines Found")
             self.installed_combo.setEnabled(False)
             
+    def on_installed_versions_changed(self, added, removed):
+        """Apply an `InstalledRegistry` delta to the combo box without repopulating it"""
+        selected_version = self.ui.app.config.get_selected_version()
+        # Inserting items moves the current index, which must not count as the user picking a version
+        self.installed_combo.blockSignals(True)
+        no_engines = self.installed_combo.count() == 1 and self.installed_combo.itemText(0) == "No Engines Found"
+        if no_engines and added:
+            self.installed_combo.removeItem(0)
+            self.installed_combo.setEnabled(True)
+        
+        for version in removed:
+            index = self.installed_combo.findText(version)
+            if index >= 0:
+                self.installed_combo.removeItem(index)
+        
+        # The index's sorted view gives the position of every new version
+        installed_versions = self.ui.app.config.get_installed_versions()
+        for version in added:
+            if version in installed_versions and self.installed_combo.findText(version) < 0:
+                self.installed_combo.insertItem(installed_versions.index(version), version)
+        
+        if not installed_versions and not no_engines:
+            self.installed_combo.addItem("No Engines Found")
+            self.installed_combo.setEnabled(False)
+        
+        selected_index = self.installed_combo.findText(selected_version)
+        if selected_index >= 0:
+            self.installed_combo.setCurrentIndex(selected_index)
+        self.installed_combo.blockSignals(False)
+        self.on_installed_changed()
+        self.on_available_changed()
+    
+    def update_disk_usage(self):
+        """Show the cached sizes, measurements land here as "disk_usage" events"""
+        disk_usage = self.ui.app.disk_usage
+        for x in range(self.installed_combo.count()):
+            version = self.installed_combo.itemText(x)
+            if not self.ui.app.config.version_is_installed(version):
+                continue
+            size = disk_usage.get_size(self.ui.app.config.get_engine_version_path(version))
+            size_text = utils.convert_bytes(size) if size is not None else ""
+            self.installed_combo.setItemData(x, size_text, SizeItemDelegate.size_role)
+        
+        selected_version = self.installed_combo.currentText()
+        selected_size = None
+        if self.ui.app.config.version_is_installed(selected_version):
+            selected_size = disk_usage.get_size(self.ui.app.config.get_engine_version_path(selected_version))
+        total_text = f"Total: {utils.convert_bytes(disk_usage.get_total())}"
+        if selected_size is not None:
+            total_text = f"{utils.convert_bytes(selected_size)} - {total_text}"
+        self.disk_usage_label.setText(total_text)
+    
     def on_available_changed(self):
         selected_avail = self.available_combo.currentText()
-        if self.ui.app.config.version_is_installed(selected_avail):
+        if not selected_avail:
+            self.install_button.setEnabled(False)
+            self.install_button.setText("Install")
+        elif self.ui.app.config.version_is_installed(selected_avail):
             self.install_button.setEnabled(False)
             self.install_button.setText("Installed")
         else:
@@ -258,79 +427,104 @@ class MainWindow(QMainWindow):
         
     def on_installed_changed(self):
         selected_installed = self.installed_combo.currentText()
+        self.update_disk_usage()
         if selected_installed == "No Engines Found":
             self.launch_button.setEnabled(False)
             return
         else:
             self.ui.app.config.set_selected_version(selected_installed)
             self.launch_button.setEnabled(True)
+            # The combo is briefly blank while its items are replaced
+            prewarmer = self.ui.app.prewarmer
+            if prewarmer.enabled and self.ui.app.config.version_is_installed(selected_installed):
+                prewarmer.request(self.ui.app.config.get_engine_version_path(selected_installed))
             
     def on_launch_clicked(self):
+        clicked_at = time.perf_counter()
         selected_installed = self.installed_combo.currentText()
         engine_path = self.ui.app.config.get_engine_version_path(selected_installed)
-        self.ui.app.launch(engine_path)
+        self.ui.app.launch(engine_path, clicked_at)
     
     def on_install_clicked(self):
         selected_avail = self.available_combo.currentText()
         use_mono = self.use_mono_checkbox.isChecked()
         self.ui.app.logger.info(f"Installing version: {selected_avail}")        
-        self.message_label.setText("Starting Download...")
-        self.progress_bar.show()
-
-        self.install_thread = InstallThread(self.ui.app, selected_avail, use_mono)
-        self.install_thread.install_finished.connect(self.on_install_finished)
-
-        self.install_thread.start()
-        
-    def on_progress_update(self, count, block_size, total_size):
-        if not self.total_download_size:
-            self.total_download_size = utils.convert_bytes(total_size)
-        percent = int(count * block_size * 100 / total_size)
-        if percent != self.download_percent:
-            self.message_label.setText(f"Downloaded: {utils.convert_bytes(count * block_size)} - {self.total_download_size}")
-            self.download_percent = percent
-            self.progress_bar.setValue(self.download_percent)
-    
+        self.ui.app.scheduler.submit_install(selected_avail, use_mono)
         
-    def on_download_finished(self):
-        
-        self.download_percent = 0
-        self.total_download_size = ""
-        
-        self.progress_bar.hide()
-        self.progress_bar.setValue(0)
-        
-        
-        self.message_label.setText("Unzipping:...")
-        self.zip_bar.setValue(0)
+    def on_event(self, event):
+        if event.kind == "job_state":
+            self.on_job_state(event)
+            return
+        if event.kind == "installed_changed":
+            self.on_installed_versions_changed(event.data["added"], event.data["removed"])
+            return
+        if event.kind == "disk_usage":
+            self.update_disk_usage()
+            return
+        if event.kind == "reclaim":
+            percent = int(event.current * 100 / event.total) if event.total else 0
+            self.message_label.setText(f"Freeing disk space... {percent}%")
+            return
+        if event.kind == "reclaim_finished":
+            self.message_label.setText("Disk space freed")
+            return
+        if event.kind == "processes":
+            self.update_running_engines(event.data["sessions"])
+            return
         
-        self.zip_bar.show()
-
-    def on_unzip_progress(self, extracted_files, total_files):
-        percent = int((extracted_files / total_files) * 100)
-        if percent != self.zip_percent:
-            self.zip_percent = percent
-            self.zip_bar.setValue(self.zip_percent)
-    
-    def on_unzip_finished(self):
-        self.zip_percent = 0
-        self.total_zip_size = ""
+        job_widget = self.job_widgets.get(event.operation_id)
+        if job_widget is None:
+            return
+        if event.kind == "download":
+            job_widget.on_progress_update(event)
+        elif event.kind == "download_finished":
+            job_widget.on_download_finished()
+        elif event.kind == "unzip":
+            job_widget.on_unzip_progress(event)
+        
+    def update_running_engines(self, sessions):
+        lines = []
+        for session in sessions:
+            memory = utils.convert_bytes(session["rss"]) if session["rss"] else "-"
+            cpu = f"{session['cpu_percent']:.0f}%" if session["cpu_percent"] is not None else "-"
+            lines.append(f"{session['version']}  {memory}  {cpu}  {utils.format_duration(session['uptime'])}")
+        self.running_label.setText("\n".join(["Running:"] + lines) if lines else "")
+        
+    def on_job_state(self, event):
+        state = event.data["state"]
+        action = event.data["action"]
+        label = event.data["label"]
+        job_widget = self.job_widgets.get(event.operation_id)
+        
+        if state in ("queued", "running"):
+            if job_widget is None:
+                job_widget = JobWidget(event.operation_id, label, self.ui.app.scheduler)
+                self.job_widgets[event.operation_id] = job_widget
+                self.jobs_layout.addWidget(job_widget)
+            job_widget.on_state_changed(state, action)
+            return
         
-        self.zip_bar.hide()
+        if job_widget is not None:
+            del self.job_widgets[event.operation_id]
+            self.jobs_layout.removeWidget(job_widget)
+            job_widget.deleteLater()
         
-        self.message_label.setText("Unzipped Successfully")
-        self.zip_bar.setValue(0)
-    
-    def on_install_finished(self):
-        self.populate_installed_versions()
-        self.message_label.setText("Install Completed!")
-        self.ui.app.logger.info(f"Installing complete.")
+        if state == "done":
+            self.message_label.setText(f"{'Install' if action == 'install' else 'Uninstall'} of {label} completed!")
+            self.ui.app.logger.info(f"{action.capitalize()} of {label} complete.")
+        elif state == "cancelled":
+            self.message_label.setText(f"{action.capitalize()} of {label} cancelled")
+        else:
+            self.message_label.setText(f"{action.capitalize()} of {label} failed, see the log")
+        self.on_available_changed()
 
     def uninstall_clicked(self):
         selected_installed = self.installed_combo.currentText()
         engine_path = self.ui.app.config.get_engine_version_path(selected_installed)
-        self.ui.app.uninstall_version(engine_path)
-        self.populate_installed_versions()
+        if self.ui.app.is_running(engine_path):
+            self.message_label.setText(f"{selected_installed} is running, close it before uninstalling")
+            return
+        self.ui.app.scheduler.submit_uninstall(selected_installed, engine_path)
 
     def open_engine_folder(self):
         selected_installed = self.installed_combo.currentText()
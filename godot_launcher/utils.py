@@ -1,41 +1,15 @@
 import os
-import re
+import json
 import random
 import math
-import zipfile
 import platform
 from datetime import datetime, timedelta
 from godot_launcher.exceptions import *
-from PyQt5.QtCore import QObject, pyqtSignal
-
-
-class Signaler(QObject):
-    percent_signal = pyqtSignal(int, int, int)
-    install_finished_signal = pyqtSignal()
-    download_finished_signal = pyqtSignal()
-    unzip_percent_signal = pyqtSignal(int, int)
-    unzip_finished_signal = pyqtSignal()
-    message_queue = {}
-    
-    
-
-    def emit_signal(self, signal_name, *args):
-        if signal_name == "dl_percent":
-            self.percent_signal.emit(*args)
-            
-        if signal_name == "install_finished":
-            self.install_finished_signal.emit()
-        
-        if signal_name == "download_finished":
-            self.download_finished_signal.emit()
-        
-        if signal_name == "unzip_percent":
-            self.unzip_percent_signal.emit(*args)
-            
-        if signal_name == "unzip_finished":
-            self.unzip_finished_signal.emit()
-
-signaler = Signaler()
+from godot_launcher.events import bus
+from godot_launcher.versions import parse_version
+from godot_launcher.assets import AssetMatrix
+from godot_launcher import checksums
+from godot_launcher.telemetry import metrics
 
 
 def time_diff_greater_than(date_str1, date_str2, p_days):
@@ -46,11 +20,7 @@ def time_diff_greater_than(date_str1, date_str2, p_days):
     return difference > timedelta(days=p_days)
     
 def get_machine_info():
-    
-    # This is commented out until I add linux/mac support
-    #supported_os = ["windows", "linux", "darwin"]
-    
-    supported_os = ["windows"]
+    supported_os = ["windows", "linux", "darwin"]
     os_name = platform.system().lower()
     if os_name not in supported_os:
         return False
@@ -58,57 +28,39 @@ def get_machine_info():
     if os_name == "darwin":
         os_name = "mac_os"
         
-    arch = platform.machine()
+    machine = platform.machine().lower()
     bits = 0
-    if arch.endswith('64'):
+    if machine.endswith('64'):
         bits = 64
     else:
         bits = 32
     
-    return {"os_name":os_name, "bits":bits}
+    # Normalize to the architecture names used by Godot's release assets
+    if machine in ("arm64", "aarch64"):
+        arch = "arm64"
+    elif machine.startswith("arm"):
+        arch = "arm32"
+    elif bits == 64:
+        arch = "x86_64"
+    else:
+        arch = "x86_32"
+    
+    return {"os_name":os_name, "bits":bits, "arch":arch}
 
 def get_download_url_for_platform(asset_data, use_mono):
+    """Pick the editor download for this machine from a {name: url} dict"""
     machine_info = get_machine_info()
-    os_name = machine_info["os_name"]
-    platform_tags = {
-        "windows": "win",
-        "mac_os": "macos",
-        "linux": "linux"
-    }
-    
-    platform_tag = platform_tags.get(os_name, "")
-    bits = str(machine_info["bits"])
-    
-    for asset in asset_data.keys():
-        if asset.endswith(".zip"):
-            search_string = asset.split("stable")[1]
-            if use_mono:                
-                term = search_string.split("_")[1]
-                if term == "mono":                    
-                    if platform_tag+bits in search_string:
-                        return asset_data[asset]
-            else:
-                if platform_tag and bits in search_string and "mono" not in search_string:
-                    return asset_data[asset]
+    asset_matrix = AssetMatrix((name, url, 0) for name, url in asset_data.items())
+    asset = asset_matrix.resolve(machine_info["os_name"], machine_info["arch"], use_mono)
+    if asset:
+        return asset["url"]
 
 def get_latest_version(release_list):
     if not release_list:
         return ""
     
-    pattern = r'\d+\.\d+(?:\.\d+)?'
-    
-    def compare_versions(version1, version2):
-        parts1 = tuple(map(int, version1.split('.')))
-        parts2 = tuple(map(int, version2.split('.')))
-        
-        if parts1 > parts2:
-            return 1
-        elif parts1 < parts2:
-            return -1
-        else:
-            return 0
-
-    latest_release = max(release_list, key=lambda x: re.search(pattern, x).group(0), default='',)
+    # Compare parsed keys, as strings "4.10" would sort below "4.9"
+    latest_release = max(release_list, key=parse_version, default='')
     return latest_release
 
 
@@ -119,39 +71,118 @@ def generate_hex(length):
         hex_string += random.choice(hex_digits)
     return hex_string
 
-import urllib.request
-
-def download_file_with_progress(download_url, destination):
-    def progress_hook(count, block_size, total_size):
-
-        percent = int(count * block_size * 100 / total_size)
-        signaler.emit_signal("dl_percent", count, block_size, total_size)
+def check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise InstallCancelled("Install was cancelled")
 
-    urllib.request.urlretrieve(download_url, destination, reporthook=progress_hook)
+def download_file_with_progress(download_url, destination, connections=4, operation_id=None, cancel_event=None,
+                                expected_digest=None):
+    """Download a file, checking its SHA512 against `expected_digest` when given.
     
-    signaler.emit_signal("download_finished")
+    A mismatching file is deleted and raises `ChecksumError` before anything
+    gets to unzip it.
+    """
+    operation_id = operation_id or os.path.basename(destination)
+    hasher = checksums.new_hasher() if expected_digest else None
+    
+    # Progress hooks run often on every worker, so they double as cancellation points
+    def progress_hook(downloaded, total_size):
+        check_cancelled(cancel_event)
+        bus.progress(operation_id, "download", downloaded, total_size)
+
+    # Deferred, urllib/ssl are only worth loading once something is downloaded
+    from godot_launcher.downloader import RangedDownloader
+    with metrics.span("download", file=os.path.basename(destination)) as span:
+        downloader = RangedDownloader(download_url, destination, connections, progress_callback=progress_hook, hasher=hasher)
+        downloader.download()
+        span.add(bytes=downloader.total_size, resumed_bytes=downloader.resumed_size)
+        
+        if hasher:
+            try:
+                checksums.verify_digest(hasher, expected_digest, os.path.basename(destination))
+            except ChecksumError:
+                os.remove(destination)
+                raise
+    bus.finish(operation_id, "download")
+
+def stream_install_with_progress(download_url, output_dir, operation_id=None, cancel_event=None, expected_digest=None,
+                                archive_file=None):
+    """Download and extract in one overlapped pass, raises `PipelineError` if unsupported.
+    
+    The archive is only seen as it streams by, so a `ChecksumError` is raised
+    after extraction and the caller has to discard `output_dir`. With
+    `archive_file` a copy of the archive is written there on the way.
+    """
+    operation_id = operation_id or os.path.basename(output_dir)
+    hasher = checksums.new_hasher() if expected_digest else None
+    
+    def download_hook(downloaded, total_size):
+        check_cancelled(cancel_event)
+        bus.progress(operation_id, "download", downloaded, total_size)
+    
+    def unzip_hook(extracted_bytes, total_bytes):
+        check_cancelled(cancel_event)
+        bus.progress(operation_id, "unzip", extracted_bytes, total_bytes)
+    
+    from godot_launcher.pipeline import StreamingInstaller
+    with metrics.span("stream_install", file=os.path.basename(download_url)) as span:
+        installer = StreamingInstaller(download_url, output_dir, download_hook, unzip_hook, hasher, archive_file)
+        installer.install()
+        span.add(bytes=installer.total_size, files=installer.file_count)
+        if hasher:
+            checksums.verify_digest(hasher, expected_digest, os.path.basename(download_url))
+    
+    bus.finish(operation_id, "download")
+    bus.finish(operation_id, "unzip")
 
     
 def unzip_file(source_file, output_dir):
+    import zipfile
     with zipfile.ZipFile(source_file, 'r') as zip_ref:
         zip_ref.extractall(output_dir)
         
-def unzip_file_with_progress(source_file, output_dir):
-    def progress_hook(current, total):
-        percent = int((current / total) * 100)
-        signaler.emit_signal("unzip_percent", current, total)
-
-    with zipfile.ZipFile(source_file, 'r') as zip_ref:
-        total_files = len(zip_ref.infolist())
-        extracted_files = 0
-
-        for file_info in zip_ref.infolist():
-            extracted_files += 1
-            signaler.emit_signal("unzip_percent", extracted_files, total_files)
+def unzip_file_with_progress(source_file, output_dir, store=None, operation_id=None, cancel_event=None):
+    operation_id = operation_id or os.path.basename(output_dir)
+    
+    def progress_hook(extracted_bytes, total_bytes):
+        check_cancelled(cancel_event)
+        bus.progress(operation_id, "unzip", extracted_bytes, total_bytes)
 
-            zip_ref.extract(file_info, output_dir)
+    from godot_launcher.extractor import ParallelExtractor
+    with metrics.span("extract", file=os.path.basename(source_file)) as span:
+        extractor = ParallelExtractor(source_file, output_dir, progress_callback=progress_hook, store=store)
+        extractor.extract()
+        span.add(bytes=extractor.total_bytes, files=extractor.file_count)
 
-    signaler.emit_signal("unzip_finished")        
+    bus.finish(operation_id, "unzip")
+        
+def read_json(path, logger, description):
+    """Load a JSON cache file, None if it doesn't exist or is unreadable (logged, the cache starts over)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Discarding unreadable {description}: {e}")
+        return None
+
+def write_json_atomic(path, data, logger, description):
+    """Write `data` to a temp file next to `path` and move it into place.
+    
+    Readers never see a half written file. Callers writing from several
+    threads hold their own lock. Returns False (logged) if it couldn't be
+    written, a cache that isn't saved is only rebuilt next time.
+    """
+    temp_file = f"{path}.tmp"
+    try:
+        with open(temp_file, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_file, path)
+        return True
+    except OSError as e:
+        logger.warning(f"Could not save {description}: {e}")
+        return False
         
 def convert_bytes(size_bytes):
     if size_bytes == 0:
@@ -162,9 +193,63 @@ def convert_bytes(size_bytes):
     s = round(size_bytes / p, 2)
     return "%s %s" % (s, size_name[i])       
 
-def get_executable_in_folder(folder_path):
-    for root, dirs, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith('.exe') and 'console' in file.lower():
-                executable_path = os.path.join(root, file)
-                return executable_path
\ No newline at end of file
+def format_duration(seconds):
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+LINUX_EXECUTABLE_SUFFIXES = (".x86_64", ".x86_32", ".arm64", ".arm32", ".64", ".32")
+
+def is_engine_executable(entry, os_name):
+    name = entry.name.lower()
+    if os_name == "windows":
+        return name.endswith('.exe') and entry.is_file()
+    if os_name == "mac_os":
+        return name.endswith('.app') and entry.is_dir()
+    return name.startswith('godot') and name.endswith(LINUX_EXECUTABLE_SUFFIXES) and entry.is_file()
+
+def get_executable_in_folder(folder_path, os_name=None, max_depth=2):
+    """Find the engine executable of an installed version.
+    
+    Searches breadth first and only `max_depth` levels deep, the executable
+    sits at the top of the archive (or one folder down for mono builds), so
+    the thousands of files under GodotSharp are never listed. On Windows the
+    console build is preferred, on macOS the binary inside the app bundle is
+    returned.
+    """
+    os_name = os_name or get_machine_info()["os_name"]
+    folders = [folder_path]
+    for _ in range(max_depth):
+        candidates = []
+        subfolders = []
+        for folder in folders:
+            try:
+                entries = sorted(os.scandir(folder), key=lambda entry: entry.name)
+            except OSError:
+                continue
+            for entry in entries:
+                if is_engine_executable(entry, os_name):
+                    candidates.append(entry.path)
+                elif entry.is_dir() and not entry.name.lower().startswith("godotsharp"):
+                    subfolders.append(entry.path)
+        
+        if candidates:
+            if os_name == "windows":
+                console_builds = [path for path in candidates if 'console' in os.path.basename(path).lower()]
+                return (console_builds or candidates)[0]
+            if os_name == "mac_os":
+                return get_bundle_executable(candidates[0])
+            return candidates[0]
+        folders = subfolders
+
+def get_bundle_executable(bundle_path):
+    binary_dir = os.path.join(bundle_path, "Contents", "MacOS")
+    try:
+        binaries = sorted(entry.path for entry in os.scandir(binary_dir) if entry.is_file())
+    except OSError:
+        return None
+    return binaries[0] if binaries else None
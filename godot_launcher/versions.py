@@ -0,0 +1,81 @@
+import re
+import threading
+
+
+VERSION_PATTERN = re.compile(r'(\d+)\.(\d+)(?:\.(\d+))?(?:[-._ ]?(dev|alpha|beta|rc|stable)(\d*))?', re.IGNORECASE)
+STAGE_RANKS = {"dev": 0, "alpha": 1, "beta": 2, "rc": 3, "stable": 4}
+UNPARSABLE_KEY = (-1, -1, -1, -1, -1, 0)
+
+
+def parse_version(name):
+    """Turn a release or installed version name into a comparable key.
+
+    The key is (major, minor, patch, stage, stage number, mono), so
+    "4.10-stable" > "4.9.1-stable" > "4.9.1-rc2" > "4.9.1-beta10". Names
+    without a stage tag are treated as stable. Names that don't contain a
+    version at all sort below everything else.
+    """
+    match = VERSION_PATTERN.search(name)
+    if not match:
+        return UNPARSABLE_KEY
+    major, minor, patch, stage, stage_number = match.groups()
+    stage_rank = STAGE_RANKS[stage.lower()] if stage else STAGE_RANKS["stable"]
+    mono = 1 if "mono" in name.lower() else 0
+    return (int(major), int(minor), int(patch or 0), stage_rank, int(stage_number or 0), mono)
+
+
+class VersionIndex():
+    """Lookup tables over the release catalog and the installed versions.
+
+    Built once per catalog refresh / install change instead of scanning the
+    config sections on every query: name <-> url maps, an installed map and
+    version-sorted views for the UI. Rebuilds swap in fresh dicts, so readers
+    on other threads always see a consistent snapshot.
+    """
+
+    def __init__(self):
+        self.url_by_name = {}
+        self.name_by_url = {}
+        self.installed = {}
+        self.sorted_available_names = []
+        self.sorted_installed_names = []
+        self.lock = threading.Lock()
+
+    def rebuild_available(self, available_versions):
+        """
+        Args:
+            available_versions: Mapping of version name to release url.
+        """
+        url_by_name = dict(available_versions)
+        name_by_url = {url: name for name, url in url_by_name.items()}
+        sorted_names = sorted(url_by_name, key=parse_version, reverse=True)
+        with self.lock:
+            self.url_by_name = url_by_name
+            self.name_by_url = name_by_url
+            self.sorted_available_names = sorted_names
+
+    def rebuild_installed(self, installed_versions):
+        """
+        Args:
+            installed_versions: Mapping of installed name to engine folder.
+        """
+        installed = dict(installed_versions)
+        sorted_names = sorted(installed, key=parse_version, reverse=True)
+        with self.lock:
+            self.installed = installed
+            self.sorted_installed_names = sorted_names
+
+    def get_url(self, name):
+        return self.url_by_name.get(name)
+
+    def get_name_for_url(self, url):
+        return self.name_by_url.get(url)
+
+    def is_installed(self, name):
+        return name in self.installed
+
+    def sorted_available(self):
+        return list(self.sorted_available_names)
+
+    def sorted_installed(self):
+        return list(self.sorted_installed_names)
@@ -12,4 +12,7 @@ setup(
     author='Eric Hamilton',
     packages=['godot_launcher'],
     install_requires=requirements,
+    entry_points={
+        'console_scripts': ['godot_launcher=godot_launcher.cli:main'],
+    },
 )
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmarks"))
+
+from fake_github import FakeGitHub
+import godot_launcher
+from godot_launcher import http_client
+
+
+@pytest.fixture(scope="session")
+def archive_dir(tmp_path_factory):
+    # Built once, every server of the session serves the same archives
+    return str(tmp_path_factory.mktemp("archives"))
+
+
+@pytest.fixture
+def fake_github(archive_dir):
+    fake = FakeGitHub(archive_dir, releases=3, per_page=2, binary_mb=1, small_files=20).start()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Retry right away, the shared client would otherwise sleep between attempts"""
+    monkeypatch.setattr(http_client.client, "backoff", 0.0)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # The launcher keeps everything under %APPDATA%, point it at the test's dir
+    monkeypatch.setenv("APPDATA", str(tmp_path))
+    app = godot_launcher.create_app(headless=True)
+    app.config.initialize()
+    app.apply_config()
+    yield app
+    app.config.flush_config()
@@ -0,0 +1,30 @@
+import os
+
+
+def add_engine(app, version):
+    engine_folder = os.path.join(app.config.app_dir, "versions", version)
+    os.makedirs(engine_folder)
+    return engine_folder
+
+
+def test_fresh_install_becomes_the_selection(app):
+    app.config.apply_installed_changes({"4.3-stable": add_engine(app, "4.3-stable")}, [])
+    app.config.apply_installed_changes({"4.1-stable": add_engine(app, "4.1-stable")}, [])
+
+    assert app.config.get_selected_version() == "4.1-stable"
+    assert app.config.cfg["Config"]["latest_installed_version"] == "4.3-stable"
+
+
+def test_newest_of_several_installs_becomes_the_selection(app):
+    app.config.apply_installed_changes({version: add_engine(app, version) for version in ("4.1-stable", "4.2-stable")}, [])
+
+    assert app.config.get_selected_version() == "4.2-stable"
+
+
+def test_removing_the_selection_selects_the_latest(app):
+    app.config.apply_installed_changes({version: add_engine(app, version) for version in ("4.2-stable", "4.3-stable")}, [])
+    app.config.set_selected_version("4.2-stable")
+
+    app.config.apply_installed_changes({}, ["4.2-stable"])
+
+    assert app.config.get_selected_version() == "4.3-stable"
@@ -0,0 +1,122 @@
+import os
+import json
+import hashlib
+
+import pytest
+
+from godot_launcher import utils
+from godot_launcher.downloader import RangedDownloader
+from godot_launcher.exceptions import ChecksumError, DownloadError
+
+CHUNK_SIZE = 64 * 1024
+
+
+def get_archive(fake):
+    version = fake.archive_versions[0]
+    name = fake.get_asset_name(version)
+    return f"{fake.base_url}/download/{version}/{name}", fake.archives[name]
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def make_downloader(url, destination, hasher=None):
+    downloader = RangedDownloader(url, destination, connections=4, hasher=hasher)
+    downloader.chunk_size = CHUNK_SIZE
+    return downloader
+
+
+def test_download_over_ranges(fake_github, tmp_path):
+    url, archive = get_archive(fake_github)
+    destination = str(tmp_path / "archive.zip")
+    hasher = hashlib.sha512()
+
+    downloader = make_downloader(url, destination, hasher)
+    downloader.download()
+
+    assert read(destination) == read(archive)
+    assert hasher.hexdigest() == hashlib.sha512(read(archive)).hexdigest()
+    assert not os.path.exists(downloader.journal_file)
+    ranges = [headers.get("Range") for path, headers in fake_github.request_log if path.startswith("/download/")]
+    assert len(ranges) > 2 and "bytes=0-0" in ranges
+
+
+def test_resume_from_journal(fake_github, tmp_path):
+    url, archive = get_archive(fake_github)
+    destination = str(tmp_path / "archive.zip")
+    # Every chunk from the fourth on fails, through all retries
+    fake_github.add_fault("/download/", 500, count=1000, from_offset=3 * CHUNK_SIZE)
+
+    with pytest.raises(DownloadError):
+        make_downloader(url, destination).download()
+    with open(f"{destination}.journal", 'r') as f:
+        journal = json.load(f)
+    assert {0, 1, 2} <= set(journal["completed"])
+    assert 3 not in journal["completed"]
+
+    fake_github.faults.clear()
+    hasher = hashlib.sha512()
+    downloader = make_downloader(url, destination, hasher)
+    downloader.download()
+
+    assert downloader.resumed_size >= 3 * CHUNK_SIZE
+    assert read(destination) == read(archive)
+    # Restored chunks are hashed back from disk
+    assert hasher.hexdigest() == hashlib.sha512(read(archive)).hexdigest()
+    assert not os.path.exists(downloader.journal_file)
+
+
+def test_journal_of_another_file_is_ignored(fake_github, tmp_path):
+    url, archive = get_archive(fake_github)
+    destination = str(tmp_path / "archive.zip")
+    with open(destination, 'wb') as f:
+        f.write(b"\0" * os.path.getsize(archive))
+    with open(f"{destination}.journal", 'w') as f:
+        json.dump({"url": url, "size": os.path.getsize(archive), "validator": '"changed upstream"',
+                   "chunk_size": CHUNK_SIZE, "completed": [0, 1, 2]}, f)
+
+    downloader = make_downloader(url, destination)
+    downloader.download()
+
+    assert downloader.resumed_size == 0
+    assert read(destination) == read(archive)
+
+
+def test_unreadable_journal_is_ignored(fake_github, tmp_path):
+    url, archive = get_archive(fake_github)
+    destination = str(tmp_path / "archive.zip")
+    with open(destination, 'wb') as f:
+        f.write(b"partial")
+    with open(f"{destination}.journal", 'w') as f:
+        f.write("{not json")
+
+    downloader = make_downloader(url, destination)
+    downloader.download()
+
+    assert downloader.resumed_size == 0
+    assert read(destination) == read(archive)
+
+
+def test_checksum_mismatch_removes_the_download(fake_github, tmp_path):
+    url, _ = get_archive(fake_github)
+    destination = str(tmp_path / "archive.zip")
+
+    with pytest.raises(ChecksumError):
+        utils.download_file_with_progress(url, destination, expected_digest="0" * 128)
+    assert not os.path.exists(destination)
+
+
+def test_single_stream_without_ranges(fake_github, tmp_path):
+    url, archive = get_archive(fake_github)
+    destination = str(tmp_path / "archive.zip")
+    fake_github.ranges = False
+    expected_digest = hashlib.sha512(read(archive)).hexdigest()
+
+    utils.download_file_with_progress(url, destination, expected_digest=expected_digest)
+
+    assert read(destination) == read(archive)
+    assert not os.path.exists(f"{destination}.journal")
+    # The probe got the whole file, nothing else was requested
+    assert len([path for path, _ in fake_github.request_log if path.startswith("/download/")]) == 1
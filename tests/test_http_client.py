@@ -0,0 +1,111 @@
+import time
+import socket
+
+import pytest
+import requests
+
+from fake_github import API_PATH
+from godot_launcher.http_client import HttpClient
+
+
+@pytest.fixture
+def client():
+    client = HttpClient()
+    client.backoff = 0.0
+    return client
+
+
+def count_requests(fake, path):
+    return len([logged for logged, _ in fake.request_log if logged.startswith(path)])
+
+
+def test_retries_server_errors(fake_github, client):
+    fake_github.add_fault(API_PATH, 503, count=2)
+
+    response = client.get(fake_github.releases_url)
+
+    assert response.status_code == 200
+    assert count_requests(fake_github, API_PATH) == 3
+
+
+def test_returns_the_error_once_retries_are_spent(fake_github, client):
+    fake_github.add_fault(API_PATH, 502, count=10)
+
+    response = client.get(fake_github.releases_url, retries=2)
+
+    assert response.status_code == 502
+    assert count_requests(fake_github, API_PATH) == 3
+
+
+def test_client_errors_are_not_retried(fake_github, client):
+    fake_github.add_fault(API_PATH, 404, count=10)
+
+    assert client.get(fake_github.releases_url).status_code == 404
+    assert count_requests(fake_github, API_PATH) == 1
+
+
+def test_honors_retry_after(fake_github, client):
+    fake_github.add_fault(API_PATH, 429, {"Retry-After": "1"})
+
+    started = time.monotonic()
+    response = client.get(fake_github.releases_url)
+
+    assert response.status_code == 200
+    assert time.monotonic() - started >= 1
+
+
+def test_does_not_wait_out_a_long_retry_after(fake_github, client):
+    fake_github.add_fault(API_PATH, 429, {"Retry-After": "3600"})
+
+    assert client.get(fake_github.releases_url).status_code == 429
+    assert count_requests(fake_github, API_PATH) == 1
+
+
+def test_tracks_the_rate_limit(fake_github, client):
+    client.get(fake_github.releases_url)
+    assert client.rate_limit_remaining == 4999
+    assert not client.should_defer()
+
+    fake_github.rate_limit_remaining = 3
+    client.get(fake_github.releases_url)
+    assert client.rate_limit_remaining == 3
+    assert client.should_defer()
+    assert 0 < client.get_seconds_until_reset() <= 3600
+
+
+def test_spent_quota_defers_instead_of_waiting(fake_github, client):
+    reset = str(int(time.time()) + 3600)
+    fake_github.add_fault(API_PATH, 403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset})
+
+    response = client.get(fake_github.releases_url)
+
+    assert response.status_code == 403
+    assert count_requests(fake_github, API_PATH) == 1
+    assert client.should_defer()
+
+
+def test_token_only_goes_to_token_hosts(fake_github, client):
+    client.token = "secret"
+    client.get(fake_github.releases_url)
+    client.token_hosts = {"127.0.0.1"}
+    client.get(fake_github.releases_url)
+
+    sent = [headers.get("Authorization") for _, headers in fake_github.request_log]
+    assert sent == [None, "Bearer secret"]
+
+
+def test_connection_errors_are_retried_then_raised(client):
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        port = listener.getsockname()[1]
+    # Nothing listens on the port anymore, every attempt is refused
+    with pytest.raises(requests.ConnectionError):
+        client.get(f"http://127.0.0.1:{port}/", retries=2)
+
+
+@pytest.mark.parametrize("entry", ["4999", "4999|", "lots|1700000000"])
+def test_unreadable_saved_rate_limit_is_unknown(app, entry):
+    app.config.cfg["Config"]["api_rate_limit"] = entry
+
+    assert app.config.get_api_rate_limit() is None
+    app.apply_config()
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from godot_launcher import utils
+from godot_launcher.exceptions import PipelineError
+
+
+@pytest.fixture
+def app(app, fake_github):
+    # Every install has to download, not come from the archive cache
+    app.archive_cache.max_size = 0
+    app.archive_cache.shared_dir = None
+    app.scraper.releases_url = fake_github.releases_url
+    app.config.refresh_available_versions(urgent=True)
+    return app
+
+
+def get_engine_folder(app, version):
+    return app.config.get_engine_folder_from_url(app.config.get_version_url(version))
+
+
+def fail_extraction(monkeypatch, streaming):
+    """Make installs fail halfway, after writing part of the engine"""
+    def partial_extract(source, output_dir, *args, **kwargs):
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, "partial.bin"), 'wb') as f:
+            f.write(b"cut short")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(utils, "unzip_file_with_progress", partial_extract)
+    if streaming:
+        # The stream breaks, then so does the fallback
+        def stream_then_fail(url, output_dir, *args, **kwargs):
+            try:
+                partial_extract(url, output_dir)
+            except OSError as e:
+                raise PipelineError(str(e))
+        monkeypatch.setattr(utils, "stream_install_with_progress", stream_then_fail)
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_failed_first_install_leaves_no_folder(app, fake_github, monkeypatch, streaming):
+    version = fake_github.archive_versions[0]
+    app.config.cfg["Config"]["streaming_install"] = str(streaming).lower()
+    fail_extraction(monkeypatch, streaming)
+
+    assert not app.install_version(version, False)
+
+    assert not os.path.exists(get_engine_folder(app, version))
+    assert not os.path.exists(os.path.join(app.get_staging_dir(version, False), "engine"))
+    assert not app.config.version_is_installed(version)
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_failed_reinstall_keeps_the_working_engine(app, fake_github, monkeypatch, streaming):
+    version = fake_github.archive_versions[0]
+    app.config.cfg["Config"]["streaming_install"] = str(streaming).lower()
+    assert app.install_version(version, False)
+    engine_folder = get_engine_folder(app, version)
+    before = sorted(os.listdir(engine_folder))
+
+    fail_extraction(monkeypatch, streaming)
+    assert not app.install_version(version, False)
+
+    assert sorted(os.listdir(engine_folder)) == before
+    assert not os.path.exists(os.path.join(app.get_staging_dir(version, False), "engine"))
+
+
+def test_reinstall_replaces_the_engine(app, fake_github):
+    version = fake_github.archive_versions[0]
+    assert app.install_version(version, False)
+    engine_folder = get_engine_folder(app, version)
+    leftover = os.path.join(engine_folder, "leftover.txt")
+    with open(leftover, 'w') as f:
+        f.write("from the previous install")
+
+    assert app.install_version(version, False)
+
+    assert not os.path.exists(leftover)
+    assert app.config.get_engine_executable(engine_folder)
@@ -0,0 +1,47 @@
+import os
+import shutil
+
+import pytest
+
+
+def make_engine(app, version):
+    engine_folder = os.path.join(app.config.app_dir, "versions", version)
+    os.makedirs(engine_folder)
+    with open(os.path.join(engine_folder, f"Godot_v{version}_linux.x86_64"), 'wb') as f:
+        f.write(os.urandom(64 * 1024))
+    app.registry.refresh([engine_folder])
+    return engine_folder
+
+
+@pytest.fixture
+def engine_folder(app):
+    engine_folder = make_engine(app, "4.2-stable")
+    assert app.prewarmer.prewarm(engine_folder) > 0
+    return engine_folder
+
+
+def test_prewarmed_engine_is_warm(app, engine_folder):
+    assert app.prewarmer.is_warm(engine_folder)
+
+
+def test_reinstall_makes_the_engine_cold(app, engine_folder):
+    # Installs swap a complete folder in, the engine that was read is gone
+    replacement = engine_folder + ".new"
+    shutil.copytree(engine_folder, replacement)
+    shutil.rmtree(engine_folder)
+    os.replace(replacement, engine_folder)
+
+    assert not app.prewarmer.is_warm(engine_folder)
+
+
+def test_uninstall_forgets_the_engine(app, engine_folder):
+    assert app.uninstall_version(engine_folder)
+
+    assert engine_folder not in app.prewarmer.warm
+
+
+def test_warm_entries_expire(app, engine_folder, monkeypatch):
+    monkeypatch.setattr(app.prewarmer, "warm_expiry", -1)
+
+    assert not app.prewarmer.is_warm(engine_folder)
+    assert engine_folder not in app.prewarmer.warm